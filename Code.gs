@@ -20,53 +20,288 @@ function doPost(e) {
   return handleRequest(e);
 }
 
-function handleRequest(e) {
-  const lock = LockService.getScriptLock();
-  lock.tryLock(10000);
+// Actions that never write and can run without any lock
+const READ_ACTIONS = ['getReservations', 'getArchivedReservations', 'getItems', 'getStaff', 'getAvailability', 'getMetrics'];
+const WRITE_ACTIONS = ['archiveReservations', 'createReservation', 'updateReservation', 'cancelReservation', 'deleteReservation',
+  'restoreReservation', 'completeReservation', 'completeReservations', 'cancelReservations', 'restoreReservations'];
+const LOCK_WAIT_MS = 10000;
+const BUSY_MESSAGE = 'Server is busy, please retry.';
 
+function handleRequest(e) {
+  const startedAt = Date.now();
+  let action = 'unknown';
+  let lockWaitMs = 0;
   try {
     const params = e.parameter.action ? e.parameter : JSON.parse(e.postData.contents);
-    const action = params.action;
+    action = params.action;
     
     let result;
-    switch (action) {
-      case 'getReservations':
-        result = getReservations();
-        break;
-      case 'getItems':
-        result = getItems();
-        break;
-      case 'getStaff':
-        result = getStaff();
-        break;
-      case 'createReservation':
-        result = createReservation(params.reservation);
-        break;
-      case 'updateReservation':
-        result = updateReservation(params.reservation);
-        break;
-      case 'cancelReservation':
-        result = cancelReservation(params.tx_id);
-        break;
-      case 'deleteReservation':
-        result = deleteReservation(params.tx_id);
-        break;
-      case 'restoreReservation':
-        result = restoreReservation(params.tx_id);
-        break;
-      case 'completeReservation':
-        result = completeReservation(params.tx_id, params.return_notes, params.completed_by);
-        break;
-      default:
-        result = { status: 'error', message: 'Invalid action' };
+    if (READ_ACTIONS.indexOf(action) !== -1) {
+      result = dispatchAction(action, params);
+    } else {
+      const scope = getWriteScope(action, params);
+      const lockStart = Date.now();
+      const token = acquireScopeLock(scope, LOCK_WAIT_MS);
+      lockWaitMs = Date.now() - lockStart;
+      if (!token) {
+        result = { status: 'busy', message: BUSY_MESSAGE };
+      } else {
+        try {
+          result = dispatchAction(action, params);
+        } finally {
+          releaseScopeLock(scope, token);
+        }
+      }
     }
 
+    result.meta = recordMetrics(action, result.status, startedAt, lockWaitMs);
     return ContentService.createTextOutput(JSON.stringify(result))
       .setMimeType(ContentService.MimeType.JSON);
       
   } catch (e) {
-    return ContentService.createTextOutput(JSON.stringify({ status: 'error', message: e.toString() }))
+    const result = e.message === BUSY_MESSAGE
+      ? { status: 'busy', message: BUSY_MESSAGE }
+      : { status: 'error', message: e.toString() };
+    result.meta = recordMetrics(action, result.status, startedAt, lockWaitMs);
+    return ContentService.createTextOutput(JSON.stringify(result))
       .setMimeType(ContentService.MimeType.JSON);
+  }
+}
+
+function dispatchAction(action, params) {
+  switch (action) {
+    case 'getReservations':
+      return getReservations(params);
+    case 'getArchivedReservations':
+      return getArchivedReservations(params);
+    case 'archiveReservations':
+      return moveToArchive(params.older_than_days); // handleRequest already holds the all-scopes lock
+    case 'getItems':
+      return getItems();
+    case 'getStaff':
+      return getStaff();
+    case 'getAvailability':
+      return getAvailability(params.items, params.start_time, params.end_time, params.exclude_tx_id);
+    case 'getMetrics':
+      return getMetrics();
+    case 'createReservation':
+      return createReservation(params.reservation);
+    case 'updateReservation':
+      return updateReservation(params.reservation);
+    case 'cancelReservation':
+      return cancelReservation(params.tx_id);
+    case 'deleteReservation':
+      return deleteReservation(params.tx_id);
+    case 'restoreReservation':
+      return restoreReservation(params.tx_id);
+    case 'completeReservation':
+      return completeReservation(params.tx_id, params.return_notes, params.completed_by);
+    case 'completeReservations':
+      return completeReservations(params.tx_ids, params.return_notes, params.completed_by);
+    case 'cancelReservations':
+      return cancelReservations(params.tx_ids);
+    case 'restoreReservations':
+      return restoreReservations(params.tx_ids);
+    default:
+      return { status: 'error', message: 'Invalid action' };
+  }
+}
+
+// --- Metrics ---
+
+const METRICS_KEY_PREFIX = 'metrics_'; // One cache entry per action, so actions don't overwrite each other
+const METRICS_SAMPLES = 100; // Most recent sampled requests kept per action for percentiles
+const METRICS_SAMPLE_RATE = 0.1; // Share of successful requests recorded; failures are always counted
+const METRICS_TTL = 21600; // 6 hours (CacheService maximum)
+
+// Sheets calls made by this execution (every request runs in its own)
+const sheetCalls = { reads: 0, writes: 0 };
+
+function readValues(range) {
+  sheetCalls.reads++;
+  return range.getValues();
+}
+
+function writeValues(range, values) {
+  sheetCalls.writes++;
+  return range.setValues(values);
+}
+
+function deleteSheetRows(sheet, row, count) {
+  sheetCalls.writes++;
+  sheet.deleteRows(row, count);
+}
+
+/**
+ * Returns this request's own numbers for the response and, for a sample of
+ * requests, adds them to the action's aggregate in the script cache.
+ * Successful requests are sampled so most skip the cache round-trip; failed and
+ * busy ones always bump the failure count. The update is unlocked, so two
+ * concurrent requests for the same action can drop a sample. The cache time is
+ * reported separately as metrics_ms, as duration_ms was taken before it.
+ */
+function recordMetrics(action, status, startedAt, lockWaitMs) {
+  const meta = {
+    action: action,
+    duration_ms: Date.now() - startedAt,
+    lock_wait_ms: lockWaitMs,
+    sheet_reads: sheetCalls.reads,
+    sheet_writes: sheetCalls.writes,
+    metrics_ms: 0
+  };
+  const known = READ_ACTIONS.indexOf(action) !== -1 || WRITE_ACTIONS.indexOf(action) !== -1;
+  const sampled = Math.random() < METRICS_SAMPLE_RATE;
+  if (!known || (status === 'success' && !sampled)) return meta;
+
+  const metricsStart = Date.now();
+  try {
+    const cache = CacheService.getScriptCache();
+    const key = METRICS_KEY_PREFIX + action;
+    const m = JSON.parse(cache.get(key) || 'null') || { successes: 0, failures: 0, samples: [] };
+    if (status === 'success') m.successes++;
+    else m.failures++;
+    if (sampled) {
+      m.samples.push([meta.duration_ms, meta.lock_wait_ms, meta.sheet_reads, meta.sheet_writes]);
+      if (m.samples.length > METRICS_SAMPLES) m.samples.splice(0, m.samples.length - METRICS_SAMPLES);
+    }
+    cache.put(key, JSON.stringify(m), METRICS_TTL);
+  } catch (e) {
+    // Metrics must never fail a request
+  }
+  meta.metrics_ms = Date.now() - metricsStart;
+  return meta;
+}
+
+// Nearest-rank percentile of an unsorted list
+function percentile(values, p) {
+  if (values.length === 0) return 0;
+  const sorted = values.slice().sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1)];
+}
+
+// Per-action aggregates recorded by handleRequest. Counts are estimates:
+// successes are scaled up from the sample, failures are exact.
+function getMetrics() {
+  const actions = READ_ACTIONS.concat(WRITE_ACTIONS).sort();
+  const cached = CacheService.getScriptCache().getAll(actions.map(action => METRICS_KEY_PREFIX + action));
+  const mean = values => values.length ? values.reduce((a, b) => a + b, 0) / values.length : 0;
+  const data = actions.filter(action => cached[METRICS_KEY_PREFIX + action]).map(action => {
+    const m = JSON.parse(cached[METRICS_KEY_PREFIX + action]);
+    const column = i => m.samples.map(s => s[i]);
+    return {
+      action: action,
+      count: Math.round(m.successes / METRICS_SAMPLE_RATE) + m.failures,
+      failures: m.failures,
+      samples: m.samples.length,
+      p50_ms: percentile(column(0), 50),
+      p95_ms: percentile(column(0), 95),
+      lock_wait_p95_ms: percentile(column(1), 95),
+      avg_sheet_reads: mean(column(2)),
+      avg_sheet_writes: mean(column(3))
+    };
+  });
+  return { status: 'success', data: data };
+}
+
+// --- Locking ---
+
+const SCOPE_LOCKS_KEY = 'scope_locks';
+const SCOPE_LOCK_TTL_MS = 390000; // Past the 6-minute execution limit, so only crashed executions' entries expire
+const ALL_SCOPES = '*';
+
+/**
+ * Writes are serialized per resource_type rather than globally, so a slow
+ * Guest Suite write doesn't hold up a kayak checkout. Deletes shift every
+ * row below them, so they take the exclusive '*' scope.
+ */
+function getWriteScope(action, params) {
+  if (action === 'deleteReservation') return ALL_SCOPES;
+  if (params.tx_ids) return ALL_SCOPES; // Bulk actions can span resource types
+  if (action === 'archiveReservations') return ALL_SCOPES; // Rewrites the whole sheet
+  const res = params.reservation;
+  if (action === 'createReservation' && res && res.resource_type) {
+    return res.resource_type.toLowerCase();
+  }
+
+  // Existing rows are locked by the type they are stored under, not the incoming one
+  const tx_id = params.tx_id || (res && res.tx_id);
+  if (tx_id) {
+    // Unlocked lookup just to pick the scope; the action re-reads its rows once locked
+    const located = locateTxRows(getDb().getSheetByName('reservations'), tx_id);
+    if (!located) return ALL_SCOPES;
+    const stored = (located.values[0][10] || '').toLowerCase(); // Column K (resource_type)
+    if (res && res.resource_type && res.resource_type.toLowerCase() !== stored) {
+      return ALL_SCOPES; // Changing type touches both scopes
+    }
+    return stored;
+  }
+  return ALL_SCOPES;
+}
+
+/**
+ * Named locks kept in script properties (durable, unlike the cache). The script
+ * lock is only held for the few milliseconds it takes to read and update the
+ * registry, never for the duration of the action. Returns a release token, or
+ * null on timeout.
+ */
+function acquireScopeLock(scope, waitMs) {
+  const props = PropertiesService.getScriptProperties();
+  const token = Utilities.getUuid();
+  const deadline = Date.now() + waitMs;
+
+  while (true) {
+    let registered = false;
+    try {
+      registered = withScriptLock(() => {
+        const now = Date.now();
+        const held = JSON.parse(props.getProperty(SCOPE_LOCKS_KEY) || '{}');
+        Object.keys(held).forEach(k => {
+          if (held[k].expires < now) delete held[k];
+        });
+
+        const blocked = scope === ALL_SCOPES
+          ? Object.keys(held).length > 0
+          : Boolean(held[scope] || held[ALL_SCOPES]);
+        if (blocked) return false;
+
+        held[scope] = { token: token, expires: now + SCOPE_LOCK_TTL_MS };
+        props.setProperty(SCOPE_LOCKS_KEY, JSON.stringify(held));
+        return true;
+      }, Math.max(1, deadline - Date.now()));
+    } catch (e) {
+      if (e.message !== BUSY_MESSAGE) throw e;
+    }
+
+    if (registered) return token;
+    if (Date.now() >= deadline) return null;
+    Utilities.sleep(200);
+  }
+}
+
+function releaseScopeLock(scope, token) {
+  const props = PropertiesService.getScriptProperties();
+  try {
+    withScriptLock(() => {
+      const held = JSON.parse(props.getProperty(SCOPE_LOCKS_KEY) || '{}');
+      if (held[scope] && held[scope].token === token) {
+        delete held[scope];
+        props.setProperty(SCOPE_LOCKS_KEY, JSON.stringify(held));
+      }
+    });
+  } catch (e) {
+    // Could not get the script lock; the entry expires on its own
+  }
+}
+
+/**
+ * Runs fn while holding the script lock. Throws BUSY_MESSAGE if the lock
+ * can't be obtained in time instead of running unlocked.
+ */
+function withScriptLock(fn, waitMs = LOCK_WAIT_MS) {
+  const lock = LockService.getScriptLock();
+  if (!lock.tryLock(waitMs)) throw new Error(BUSY_MESSAGE);
+  try {
+    return fn();
   } finally {
     lock.releaseLock();
   }
@@ -74,23 +309,216 @@ function handleRequest(e) {
 
 // --- Data Access ---
 
-function getReservations() {
+const DEFAULT_PAGE_SIZE = 500;
+
+/**
+ * Returns reservations ordered by end_time, optionally narrowed to a window.
+ * The range is on end_time so that `from` alone returns everything still
+ * running or upcoming at that date:
+ * - from: end_time >= from
+ * - before: end_time < before
+ * - status: a status or array of statuses
+ * - limit / cursor: page size and the `cursor` returned by the previous page
+ * With no options, behaves as before and returns every row.
+ */
+function getReservations(params = {}) {
   const sheet = getDb().getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
+  const data = readValues(sheet.getDataRange());
   const headers = data.shift();
   
-  const reservations = data.map(row => {
+  const paged = params.from || params.before || params.status || params.limit || params.cursor;
+  if (!paged) {
+    const reservations = data.map(row => {
+      let obj = {};
+      headers.forEach((h, i) => obj[h] = row[i]);
+      return obj;
+    });
+    return { status: 'success', data: reservations };
+  }
+  
+  const from = params.from ? new Date(params.from).getTime() : -Infinity;
+  const before = params.before ? new Date(params.before).getTime() : Infinity;
+  const statuses = params.status ? [].concat(params.status) : null;
+  const limit = Math.max(1, parseInt(params.limit, 10) || DEFAULT_PAGE_SIZE);
+  
+  // Cursor is "<end ms>|<sheet row>" of the last row on the previous page
+  let afterEnd = -Infinity, afterRow = 0;
+  if (params.cursor) {
+    const parts = String(params.cursor).split('|');
+    afterEnd = Number(parts[0]);
+    afterRow = Number(parts[1]);
+  }
+  
+  const matches = [];
+  data.forEach((row, i) => {
+    const end = new Date(row[5]).getTime(); // Column F (end_time)
+    if (isNaN(end) || end < from || end >= before) return;
+    if (statuses && statuses.indexOf(row[2]) === -1) return;
+    const sheetRow = i + 2; // 1-based, after header
+    if (end < afterEnd || (end === afterEnd && sheetRow <= afterRow)) return;
+    matches.push({ end: end, sheetRow: sheetRow, row: row });
+  });
+  matches.sort((a, b) => a.end - b.end || a.sheetRow - b.sheetRow);
+  
+  const page = matches.slice(0, limit);
+  const reservations = page.map(m => {
     let obj = {};
-    headers.forEach((h, i) => obj[h] = row[i]);
+    headers.forEach((h, i) => obj[h] = m.row[i]);
     return obj;
   });
+  const last = page[page.length - 1];
+  const cursor = matches.length > limit ? `${last.end}|${last.sheetRow}` : null;
   
-  return { status: 'success', data: reservations };
+  return { status: 'success', data: reservations, cursor: cursor };
+}
+
+// --- Archive ---
+// Complete/Cancelled reservations that ended more than ARCHIVE_AFTER_DAYS ago move
+// to the reservations_archive sheet, so the live sheet (scanned by every lookup
+// and availability check) only holds current work. Run daily by a time-driven
+// trigger (see installArchiveTrigger); archived rows stay queryable through
+// getArchivedReservations.
+
+const ARCHIVE_SHEET = 'reservations_archive';
+const ARCHIVE_AFTER_DAYS = 90; // Default; override with the ARCHIVE_AFTER_DAYS script property
+const TERMINAL_STATUSES = ['Complete', 'Cancelled'];
+
+function archiveReservations() {
+  // Trigger entry point: not routed through handleRequest, so take the all-scopes lock here
+  const token = acquireScopeLock(ALL_SCOPES, LOCK_WAIT_MS);
+  if (!token) return { status: 'busy', message: BUSY_MESSAGE };
+  try {
+    return moveToArchive();
+  } finally {
+    releaseScopeLock(ALL_SCOPES, token);
+  }
+}
+
+/**
+ * Moves terminal reservations older than the cutoff to the archive sheet.
+ * All rows of a tx_id move together. One read of the live sheet, one append
+ * to the archive and one rewrite of the live sheet. Caller holds the all-scopes lock.
+ */
+function moveToArchive(olderThanDays) {
+  const days = Number(olderThanDays) ||
+    Number(PropertiesService.getScriptProperties().getProperty('ARCHIVE_AFTER_DAYS')) ||
+    ARCHIVE_AFTER_DAYS;
+  const cutoff = Date.now() - days * 24 * 60 * 60 * 1000;
+
+  const db = getDb();
+  const sheet = db.getSheetByName('reservations');
+  const data = readValues(sheet.getDataRange());
+  const headers = data[0];
+
+  // A tx_id is archived only if every one of its rows qualifies
+  const keepTx = {};
+  data.forEach((row, i) => {
+    if (i === 0) return;
+    const end = new Date(row[5]).getTime(); // Column F (end_time)
+    const done = TERMINAL_STATUSES.indexOf(row[2]) !== -1 && !isNaN(end) && end < cutoff;
+    if (!done) keepTx[row[TX_ID_COL - 1]] = true;
+  });
+
+  const archived = [];
+  const archivedRows = []; // 1-based, ascending
+  data.forEach((row, i) => {
+    if (i === 0) return;
+    const tx_id = row[TX_ID_COL - 1];
+    if (!tx_id || keepTx[tx_id]) return;
+    archived.push(row);
+    archivedRows.push(i + 1);
+  });
+  if (archived.length === 0) return { status: 'success', archived: 0 };
+
+  let archive = db.getSheetByName(ARCHIVE_SHEET);
+  if (!archive) {
+    archive = db.insertSheet(ARCHIVE_SHEET);
+    writeValues(archive.getRange(1, 1, 1, headers.length), [headers]);
+  }
+
+  // Append to the archive first: a failure after this leaves duplicates, never lost rows
+  writeValues(archive.getRange(archive.getLastRow() + 1, 1, archived.length, headers.length), archived);
+
+  // Delete each contiguous run of archived rows, bottom-up so the rows above keep their
+  // positions. Readers take no lock, but every deleteRows is a single step, so they see
+  // live rows either in place or gone; never duplicated as a rewrite of the sheet would.
+  const runs = [];
+  archivedRows.forEach(row => {
+    const run = runs[runs.length - 1];
+    if (run && run.start + run.count === row) run.count++;
+    else runs.push({ start: row, count: 1 });
+  });
+  for (let i = runs.length - 1; i >= 0; i--) {
+    deleteSheetRows(sheet, runs[i].start, runs[i].count);
+  }
+
+  // Row positions shifted
+  rebuildRowIndex(sheet);
+
+  return { status: 'success', archived: archived.length };
+}
+
+/**
+ * Run once from the Apps Script editor to archive daily at ~2am.
+ */
+function installArchiveTrigger() {
+  ScriptApp.getProjectTriggers()
+    .filter(t => t.getHandlerFunction() === 'archiveReservations')
+    .forEach(t => ScriptApp.deleteTrigger(t));
+  ScriptApp.newTrigger('archiveReservations').timeBased().everyDays(1).atHour(2).create();
+}
+
+/**
+ * Archived reservations, newest end_time first, one page at a time.
+ * - search: case-insensitive match on rented_to, item or scheduled_by
+ * - from / before: end_time range
+ * - limit / cursor: page size and the `cursor` returned by the previous page
+ */
+function getArchivedReservations(params = {}) {
+  const archive = getDb().getSheetByName(ARCHIVE_SHEET);
+  if (!archive || archive.getLastRow() < 2) return { status: 'success', data: [], cursor: null };
+
+  const data = readValues(archive.getDataRange());
+  const headers = data.shift();
+  const from = params.from ? new Date(params.from).getTime() : -Infinity;
+  const before = params.before ? new Date(params.before).getTime() : Infinity;
+  const search = params.search ? String(params.search).toLowerCase() : '';
+  const limit = Math.max(1, parseInt(params.limit, 10) || DEFAULT_PAGE_SIZE);
+
+  // Cursor is "<end ms>|<sheet row>" of the last row on the previous page (descending)
+  let beforeEnd = Infinity, beforeRow = Infinity;
+  if (params.cursor) {
+    const parts = String(params.cursor).split('|');
+    beforeEnd = Number(parts[0]);
+    beforeRow = Number(parts[1]);
+  }
+
+  const matches = [];
+  data.forEach((row, i) => {
+    const end = new Date(row[5]).getTime();
+    if (isNaN(end) || end < from || end >= before) return;
+    const sheetRow = i + 2;
+    if (end > beforeEnd || (end === beforeEnd && sheetRow >= beforeRow)) return;
+    if (search && [row[0], row[1], row[3]].join('\n').toLowerCase().indexOf(search) === -1) return;
+    matches.push({ end: end, sheetRow: sheetRow, row: row });
+  });
+  matches.sort((a, b) => b.end - a.end || b.sheetRow - a.sheetRow);
+
+  const page = matches.slice(0, limit);
+  const reservations = page.map(m => {
+    let obj = {};
+    headers.forEach((h, i) => obj[h] = m.row[i]);
+    return obj;
+  });
+  const last = page[page.length - 1];
+  const cursor = matches.length > limit ? `${last.end}|${last.sheetRow}` : null;
+
+  return { status: 'success', data: reservations, cursor: cursor };
 }
 
 function getItems() {
   const sheet = getDb().getSheetByName('rentable_items');
-  const data = sheet.getDataRange().getValues();
+  const data = readValues(sheet.getDataRange());
   const headers = data.shift();
 
   const items = data.map(row => {
@@ -104,7 +532,7 @@ function getItems() {
 
 function getStaff() {
   const sheet = getDb().getSheetByName('staff');
-  const data = sheet.getDataRange().getValues();
+  const data = readValues(sheet.getDataRange());
   const headers = data.shift();
 
   const staff = data.map(row => {
@@ -146,10 +574,11 @@ function createReservation(res) {
   res.start_time = start.toISOString();
   res.end_time = end.toISOString();
   
-  // 1. Validate Logic (Check all items)
+  // 1. Validate Logic (Check all items against one snapshot of the sheet)
+  const index = buildAvailabilityIndex(readReservationRows(db));
   for (const item of items) {
     const singleRes = { ...res, item: item };
-    const validation = validateReservation(singleRes, db);
+    const validation = validateReservation(singleRes, db, null, index);
     if (!validation.valid) {
       return { status: 'error', message: validation.message };
     }
@@ -170,11 +599,12 @@ function createReservation(res) {
   // 3. Generate ID
   const tx_id = Utilities.getUuid();
   
-  // 4. Save
+  // 4. Save (all items in a single multi-row append)
   const sheet = db.getSheetByName('reservations');
+  const batch = createWriteBatch(sheet);
   
   items.forEach(item => {
-    sheet.appendRow([
+    batch.append([
       res.rented_to,             // A - rented_to
       item,                      // B - item
       'Scheduled',               // C - status
@@ -192,6 +622,8 @@ function createReservation(res) {
       tx_id                      // O - tx_id
     ]);
   });
+  const firstRow = batch.flush().appendedRow;
+  rememberTxRows(tx_id, items.map((item, i) => firstRow + i));
   
   return { status: 'success', tx_id: tx_id };
 }
@@ -199,11 +631,18 @@ function createReservation(res) {
 function updateReservation(res) {
   const db = getDb();
   const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
   
-  // Find row index (1-based)
-  const rowIndex = data.findIndex(row => row[14] === res.tx_id); // Column O (tx_id)
-  if (rowIndex === -1) return { status: 'error', message: 'Reservation not found' };
+  // Find row (1-based) via the tx_id index
+  const located = locateTxRows(sheet, res.tx_id);
+  if (!located) return { status: 'error', message: 'Reservation not found' };
+  
+  // Optimistic check: reject edits made against an outdated copy of the row. The
+  // scope lock only serializes writers; it can't tell that this edit started from
+  // a copy someone else has since changed.
+  if (res.expected_last_update !== undefined &&
+      versionOf(located.values[0][13]) !== versionOf(res.expected_last_update)) { // Column N (last_update)
+    return { status: 'conflict', message: 'Reservation was changed by someone else. Please refresh and try again.' };
+  }
   
   // Enforce Time Defaults (Same as create)
   const type = res.resource_type.toLowerCase();
@@ -225,48 +664,51 @@ function updateReservation(res) {
   
   const cost = calculateCost(res);
   
-  // Update row
-  const sheetRow = rowIndex + 1;
+  // Update row (flushed as one contiguous block)
+  const sheetRow = located.rows[0];
+  const batch = createWriteBatch(sheet);
 
-  sheet.getRange(sheetRow, 1).setValue(res.rented_to);
-  sheet.getRange(sheetRow, 2).setValue(res.item);
+  batch.set(sheetRow, 1, res.rented_to);
+  batch.set(sheetRow, 2, res.item);
   if (res.scheduled_by) {
-    sheet.getRange(sheetRow, 4).setValue(res.scheduled_by);
+    batch.set(sheetRow, 4, res.scheduled_by);
   }
-  sheet.getRange(sheetRow, 5).setValue(res.start_time);
-  sheet.getRange(sheetRow, 6).setValue(res.end_time);
-  sheet.getRange(sheetRow, 7).setValue(cost);
-  sheet.getRange(sheetRow, 9).setValue(res.rental_notes);
-  sheet.getRange(sheetRow, 11).setValue(res.resource_type);
-  sheet.getRange(sheetRow, 12).setValue(res.override_lock);
+  batch.set(sheetRow, 5, res.start_time);
+  batch.set(sheetRow, 6, res.end_time);
+  batch.set(sheetRow, 7, cost);
+  batch.set(sheetRow, 9, res.rental_notes);
+  batch.set(sheetRow, 11, res.resource_type);
+  batch.set(sheetRow, 12, res.override_lock);
 
   // Track edits
   if (res.edit_by) {
-    sheet.getRange(sheetRow, 13).setValue(res.edit_by); // Column M
+    batch.set(sheetRow, 13, res.edit_by); // Column M
   }
   if (res.last_update) {
-    sheet.getRange(sheetRow, 14).setValue(res.last_update); // Column N
+    batch.set(sheetRow, 14, res.last_update); // Column N
   }
+  batch.flush();
 
   return { status: 'success' };
 }
 
+// Normalizes a last_update cell (Date, string or empty) for version comparison
+function versionOf(value) {
+  if (value === '' || value === null || value === undefined) return '';
+  const t = new Date(value).getTime();
+  return isNaN(t) ? String(value) : String(t);
+}
+
 function cancelReservation(tx_id) {
   const db = getDb();
   const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
   
   // Find ALL rows with this tx_id
-  const rowsToUpdate = [];
-  data.forEach((row, i) => {
-    if (row[14] === tx_id) rowsToUpdate.push(i + 1); // Column O (tx_id)
-  });
-  
-  if (rowsToUpdate.length === 0) return { status: 'error', message: 'Reservation not found' };
+  const located = locateTxRows(sheet, tx_id);
+  if (!located) return { status: 'error', message: 'Reservation not found' };
   
   // Use first row for logic
-  const firstRowIndex = rowsToUpdate[0] - 1;
-  const row = data[firstRowIndex];
+  const row = located.values[0];
   const start = new Date(row[4]);
   const now = new Date();
   const hoursDiff = (start - now) / (1000 * 60 * 60);
@@ -279,12 +721,12 @@ function cancelReservation(tx_id) {
     if (type === 'sky_lounge') fee = 150;
   }
   
-  rowsToUpdate.forEach(r => {
-    sheet.getRange(r, 3).setValue('Cancelled');
-    sheet.getRange(r, 7).setValue(fee); // Apply fee to all? Or just one?
-    // If multi-item gear shed, fee is 0 anyway.
-    // If Guest Suite/Sky Lounge, it's single item.
+  const batch = createWriteBatch(sheet);
+  located.rows.forEach((r, i) => {
+    batch.set(r, 3, 'Cancelled');
+    batch.set(r, 7, fee); // Multi-item Gear Shed fee is 0; Guest Suite/Sky Lounge are single item
   });
+  batch.flush();
   
   return { status: 'success', fee: fee };
 }
@@ -292,42 +734,35 @@ function cancelReservation(tx_id) {
 function deleteReservation(tx_id) {
   const db = getDb();
   const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
-
-  // Find ALL rows with this tx_id (collect row indices)
-  const rowsToDelete = [];
-  data.forEach((row, i) => {
-    if (i === 0) return; // Skip header row
-    if (row[14] === tx_id) rowsToDelete.push(i + 1); // Column O (tx_id), 1-based row index
-  });
 
-  if (rowsToDelete.length === 0) {
+  // Find ALL rows with this tx_id (1-based row indices)
+  const located = locateTxRows(sheet, tx_id);
+  if (!located) {
     return { status: 'error', message: 'Reservation not found' };
   }
+  const rowsToDelete = located.rows.slice();
 
   // Delete rows in reverse order to avoid index shifting issues
   rowsToDelete.reverse().forEach(rowIndex => {
-    sheet.deleteRow(rowIndex);
+    deleteSheetRows(sheet, rowIndex, 1);
   });
 
+  // Rows below shifted up; their index entries fail validation and are rebuilt on next lookup
+  forgetTxRows(tx_id);
+
   return { status: 'success', message: `Deleted ${rowsToDelete.length} row(s)` };
 }
 
 function restoreReservation(tx_id) {
   const db = getDb();
   const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
 
   // Find ALL rows with this tx_id
-  const rowsToRestore = [];
-  data.forEach((row, i) => {
-    if (i === 0) return; // Skip header row
-    if (row[14] === tx_id) rowsToRestore.push({ index: i + 1, row: row }); // Column O (tx_id), 1-based row index
-  });
-
-  if (rowsToRestore.length === 0) {
+  const located = locateTxRows(sheet, tx_id);
+  if (!located) {
     return { status: 'error', message: 'Reservation not found' };
   }
+  const rowsToRestore = located.rows.map((index, i) => ({ index: index, row: located.values[i] }));
 
   // Use first row for validation and cost recalculation
   const firstRow = rowsToRestore[0].row;
@@ -354,11 +789,13 @@ function restoreReservation(tx_id) {
   const cost = calculateCost(res);
 
   // Restore all rows with this tx_id
+  const batch = createWriteBatch(sheet);
   rowsToRestore.forEach(item => {
     const rowIndex = item.index;
-    sheet.getRange(rowIndex, 3).setValue('Scheduled'); // Status column (C)
-    sheet.getRange(rowIndex, 7).setValue(cost); // Cost column (G)
+    batch.set(rowIndex, 3, 'Scheduled'); // Status column (C)
+    batch.set(rowIndex, 7, cost); // Cost column (G)
   });
+  batch.flush();
 
   return { status: 'success', message: `Restored ${rowsToRestore.length} row(s)` };
 }
@@ -366,45 +803,165 @@ function restoreReservation(tx_id) {
 function completeReservation(tx_id, return_notes, completed_by) {
   const db = getDb();
   const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
 
   // Find ALL rows with this tx_id
-  const rowsToComplete = [];
-  data.forEach((row, i) => {
-    if (i === 0) return; // Skip header row
-    if (row[14] === tx_id) rowsToComplete.push(i + 1); // Column O (tx_id), 1-based row index
-  });
-
-  if (rowsToComplete.length === 0) {
+  const located = locateTxRows(sheet, tx_id);
+  if (!located) {
     return { status: 'error', message: 'Reservation not found' };
   }
+  const rowsToComplete = located.rows;
 
   // Update all rows with this tx_id
-  rowsToComplete.forEach(rowIndex => {
-    sheet.getRange(rowIndex, 3).setValue('Complete'); // Column C (status)
-    sheet.getRange(rowIndex, 8).setValue(completed_by || 'Staff'); // Column H (completed_by)
-    sheet.getRange(rowIndex, 10).setValue(return_notes || ''); // Column J (return_notes)
+  const batch = createWriteBatch(sheet);
+  rowsToComplete.forEach((rowIndex, i) => {
+    batch.set(rowIndex, 3, 'Complete'); // Column C (status)
+    batch.set(rowIndex, 8, completed_by || 'Staff'); // Column H (completed_by)
+    batch.set(rowIndex, 10, return_notes || ''); // Column J (return_notes)
   });
+  batch.flush();
 
   return { status: 'success', message: `Completed ${rowsToComplete.length} row(s)` };
 }
 
-function validateReservation(res, db, excludeTxId = null) {
+// --- Bulk Actions ---
+// One sheet read and one batched write for any number of tx_ids.
+// Each returns { status, updated: [tx_id], failed: [{ tx_id, message }] }.
+
+function completeReservations(tx_ids, return_notes, completed_by) {
+  const sheet = getDb().getSheetByName('reservations');
+  const data = readValues(sheet.getDataRange());
+  const groups = groupTxRows(data, tx_ids);
+  const eligible = requireStatus(groups, data, 'Scheduled'); // Cancelled/Complete rows keep their fees and notes
+
+  const batch = createWriteBatch(sheet);
+  eligible.ok.forEach(tx_id => {
+    groups.rows[tx_id].forEach(rowIndex => {
+      batch.set(rowIndex, 3, 'Complete'); // Column C (status)
+      batch.set(rowIndex, 8, completed_by || 'Staff'); // Column H (completed_by)
+      batch.set(rowIndex, 10, return_notes || ''); // Column J (return_notes)
+    });
+  });
+  batch.flush();
+
+  return bulkResult(eligible.ok, groups.missing, eligible.failed);
+}
+
+function cancelReservations(tx_ids) {
+  const sheet = getDb().getSheetByName('reservations');
+  const data = readValues(sheet.getDataRange());
+  const groups = groupTxRows(data, tx_ids);
+  const eligible = requireStatus(groups, data, 'Scheduled'); // Never charge a fee on a Complete rental
+  const now = new Date();
+  const fees = {};
+
+  const batch = createWriteBatch(sheet);
+  eligible.ok.forEach(tx_id => {
+    const rows = groups.rows[tx_id];
+    const first = data[rows[0] - 1];
+    const hoursDiff = (new Date(first[4]) - now) / (1000 * 60 * 60);
+    const type = (first[10] || '').toLowerCase();
+
+    // Same fee rules as cancelReservation
+    let fee = 0;
+    if (hoursDiff < 72) {
+      if (type === 'guest_suite') fee = 75;
+      if (type === 'sky_lounge') fee = 150;
+    }
+    fees[tx_id] = fee;
+
+    rows.forEach(rowIndex => {
+      batch.set(rowIndex, 3, 'Cancelled');
+      batch.set(rowIndex, 7, fee);
+    });
+  });
+  batch.flush();
+
+  const result = bulkResult(eligible.ok, groups.missing, eligible.failed);
+  result.fees = fees;
+  return result;
+}
+
+function restoreReservations(tx_ids) {
+  const db = getDb();
+  const sheet = db.getSheetByName('reservations');
+  const data = readValues(sheet.getDataRange());
+  const groups = groupTxRows(data, tx_ids);
+  const eligible = requireStatus(groups, data, 'Cancelled');
+
+  // Only Cancelled rows are restored, so the index over current bookings already leaves them out
+  const index = buildAvailabilityIndex(data);
+  const accepted = [data[0]]; // Header + rows restored so far, so restores can't collide with each other
+  const restored = [];
+  const failed = groups.missing.map(tx_id => ({ tx_id: tx_id, message: 'Reservation not found' })).concat(eligible.failed);
+
+  const batch = createWriteBatch(sheet);
+  eligible.ok.forEach(tx_id => {
+    const rows = groups.rows[tx_id];
+    const firstRow = data[rows[0] - 1];
+    const res = {
+      tx_id: tx_id,
+      rented_to: firstRow[0],
+      item: firstRow[1],
+      resource_type: firstRow[10],
+      start_time: firstRow[4],
+      end_time: firstRow[5],
+      rental_notes: firstRow[8],
+      override_lock: firstRow[11]
+    };
+
+    let validation = validateReservation(res, db, tx_id, index);
+    if (validation.valid && accepted.length > 1) {
+      validation = validateReservation(res, db, tx_id, buildAvailabilityIndex(accepted));
+    }
+    if (!validation.valid) {
+      failed.push({ tx_id: tx_id, message: `Cannot restore: ${validation.message}` });
+      return;
+    }
+
+    const cost = calculateCost(res);
+    rows.forEach(rowIndex => {
+      const row = data[rowIndex - 1];
+      batch.set(rowIndex, 3, 'Scheduled'); // Status column (C)
+      batch.set(rowIndex, 7, cost); // Cost column (G)
+      const active = row.slice();
+      active[2] = 'Scheduled';
+      accepted.push(active);
+    });
+    restored.push(tx_id);
+  });
+  batch.flush();
+
+  return { status: 'success', updated: restored, failed: failed };
+}
+
+function bulkResult(updated, missing, failed = []) {
+  return {
+    status: 'success',
+    updated: updated,
+    failed: missing.map(tx_id => ({ tx_id: tx_id, message: 'Reservation not found' })).concat(failed)
+  };
+}
+
+// Splits found tx_ids into those currently in `status` (ok) and failures for the rest
+function requireStatus(groups, data, status) {
+  const ok = [];
+  const failed = [];
+  groups.found.forEach(tx_id => {
+    const current = data[groups.rows[tx_id][0] - 1][2]; // Column C (status)
+    if (current === status) ok.push(tx_id);
+    else failed.push({ tx_id: tx_id, message: `Reservation is ${current || 'not active'}, not ${status}` });
+  });
+  return { ok: ok, failed: failed };
+}
+
+function validateReservation(res, db, excludeTxId = null, index = null) {
   const start = new Date(res.start_time);
   const end = new Date(res.end_time);
   
   if (start >= end) return { valid: false, message: 'End time must be after start time.' };
   
-  const sheet = db.getSheetByName('reservations');
-  const data = sheet.getDataRange().getValues();
-  
-  const activeRes = data.filter((row, i) => {
-    if (i === 0) return false;
-    if (row[2] === 'Cancelled') return false;
-    if (row[2] === 'Complete') return false;
-    if (excludeTxId && row[14] === excludeTxId) return false; // Column O (tx_id)
-    return true;
-  });
+  // Build the index from a fresh read unless the caller already has one for this request
+  if (!index) index = buildAvailabilityIndex(readReservationRows(db), excludeTxId);
   
   const type = res.resource_type.toLowerCase();
   
@@ -424,14 +981,9 @@ function validateReservation(res, db, excludeTxId = null) {
     
     if (dayDiff < 2) return { valid: false, message: 'Guest Suite requires 2-night minimum.' };
     
-    const hasOverlap = activeRes.some(row => {
-      const rType = (row[10] || '').toLowerCase();
-      if (rType !== 'guest_suite') return false;
-      const rStart = new Date(row[4]);
-      const rEnd = new Date(row[5]);
-      return (start < rEnd && end > rStart);
-    });
-    if (hasOverlap) return { valid: false, message: 'Guest Suite is already booked.' };
+    if (index.typeOverlaps('guest_suite', start, end)) {
+      return { valid: false, message: 'Guest Suite is already booked.' };
+    }
   }
   
   if (type === 'sky_lounge') {
@@ -447,61 +999,303 @@ function validateReservation(res, db, excludeTxId = null) {
         // I'll stick to original constraint 10am-6pm start window unless overridden.
     }
     
-    if (!res.override_lock) {
-      const dayStr = start.toDateString();
-      const hasBookingOnDay = activeRes.some(row => {
-        const rType = (row[10] || '').toLowerCase();
-        if (rType !== 'sky_lounge') return false;
-        const rStart = new Date(row[4]);
-        return rStart.toDateString() === dayStr;
-      });
-      if (hasBookingOnDay) return { valid: false, message: 'Sky Lounge already booked for this day.' };
+    if (!res.override_lock && index.skyLoungeBookedOn(start)) {
+      return { valid: false, message: 'Sky Lounge already booked for this day.' };
     }
   }
   
   if (type === 'gear_shed') {
-    const hasOverlap = activeRes.some(row => {
-      if (row[1] !== res.item) return false;
-      const rStart = new Date(row[4]);
-      const rEnd = new Date(row[5]);
-      return (start < rEnd && end > rStart);
-    });
-    if (hasOverlap) return { valid: false, message: `${res.item} is not available.` };
+    if (index.itemOverlaps(res.item, start, end)) {
+      return { valid: false, message: `${res.item} is not available.` };
+    }
   }
   
   return { valid: true };
 }
 
-function calculateCost(res) {
-  const start = new Date(res.start_time);
-  const type = res.resource_type.toLowerCase();
+// --- Write Batching ---
+
+/**
+ * Collects cell writes for one request and flushes them as few range writes as possible.
+ * - set(row, col, value): queue a single cell (1-based row/col)
+ * - append(values): queue a new row; all appends go out in one multi-row write
+ * - flush(): write everything; returns { appendedRow } (first appended row or null)
+ * A row's changed columns go out as contiguous runs; unchanged columns between
+ * them are never rewritten, so a stale read can't clobber another writer's cells.
+ * Adjacent rows covering the same columns are merged into a single setValues call.
+ */
+function createWriteBatch(sheet) {
+  const cells = {};   // row -> { col: value }
+  const appends = [];
+
+  const rowBlocks = () => {
+    const blocks = [];
+    Object.keys(cells).map(Number).sort((a, b) => a - b).forEach(row => {
+      const cols = Object.keys(cells[row]).map(Number).sort((a, b) => a - b);
+      const runs = [];
+      cols.forEach(col => {
+        const last = runs[runs.length - 1];
+        if (last && col === last.to + 1) {
+          last.values.push(cells[row][col]);
+          last.to = col;
+        } else {
+          runs.push({ from: col, to: col, values: [cells[row][col]] });
+        }
+      });
+      runs.forEach(run => blocks.push({ row: row, from: run.from, to: run.to, values: [run.values] }));
+    });
+
+    // Merge vertically adjacent blocks with the same column span
+    const merged = [];
+    const openBySpan = {};
+    blocks.forEach(block => {
+      const span = block.from + ':' + block.to;
+      const prev = openBySpan[span];
+      if (prev && prev.row + prev.values.length === block.row) {
+        prev.values.push(block.values[0]);
+      } else {
+        merged.push(block);
+        openBySpan[span] = block;
+      }
+    });
+    return merged;
+  };
+
+  return {
+    set: (row, col, value) => {
+      if (!cells[row]) cells[row] = {};
+      cells[row][col] = value;
+    },
+    append: (values) => {
+      appends.push(values);
+    },
+    flush: () => {
+      rowBlocks().forEach(block => {
+        writeValues(sheet.getRange(block.row, block.from, block.values.length, block.to - block.from + 1), block.values);
+      });
+      let appendedRow = null;
+      if (appends.length > 0) {
+        const width = Math.max(...appends.map(r => r.length));
+        const rows = appends.map(r => r.concat(new Array(width - r.length).fill('')));
+        // Writers in other scopes may append concurrently, so claim the rows under the script lock
+        appendedRow = withScriptLock(() => {
+          const first = sheet.getLastRow() + 1;
+          writeValues(sheet.getRange(first, 1, rows.length, width), rows);
+          return first;
+        });
+      }
+      Object.keys(cells).forEach(k => delete cells[k]);
+      appends.length = 0;
+      return { appendedRow: appendedRow }; // First appended sheet row, if any
+    }
+  };
+}
+
+// --- Row Index (tx_id -> sheet rows) ---
+
+const TX_ID_COL = 15; // Column O
+const ROW_INDEX_PREFIX = 'txrows_';
+const ROW_INDEX_TTL = 21600; // 6 hours (CacheService maximum)
+const ROW_INDEX_PUT_MAX = 500; // CacheService.putAll limit on keys per call
+
+/**
+ * Finds the sheet rows for a tx_id without scanning the whole table.
+ * Row numbers come from a tx_id -> rows map in the script cache. Entries are
+ * validated by reading only the rows they point to; a miss or a stale entry
+ * (e.g. rows shifted by a delete) triggers a rebuild from column O alone.
+ * Returns { rows: [1-based row numbers], values: [row values] } or null.
+ */
+function locateTxRows(sheet, tx_id) {
+  if (!tx_id) return null;
+
+  const cached = CacheService.getScriptCache().get(ROW_INDEX_PREFIX + tx_id);
+  if (cached) {
+    const located = readTxRows(sheet, tx_id, JSON.parse(cached));
+    if (located) return located;
+  }
+
+  const rows = rebuildRowIndex(sheet)[tx_id];
+  return rows ? readTxRows(sheet, tx_id, rows) : null;
+}
+
+function readTxRows(sheet, tx_id, rows) {
+  if (!rows || rows.length === 0) return null;
+  const first = Math.min(...rows);
+  const last = Math.max(...rows);
+  if (first < 2 || last > sheet.getLastRow()) return null;
+
+  const block = readValues(sheet.getRange(first, 1, last - first + 1, sheet.getLastColumn()));
+  const values = rows.map(r => block[r - first]);
+  if (values.some(row => row[TX_ID_COL - 1] !== tx_id)) return null; // Stale entry
+
+  return { rows: rows.slice(), values: values };
+}
+
+function rebuildRowIndex(sheet) {
+  const lastRow = sheet.getLastRow();
+  const map = {};
+  if (lastRow >= 2) {
+    const ids = readValues(sheet.getRange(2, TX_ID_COL, lastRow - 1, 1));
+    ids.forEach((r, i) => {
+      const id = r[0];
+      if (!id) return;
+      if (!map[id]) map[id] = [];
+      map[id].push(i + 2); // 1-based, after header
+    });
+  }
+
+  cacheTxRows(map, Object.keys(map));
+  return map;
+}
+
+// Caches the row lists of `ids` (tx_id -> [row]), in putAll calls of at most ROW_INDEX_PUT_MAX keys
+function cacheTxRows(map, ids) {
+  const cache = CacheService.getScriptCache();
+  for (let i = 0; i < ids.length; i += ROW_INDEX_PUT_MAX) {
+    const chunk = {};
+    ids.slice(i, i + ROW_INDEX_PUT_MAX).forEach(id => chunk[ROW_INDEX_PREFIX + id] = JSON.stringify(map[id]));
+    cache.putAll(chunk, ROW_INDEX_TTL);
+  }
+}
+
+function rememberTxRows(tx_id, rows) {
+  CacheService.getScriptCache().put(ROW_INDEX_PREFIX + tx_id, JSON.stringify(rows), ROW_INDEX_TTL);
+}
+
+/**
+ * Rows (1-based) for several tx_ids from one full read of the sheet.
+ * Returns { rows: { tx_id: [row] }, found: [tx_id], missing: [tx_id] }.
+ */
+function groupTxRows(data, tx_ids) {
+  const wanted = {};
+  [].concat(tx_ids || []).forEach(id => wanted[id] = []);
+
+  data.forEach((row, i) => {
+    if (i === 0) return; // Header
+    const id = row[TX_ID_COL - 1];
+    if (wanted[id]) wanted[id].push(i + 1);
+  });
+
+  const found = Object.keys(wanted).filter(id => wanted[id].length > 0);
+  cacheTxRows(wanted, found);
+  return {
+    rows: wanted,
+    found: found,
+    missing: Object.keys(wanted).filter(id => wanted[id].length === 0)
+  };
+}
+
+function forgetTxRows(tx_id) {
+  CacheService.getScriptCache().remove(ROW_INDEX_PREFIX + tx_id);
+}
+
+// --- Availability Index ---
+
+function readReservationRows(db) {
+  return readValues(db.getSheetByName('reservations').getDataRange());
+}
+
+/**
+ * Builds an overlap index over active (non-Cancelled, non-Complete) rows.
+ * Each interval set is sorted by start with a running max of end times,
+ * so "does anything overlap [start, end)" is a binary search: find the
+ * intervals starting before `end`, then check if any of them ends after `start`.
+ * `data` is the raw sheet values including the header row.
+ */
+function buildAvailabilityIndex(data, excludeTxId = null) {
+  const byItem = {};
+  const byType = {};
+  const skyLoungeDays = {};
   
-  if (type === 'guest_suite') {
-    let cost = 0;
-    const end = new Date(res.end_time);
-    let current = new Date(start);
-    // Loop by day
-    // We need to count nights.
-    // 3pm Day 1 -> 11am Day 2 is 1 night (Day 1).
-    // So we check the day of "current".
-    // We stop before the checkout day.
+  data.forEach((row, i) => {
+    if (i === 0) return; // Skip header row
+    if (row[2] === 'Cancelled' || row[2] === 'Complete') return;
+    if (excludeTxId && row[14] === excludeTxId) return; // Column O (tx_id)
     
-    const checkoutDay = new Date(end); checkoutDay.setHours(0,0,0,0);
+    const rStart = new Date(row[4]).getTime();
+    const rEnd = new Date(row[5]).getTime();
+    if (isNaN(rStart) || isNaN(rEnd)) return;
     
-    while (current < checkoutDay) { // Compare dates only
-      const day = current.getDay();
-      if (day === 5 || day === 6) cost += 175; // Fri/Sat
-      else cost += 125;
-      current.setDate(current.getDate() + 1);
-      // Safety break
-      if (cost > 10000) break; 
-    }
-    return cost;
-  }
+    const rType = (row[10] || '').toLowerCase();
+    addInterval(byItem, row[1], rStart, rEnd);
+    addInterval(byType, rType, rStart, rEnd);
+    if (rType === 'sky_lounge') skyLoungeDays[new Date(rStart).toDateString()] = true;
+  });
   
-  if (type === 'sky_lounge') {
-    return 300;
+  Object.keys(byItem).forEach(k => finalizeIntervals(byItem[k]));
+  Object.keys(byType).forEach(k => finalizeIntervals(byType[k]));
+  
+  return {
+    itemOverlaps: (item, start, end) => intervalsOverlap(byItem[item], start, end),
+    typeOverlaps: (type, start, end) => intervalsOverlap(byType[type], start, end),
+    skyLoungeBookedOn: (date) => skyLoungeDays[new Date(date).toDateString()] === true
+  };
+}
+
+function addInterval(map, key, start, end) {
+  if (!map[key]) map[key] = [];
+  map[key].push([start, end]);
+}
+
+function finalizeIntervals(intervals) {
+  intervals.sort((a, b) => a[0] - b[0]);
+  let maxEnd = -Infinity;
+  intervals.forEach(iv => {
+    maxEnd = Math.max(maxEnd, iv[1]);
+    iv[2] = maxEnd; // Max end among this and all earlier-starting intervals
+  });
+}
+
+function intervalsOverlap(intervals, start, end) {
+  if (!intervals || intervals.length === 0) return false;
+  const s = new Date(start).getTime();
+  const e = new Date(end).getTime();
+  
+  // Count intervals with start < e
+  let lo = 0, hi = intervals.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (intervals[mid][0] < e) lo = mid + 1;
+    else hi = mid;
   }
+  if (lo === 0) return false;
+  return intervals[lo - 1][2] > s;
+}
+
+/**
+ * Bulk availability check for the item picker.
+ * Returns which of `items` are free for the whole of [start_time, end_time).
+ */
+function getAvailability(items, start_time, end_time, excludeTxId = null) {
+  const names = Array.isArray(items) ? items : [items];
+  const start = new Date(start_time);
+  const end = new Date(end_time);
+  if (isNaN(start.getTime()) || isNaN(end.getTime()) || start >= end) {
+    return { status: 'error', message: 'Invalid time range.' };
+  }
+  
+  const index = buildAvailabilityIndex(readReservationRows(getDb()), excludeTxId);
+  const available = [];
+  const unavailable = [];
+  names.forEach(name => {
+    if (index.itemOverlaps(name, start, end)) unavailable.push(name);
+    else available.push(name);
+  });
   
-  return 0;
+  return { status: 'success', data: { available: available, unavailable: unavailable } };
+}
+
+// Priced by Pricing (js/pricing.js, added to this project as pricing.gs), so the
+// rates live in one place for both the client and the backend.
+function calculateCost(res) {
+  return Pricing.cost(res.resource_type, scriptDate(res.start_time), scriptDate(res.end_time));
+}
+
+// 'YYYY-MM-DD' calendar date of a sheet Date or date string, in the script's time zone
+// (start_time may be stored as a UTC ISO string, whose own date prefix can be a day off)
+function scriptDate(value) {
+  if (value === '' || value === null || value === undefined) return '';
+  const d = value instanceof Date ? value : new Date(value);
+  if (isNaN(d.getTime())) return '';
+  return Utilities.formatDate(d, Session.getScriptTimeZone(), 'yyyy-MM-dd');
 }
@@ -4,23 +4,293 @@
  */
 
 const API = {
+    // Usage counters, kept in Metrics as 'firestore.reads' / 'firestore.writes'
+
+    // Count billed document reads; snapshots served from the local cache are free and an empty query costs one read
+    countReads: (snapshot, docs = Math.max(1, snapshot.size || 0)) => {
+        if (!snapshot.metadata.fromCache) Metrics.count('firestore.reads', docs);
+        return snapshot;
+    },
+
+    countWrites: (n) => Metrics.count('firestore.writes', n),
+
     // Methods
+
+    /**
+     * Fetch reservations, optionally narrowed to a window and paged.
+     * The range is on end_time, so `from` alone returns everything still
+     * running or upcoming at that date (see firestore.indexes.json).
+     * @param {Object} options
+     * @param {string} [options.from] - end_time >= from ('YYYY-MM-DDTHH:MM')
+     * @param {string} [options.before] - end_time < before
+     * @param {string|string[]} [options.status] - Status or statuses to include
+     * @param {number} [options.limit] - Page size; a `cursor` is returned when more pages exist
+     * @param {Array} [options.cursor] - Cursor returned by the previous page
+     * @param {number} [options.changedSince] - Only documents with updated_at after this (millis);
+     *     used on its own to fetch just the delta past a cached high-water mark
+     */
     getReservations: async (options = {}) => {
         try {
-            console.log('📡 Fetching reservations from Firestore...');
-            const snapshot = await db.collection('reservations').get();
-            const reservations = snapshot.docs.map(doc => ({
-                tx_id: doc.id,
-                ...doc.data()
-            }));
-            return { status: 'success', data: reservations };
+            const { limit } = options;
+            console.log('📡 Fetching reservations from Firestore...', options);
+
+            const snapshot = API.countReads(await API.reservationQuery(options).get());
+            const reservations = snapshot.docs.map(API.toReservation);
+
+            // More pages may exist only if this page came back full
+            let nextCursor = null;
+            if (limit && snapshot.docs.length === limit) {
+                const lastDoc = snapshot.docs[snapshot.docs.length - 1];
+                nextCursor = [lastDoc.get('end_time'), lastDoc.id];
+            }
+
+            return { status: 'success', data: reservations, cursor: nextCursor };
         } catch (error) {
             console.error('Error getting reservations:', error);
             return { status: 'error', message: error.message };
         }
     },
 
+    // Build the Firestore query behind getReservations / watchReservations
+    reservationQuery: (options = {}) => {
+        const { from, before, status, limit, cursor, changedSince } = options;
+        let query = db.collection('reservations');
+        if (changedSince !== undefined) {
+            return query
+                .where('updated_at', '>', firebase.firestore.Timestamp.fromMillis(changedSince))
+                .orderBy('updated_at');
+        }
+        if (!(from || before || status || limit || cursor)) return query;
+
+        if (Array.isArray(status)) query = query.where('status', 'in', status);
+        else if (status) query = query.where('status', '==', status);
+        if (from) query = query.where('end_time', '>=', from);
+        if (before) query = query.where('end_time', '<', before);
+        query = query.orderBy('end_time').orderBy(firebase.firestore.FieldPath.documentId());
+        if (cursor) query = query.startAfter(...cursor);
+        if (limit) query = query.limit(limit);
+        return query;
+    },
+
+    // --- Archive ---
+    // Complete/Cancelled reservations that ended more than ARCHIVE_AFTER_DAYS ago are moved
+    // to reservations_archive, keeping the live collection (and every client cache) bounded.
+
+    ARCHIVE_AFTER_DAYS: 90,
+    ARCHIVE_PAGE: 150, // Each archived reservation is 3 writes (copy, delete, tombstone)
+
+    /**
+     * Move old terminal reservations to the archive. A deletion tombstone is left for
+     * each, so cached clients drop them through their change feed.
+     * @param {number} [olderThanDays]
+     */
+    archiveReservations: async (olderThanDays = API.ARCHIVE_AFTER_DAYS) => {
+        try {
+            const cutoff = new Date(Date.now() - olderThanDays * 24 * 60 * 60 * 1000);
+            const pad = (n) => n.toString().padStart(2, '0');
+            const before = `${cutoff.getFullYear()}-${pad(cutoff.getMonth() + 1)}-${pad(cutoff.getDate())}T00:00`;
+            const archivedAt = firebase.firestore.FieldValue.serverTimestamp();
+
+            let archived = 0;
+            while (true) {
+                const snapshot = API.countReads(await API.reservationQuery({
+                    status: ['Complete', 'Cancelled'],
+                    before,
+                    limit: API.ARCHIVE_PAGE
+                }).get());
+                if (snapshot.empty) break;
+
+                const batch = db.batch();
+                snapshot.docs.forEach(doc => {
+                    batch.set(db.collection('reservations_archive').doc(doc.id), { ...doc.data(), archived_at: archivedAt });
+                    batch.delete(doc.ref);
+                    batch.set(db.collection('deletions').doc(doc.id), { deleted_at: archivedAt });
+                });
+                await batch.commit();
+                API.countWrites(snapshot.size * 3);
+                archived += snapshot.size;
+                if (snapshot.size < API.ARCHIVE_PAGE) break;
+            }
+
+            console.log(`Archived ${archived} reservation(s) ending before ${before}`);
+            return { status: 'success', archived };
+        } catch (error) {
+            console.error('Error archiving reservations:', error);
+            return { status: 'error', message: error.message };
+        }
+    },
+
+    /**
+     * Claim today's run of a daily job (config/{job}) so only one client does it.
+     * Claimed in a transaction: fails if the job already ran today or another
+     * client holds an unexpired lease.
+     * @returns {Promise<string|null>} Lease token, or null if not claimed
+     */
+    claimDailyJob: async (job, today, leaseMs = API.JOB_LEASE_MS) => {
+        const ref = db.collection('config').doc(job);
+        const token = db.collection('config').doc().id;
+        return db.runTransaction(async (t) => {
+            const snap = await t.get(ref);
+            Metrics.count('firestore.reads', 1);
+            const state = snap.exists ? snap.data() : {};
+            if (state.lastRun === today || (state.leaseUntil || 0) > Date.now()) return null;
+            t.set(ref, { lastRun: state.lastRun || null, leaseUntil: Date.now() + leaseMs, owner: token });
+            return token;
+        }).then(claimed => {
+            if (claimed) API.countWrites(1);
+            return claimed;
+        });
+    },
+
+    // Release a claimed job; marks today as done only if it succeeded, so a failed run can be retried
+    finishDailyJob: async (job, token, today, succeeded) => {
+        const ref = db.collection('config').doc(job);
+        await db.runTransaction(async (t) => {
+            const snap = await t.get(ref);
+            if (!snap.exists || snap.get('owner') !== token) return; // Lease expired and was taken over
+            t.set(ref, { lastRun: succeeded ? today : (snap.get('lastRun') || null), leaseUntil: 0, owner: null });
+        });
+        API.countWrites(1);
+    },
+
+    JOB_LEASE_MS: 15 * 60 * 1000, // Longer than a sweep takes; a crashed client's claim expires after this
+
+    /**
+     * Page through archived reservations, newest end_time first.
+     * @param {Object} options
+     * @param {string} [options.from] - end_time >= from
+     * @param {string} [options.before] - end_time < before
+     * @param {string} [options.rented_to] - Only this unit
+     * @param {number} [options.limit]
+     * @param {Array} [options.cursor] - Cursor returned by the previous page
+     */
+    getArchivedReservations: async (options = {}) => {
+        try {
+            const { from, before, rented_to, cursor } = options;
+            const limit = options.limit || 100;
+
+            let query = db.collection('reservations_archive');
+            if (rented_to) query = query.where('rented_to', '==', rented_to);
+            if (from) query = query.where('end_time', '>=', from);
+            if (before) query = query.where('end_time', '<', before);
+            query = query.orderBy('end_time', 'desc').orderBy(firebase.firestore.FieldPath.documentId(), 'desc');
+            if (cursor) query = query.startAfter(...cursor);
+
+            const snapshot = API.countReads(await query.limit(limit).get());
+            const reservations = snapshot.docs.map(API.toReservation);
+
+            let nextCursor = null;
+            if (snapshot.docs.length === limit) {
+                const lastDoc = snapshot.docs[snapshot.docs.length - 1];
+                nextCursor = [lastDoc.get('end_time'), lastDoc.id];
+            }
+            return { status: 'success', data: reservations, cursor: nextCursor };
+        } catch (error) {
+            console.error('Error getting archived reservations:', error);
+            return { status: 'error', message: error.message };
+        }
+    },
+
+    /**
+     * Listen to reservations matching `options` (same filters as getReservations, without paging).
+     * onChanges receives only what changed: [{ type: 'added'|'modified'|'removed', tx_id, data, pending }].
+     * The first call carries every matching document as 'added'.
+     * @returns {Function} unsubscribe
+     */
+    watchReservations: (options, onChanges, onError) => {
+        return API.reservationQuery(options).onSnapshot(snapshot => {
+            const changes = snapshot.docChanges();
+            API.countReads(snapshot, changes.length);
+            onChanges(changes.map(change => ({
+                type: change.type,
+                tx_id: change.doc.id,
+                data: API.toReservation(change.doc),
+                pending: change.doc.metadata.hasPendingWrites // Local write not yet confirmed by the server
+            })));
+        }, error => {
+            console.error('Reservation listener error:', error);
+            if (onError) onError(error);
+        });
+    },
+
+    /**
+     * Listen to deletion tombstones written after `since` (millis).
+     * Hard deletes can't show up in an updated_at query, so deleteReservation leaves one of these behind.
+     * @returns {Function} unsubscribe
+     */
+    watchDeletions: (since, onDeleted, onError) => {
+        return db.collection('deletions')
+            .where('deleted_at', '>', firebase.firestore.Timestamp.fromMillis(since))
+            .onSnapshot(snapshot => {
+                API.countReads(snapshot, snapshot.docChanges().length);
+                const changes = snapshot.docChanges().filter(change => change.type === 'added');
+                onDeleted(changes.map(change => ({
+                    tx_id: change.doc.id,
+                    deleted_at: API.toMillis(change.doc.get('deleted_at', { serverTimestamps: 'estimate' }))
+                })));
+            }, error => {
+                console.error('Deletion listener error:', error);
+                if (onError) onError(error);
+            });
+    },
+
+    // Tombstones are kept this long; a client whose cache mark is older has to reload (see Sync)
+    DELETION_TTL_DAYS: 30,
+    DELETION_PAGE: 450, // Batches hold at most 500 writes
+
+    // Delete tombstones older than DELETION_TTL_DAYS, so watchDeletions doesn't grow without bound
+    pruneDeletions: async () => {
+        try {
+            const cutoff = firebase.firestore.Timestamp.fromMillis(Date.now() - API.DELETION_TTL_DAYS * 24 * 60 * 60 * 1000);
+            let pruned = 0;
+            while (true) {
+                const snapshot = API.countReads(await db.collection('deletions')
+                    .where('deleted_at', '<', cutoff)
+                    .limit(API.DELETION_PAGE)
+                    .get());
+                if (snapshot.empty) break;
+
+                const batch = db.batch();
+                snapshot.docs.forEach(doc => batch.delete(doc.ref));
+                await batch.commit();
+                API.countWrites(snapshot.size);
+                pruned += snapshot.size;
+                if (snapshot.size < API.DELETION_PAGE) break;
+            }
+            return { status: 'success', pruned };
+        } catch (error) {
+            console.error('Error pruning deletions:', error);
+            return { status: 'error', message: error.message };
+        }
+    },
+
+    // Map a reservation snapshot to a plain object (server timestamps as millis so they can be cached)
+    toReservation: (doc) => {
+        const data = { tx_id: doc.id, ...doc.data() };
+        data.updated_at = API.toMillis(doc.get('updated_at', { serverTimestamps: 'estimate' }));
+        return data;
+    },
 
+    toMillis: (timestamp) => (timestamp && timestamp.toMillis ? timestamp.toMillis() : null),
+
+    /**
+     * Listen to the items collection. Changes are keyed by Firestore doc ID (_docId).
+     * @returns {Function} unsubscribe
+     */
+    watchItems: (onChanges, onError) => {
+        return db.collection('items').onSnapshot(snapshot => {
+            const changes = snapshot.docChanges();
+            API.countReads(snapshot, changes.length);
+            onChanges(changes.map(change => ({
+                type: change.type,
+                _docId: change.doc.id,
+                data: { _docId: change.doc.id, ...change.doc.data() }
+            })));
+        }, error => {
+            console.error('Item listener error:', error);
+            if (onError) onError(error);
+        });
+    },
 
     createItem: async (item) => {
         try {
@@ -43,6 +313,7 @@ const API = {
             }
 
             await docRef.set(data);
+            API.countWrites(1);
             return { status: 'success', data };
         } catch (error) {
             console.error('Error creating item:', error);
@@ -70,12 +341,13 @@ const API = {
 
             if (!_docId) {
                 // Fallback: Query by item_id
-                const snapshot = await db.collection('items').where('item_id', '==', item.item_id).get();
+                const snapshot = API.countReads(await db.collection('items').where('item_id', '==', item.item_id).get());
                 if (snapshot.empty) throw new Error('Item not found');
                 await snapshot.docs[0].ref.update(data);
             } else {
                 await db.collection('items').doc(_docId).update(data);
             }
+            API.countWrites(1);
 
             return { status: 'success', data };
         } catch (error) {
@@ -84,53 +356,28 @@ const API = {
         }
     },
 
-    getItems: async (options = {}) => {
-        try {
-            console.log('📡 Fetching items from Firestore...');
-            const snapshot = await db.collection('items').get();
-            // Include doc ID for updates
-            let items = snapshot.docs.map(doc => ({
-                _docId: doc.id,
-                ...doc.data()
-            }));
-
-            // If no items exist (first run), seed them
-            if (items.length === 0) {
-                console.log('🌱 Seeding initial items...');
-                const initialItems = [
-                    { item: 'Guest Suite', resource_type: 'GUEST_SUITE', item_id: 'gs-1' },
-                    { item: 'Sky Lounge', resource_type: 'SKY_LOUNGE', item_id: 'sl-1' },
-                    { item: 'Kayak 1', resource_type: 'GEAR_SHED', item_id: 'kayak-1' },
-                    { item: 'Kayak 2', resource_type: 'GEAR_SHED', item_id: 'kayak-2' },
-                    { item: 'Mountain Bike 1', resource_type: 'GEAR_SHED', item_id: 'bike-1' },
-                    { item: 'Mountain Bike 2', resource_type: 'GEAR_SHED', item_id: 'bike-2' }
-                ];
-
-                const batch = db.batch();
-                initialItems.forEach(item => {
-                    const docRef = db.collection('items').doc();
-                    batch.set(docRef, item);
-                });
-                await batch.commit();
-                // Re-fetch to get IDs
-                const newSnapshot = await db.collection('items').get();
-                items = newSnapshot.docs.map(doc => ({
-                    _docId: doc.id,
-                    ...doc.data()
-                }));
-            }
-
-            return { status: 'success', data: items };
-        } catch (error) {
-            console.error('Error getting items:', error);
-            return { status: 'error', message: error.message };
-        }
+    // First run: add a starter set of items (Sync.startItems' listener picks them up)
+    seedItems: async () => {
+        console.log('🌱 Seeding initial items...');
+        const initialItems = [
+            { item: 'Guest Suite', resource_type: 'GUEST_SUITE', item_id: 'gs-1' },
+            { item: 'Sky Lounge', resource_type: 'SKY_LOUNGE', item_id: 'sl-1' },
+            { item: 'Kayak 1', resource_type: 'GEAR_SHED', item_id: 'kayak-1' },
+            { item: 'Kayak 2', resource_type: 'GEAR_SHED', item_id: 'kayak-2' },
+            { item: 'Mountain Bike 1', resource_type: 'GEAR_SHED', item_id: 'bike-1' },
+            { item: 'Mountain Bike 2', resource_type: 'GEAR_SHED', item_id: 'bike-2' }
+        ];
+
+        const batch = db.batch();
+        initialItems.forEach(item => batch.set(db.collection('items').doc(), item));
+        await batch.commit();
+        API.countWrites(initialItems.length);
     },
 
     getStaff: async (options = {}) => {
         try {
             console.log('📡 Fetching staff from Firestore...');
-            const snapshot = await db.collection('staff').get();
+            const snapshot = API.countReads(await db.collection('staff').get());
             let staff = snapshot.docs.map(doc => doc.data());
 
             // Seed if empty
@@ -145,6 +392,7 @@ const API = {
                     batch.set(docRef, s);
                 });
                 await batch.commit();
+                API.countWrites(initialStaff.length);
                 staff = initialStaff;
             }
 
@@ -155,99 +403,390 @@ const API = {
         }
     },
 
+    // Direct (unqueued) reservation writes; they go through the same checked transaction as queued ones
+
     createReservation: async (reservation) => {
-        try {
-            console.log('Creating reservation:', reservation);
-            // Add metadata
-            const data = {
-                ...reservation,
-                created_at: new Date().toISOString(),
-                status: 'Scheduled'
-            };
+        const data = { ...reservation, created_at: new Date().toISOString(), status: 'Scheduled' };
+        return API.commitReservation({ kind: 'create', tx_id: API.newReservationId(), data }, 'Creating');
+    },
 
-            const docRef = await db.collection('reservations').add(data);
-            return { status: 'success', data: { tx_id: docRef.id, ...data } };
-        } catch (error) {
-            console.error('Error creating reservation:', error);
-            return { status: 'error', message: error.message };
-        }
+    updateReservation: async (reservation, expect_last_update) => {
+        const { tx_id, ...data } = reservation;
+        data.last_update = new Date().toISOString();
+        return API.commitReservation({ kind: 'update', tx_id, data, expect_last_update }, 'Updating');
     },
 
-    updateReservation: async (reservation) => {
-        try {
-            const { tx_id, ...data } = reservation;
-            console.log('Updating reservation:', tx_id, data);
+    cancelReservation: async (tx_id, fee = 0) => {
+        const data = { status: 'Cancelled', last_update: new Date().toISOString() };
+        if (fee > 0) data.cancellation_fee = fee;
+        return API.commitReservation({ kind: 'update', tx_id, data }, 'Cancelling');
+    },
 
-            data.last_update = new Date().toISOString();
+    deleteReservation: async (tx_id) => {
+        return API.commitReservation({ kind: 'delete', tx_id, data: null }, 'Deleting');
+    },
 
-            await db.collection('reservations').doc(tx_id).update(data);
-            return { status: 'success', data: { tx_id, ...data } };
-        } catch (error) {
-            console.error('Error updating reservation:', error);
-            return { status: 'error', message: error.message };
+    restoreReservation: async (tx_id) => {
+        const data = { status: 'Scheduled', last_update: new Date().toISOString() };
+        return API.commitReservation({ kind: 'update', tx_id, data }, 'Restoring');
+    },
+
+    completeReservation: async (tx_id, return_notes, completed_by) => {
+        const data = { status: 'Complete', return_notes, completed_by, last_update: new Date().toISOString() };
+        return API.commitReservation({ kind: 'update', tx_id, data }, 'Completing');
+    },
+
+    // --- Bulk actions ---
+    // Committed in transactions sized by chunkEnd (occupancy documents move with the
+    // status, so a plain WriteBatch can't keep them consistent).
+    // Each returns { status, updated: [tx_id], failed: [{ tx_id, message }] }.
+
+    TRANSACTION_CHUNK: 25, // Most reservations per transaction (each one is read, with its occupancy docs)
+    MAX_TRANSACTION_WRITES: 450, // Firestore allows 500; the estimate uses the local copy, so leave some room
+
+    /**
+     * Writes commitReservationMutations makes for a mutation: the reservation doc (plus
+     * its tombstone on delete) and one occupancy doc per item per day, on both the old
+     * and the new footprint. An upper bound, as days in both footprints are written once.
+     * @param {Object} m - Mutation
+     * @param {Object|null} previous - Reservation before the mutation
+     */
+    writesFor: (m, previous) => {
+        const before = Occupancy.footprint(previous).length;
+        if (m.kind === 'delete') return 2 + before;
+        const next = m.kind === 'create' ? m.data : { ...(previous || {}), ...m.data };
+        return 1 + before + Occupancy.footprint(next).length;
+    },
+
+    /**
+     * End (exclusive) of the run of mutations from `start` that fits in one transaction:
+     * at most TRANSACTION_CHUNK reservations and MAX_TRANSACTION_WRITES writes. A single
+     * mutation over the write limit still gets a transaction of its own.
+     * @param {Function} [previousOf] - (mutation) => reservation before it; defaults to m.previous
+     */
+    chunkEnd: (mutations, start = 0, previousOf = m => m.previous || null) => {
+        let end = start;
+        let writes = 0;
+        while (end < mutations.length && end - start < API.TRANSACTION_CHUNK) {
+            const cost = API.writesFor(mutations[end], previousOf(mutations[end]));
+            if (end > start && writes + cost > API.MAX_TRANSACTION_WRITES) break;
+            writes += cost;
+            end++;
         }
+        return end;
     },
 
-    cancelReservation: async (tx_id, fee = 0) => {
-        try {
-            console.log('Cancelling reservation:', tx_id, 'Fee:', fee);
-            const updateData = {
-                status: 'Cancelled',
-                last_update: new Date().toISOString()
-            };
+    completeReservations: async (tx_ids, return_notes, completed_by) => {
+        const data = { status: 'Complete', return_notes, completed_by, last_update: new Date().toISOString() };
+        return API.commitReservationChunks(tx_ids.map(tx_id => ({ kind: 'update', tx_id, data, expect_status: 'Scheduled' })));
+    },
 
-            if (fee > 0) {
-                updateData.cancellation_fee = fee;
+    /**
+     * @param {Array} tx_ids
+     * @param {Object} [fees] - tx_id -> cancellation fee (omitted or 0 = no fee)
+     */
+    cancelReservations: async (tx_ids, fees = {}) => {
+        const last_update = new Date().toISOString();
+        return API.commitReservationChunks(tx_ids.map(tx_id => {
+            const data = { status: 'Cancelled', last_update };
+            if (fees[tx_id] > 0) data.cancellation_fee = fees[tx_id];
+            return { kind: 'update', tx_id, data, expect_status: 'Scheduled' };
+        }));
+    },
+
+    restoreReservations: async (tx_ids) => {
+        const data = { status: 'Scheduled', last_update: new Date().toISOString() };
+        return API.commitReservationChunks(tx_ids.map(tx_id => ({ kind: 'update', tx_id, data, expect_status: 'Cancelled' })));
+    },
+
+    // A rejected chunk is retried one reservation at a time so the rest still go through
+    commitReservationChunks: async (mutations) => {
+        const updated = [];
+        const failed = [];
+        const commitOne = async (m) => {
+            try {
+                await API.commitReservationMutations([m]);
+                updated.push(m.tx_id);
+            } catch (error) {
+                failed.push({ tx_id: m.tx_id, message: error.message });
             }
+        };
+
+        // These mutations carry no `previous`; size them by the locally loaded copies
+        const previousOf = (m) => {
+            const entry = ReservationModel.get(m.tx_id);
+            return entry ? entry.record : null;
+        };
+        for (let i = 0, end; i < mutations.length; i = end) {
+            end = API.chunkEnd(mutations, i, previousOf);
+            const chunk = mutations.slice(i, end);
+            try {
+                await API.commitReservationMutations(chunk);
+                chunk.forEach(m => updated.push(m.tx_id));
+            } catch (error) {
+                console.warn('Bulk chunk rejected, retrying individually:', error);
+                for (const m of chunk) await commitOne(m);
+            }
+        }
+
+        return { status: failed.length === 0 ? 'success' : 'partial', updated, failed };
+    },
 
-            await db.collection('reservations').doc(tx_id).update(updateData);
-            return { status: 'success' };
+    commitReservation: async (mutation, verb) => {
+        try {
+            console.log(`${verb} reservation:`, mutation.tx_id);
+            await API.commitReservationMutations([mutation]);
+            return { status: 'success', data: mutation.data ? { tx_id: mutation.tx_id, ...mutation.data } : { tx_id: mutation.tx_id } };
         } catch (error) {
-            console.error('Error cancelling reservation:', error);
-            return { status: 'error', message: error.message };
+            console.error(`Error ${verb.toLowerCase()} reservation:`, error);
+            return { status: error.code === 'conflict' ? 'conflict' : 'error', message: error.message };
         }
     },
 
-    deleteReservation: async (tx_id) => {
+    // Client-generated reservation ID, so a queued create can be shown (and retried) before it commits
+    newReservationId: () => db.collection('reservations').doc().id,
+
+    getReservation: async (tx_id) => {
         try {
-            console.log('Deleting reservation:', tx_id);
-            await db.collection('reservations').doc(tx_id).delete();
-            return { status: 'success' };
+            const doc = API.countReads(await db.collection('reservations').doc(tx_id).get());
+            return { status: 'success', data: doc.exists ? API.toReservation(doc) : null };
         } catch (error) {
-            console.error('Error deleting reservation:', error);
+            console.error('Error getting reservation:', error);
             return { status: 'error', message: error.message };
         }
     },
 
-    restoreReservation: async (tx_id) => {
+    /**
+     * Which items are free for the whole of [start_time, end_time) (Firestore
+     * counterpart of getAvailability in Code.gs). Reads only the occupancy
+     * documents of the days in range, i.e. just the item-days that are booked.
+     * @param {Array} items - Item names
+     * @param {string} start_time
+     * @param {string} end_time
+     * @param {string} [excludeTxId] - Reservation being edited; its own bookings don't count
+     */
+    getAvailability: async (items, start_time, end_time, excludeTxId = null) => {
+        const startMs = new Date(start_time).getTime();
+        const endMs = new Date(end_time).getTime();
+        if (isNaN(startMs) || isNaN(endMs) || startMs >= endMs) {
+            return { status: 'error', message: 'Invalid time range.' };
+        }
+
         try {
-            console.log('Restoring reservation:', tx_id);
-            await db.collection('reservations').doc(tx_id).update({
-                status: 'Scheduled',
-                last_update: new Date().toISOString()
-            });
-            return { status: 'success' };
+            await API.ensureOccupancy();
+            const days = Occupancy.daysBetween(startMs, endMs);
+            const booked = new Set();
+            for (let i = 0; i < days.length; i += 30) { // 'in' takes at most 30 values
+                const snapshot = API.countReads(await db.collection(Occupancy.COLLECTION)
+                    .where('day', 'in', days.slice(i, i + 30)).get());
+                snapshot.docs.forEach(doc => {
+                    const bookings = doc.get('bookings') || {};
+                    Object.keys(bookings).forEach(txId => {
+                        const [bStart, bEnd] = bookings[txId];
+                        if (txId !== excludeTxId && bStart < endMs && startMs < bEnd) booked.add(doc.get('key'));
+                    });
+                });
+            }
+
+            const available = [];
+            const unavailable = [];
+            items.forEach(name => (booked.has(name) ? unavailable : available).push(name));
+            return { status: 'success', data: { available, unavailable } };
         } catch (error) {
-            console.error('Error restoring reservation:', error);
+            console.error('Error checking availability:', error);
             return { status: 'error', message: error.message };
         }
     },
 
+    /**
+     * Commit queued reservation mutations in one transaction (see Mutations).
+     * Every reservation that ends up Scheduled is checked against the booking rules
+     * and the occupancy documents of the items/days it covers (see Occupancy), so
+     * two desks can't book the same slot. The occupancy documents are updated in
+     * the same transaction. Retrying is safe: creates use a client-generated ID and
+     * a reservation never conflicts with its own bookings.
+     * Errors are thrown (not wrapped) so the caller can tell retryable failures from
+     * rejections; a rejected booking throws with code 'conflict'.
+     * An update with `expect_status` is rejected (code 'failed-precondition') unless the
+     * stored reservation has that status, e.g. so a bulk complete can't touch Cancelled ones.
+     * One with `expect_last_update` is rejected (code 'conflict') if the reservation was
+     * edited since that version was read, so a stale form can't overwrite someone else's edit.
+     * @param {Array} mutations - [{ kind: 'create'|'update'|'delete', tx_id, data, expect_status, expect_last_update }]
+     */
+    commitReservationMutations: async (mutations) => {
+        await API.ensureOccupancy(); // Checks against unbuilt occupancy docs would pass anything
+        console.log(`Committing ${mutations.length} reservation change(s)`);
+        const reservations = db.collection('reservations');
+        const occupancy = db.collection(Occupancy.COLLECTION);
+        const reject = (message, code = 'conflict') => {
+            const error = new Error(message);
+            error.code = code;
+            return error;
+        };
+
+        let writes = 0; // Of the attempt that committed (the transaction function may run more than once)
+        const end = Metrics.start('firestore.commit');
+        await db.runTransaction(async (t) => {
+            writes = 0;
+            const txIds = Array.from(new Set(mutations.map(m => m.tx_id)));
+
+            // Current server state of every reservation in the batch
+            const current = new Map();
+            const snaps = await Promise.all(txIds.map(id => t.get(reservations.doc(id))));
+            Metrics.count('firestore.reads', snaps.length);
+            snaps.forEach((snap, i) => current.set(txIds[i], snap.exists ? { ...snap.data(), tx_id: txIds[i] } : null));
+
+            // Resulting records, applying the batch in order (null = deleted)
+            const next = new Map(current);
+            mutations.forEach(m => {
+                const record = next.get(m.tx_id);
+                if (m.kind === 'create') {
+                    next.set(m.tx_id, { ...m.data, tx_id: m.tx_id });
+                } else if (m.kind === 'update') {
+                    if (!record) throw reject('This reservation no longer exists.', 'not-found');
+                    if (m.expect_status && record.status !== m.expect_status) {
+                        throw reject(`Reservation is ${record.status}, not ${m.expect_status}.`, 'failed-precondition');
+                    }
+                    if (m.expect_last_update !== undefined && API.versionOf(record.last_update) !== API.versionOf(m.expect_last_update)) {
+                        throw reject('Reservation was changed by someone else. Please refresh and try again.');
+                    }
+                    next.set(m.tx_id, { ...record, ...m.data });
+                } else if (m.kind === 'delete') {
+                    next.set(m.tx_id, null);
+                }
+            });
+
+            // Occupancy documents the resulting bookings need
+            const footprints = new Map(txIds.map(id => [id, Occupancy.footprint(next.get(id))]));
+            const docIds = new Set();
+            footprints.forEach(fp => fp.forEach(f => docIds.add(f.id)));
+            const ids = Array.from(docIds);
+            const occSnaps = await Promise.all(ids.map(id => t.get(occupancy.doc(id))));
+            Metrics.count('firestore.reads', occSnaps.length);
+
+            // Working copy without the batch's own bookings; each booking is added as it is checked
+            const bookingsById = new Map();
+            occSnaps.forEach((snap, i) => {
+                const bookings = { ...((snap.exists && snap.get('bookings')) || {}) };
+                txIds.forEach(id => delete bookings[id]);
+                bookingsById.set(ids[i], bookings);
+            });
 
+            txIds.forEach(id => {
+                const record = next.get(id);
+                if (!Occupancy.occupies(record)) return;
+                const message = Occupancy.validate(record) || Occupancy.conflict(record, bookingsById);
+                if (message) throw reject(message);
 
-    completeReservation: async (tx_id, return_notes, completed_by) => {
-        try {
-            console.log('Completing reservation:', tx_id);
-            await db.collection('reservations').doc(tx_id).update({
-                status: 'Complete',
-                return_notes: return_notes,
-                completed_by: completed_by,
-                last_update: new Date().toISOString()
+                const interval = [new Date(record.start_time).getTime(), new Date(record.end_time).getTime()];
+                footprints.get(id).forEach(f => { bookingsById.get(f.id)[id] = interval; });
             });
-            return { status: 'success' };
-        } catch (error) {
-            console.error('Error completing reservation:', error);
-            return { status: 'error', message: error.message };
+
+            // Writes
+            const updatedAt = firebase.firestore.FieldValue.serverTimestamp();
+            txIds.forEach(id => {
+                const record = next.get(id);
+                if (record) {
+                    const { tx_id, ...data } = record;
+                    t.set(reservations.doc(id), { ...data, updated_at: updatedAt });
+                    writes++;
+                } else if (current.get(id)) {
+                    t.delete(reservations.doc(id));
+                    t.set(db.collection('deletions').doc(id), { deleted_at: updatedAt });
+                    writes += 2;
+                }
+
+                // Add to the new footprint, drop from any day/item it no longer covers
+                const newFootprint = footprints.get(id);
+                const keep = new Set(newFootprint.map(f => f.id));
+                const interval = record ? [new Date(record.start_time).getTime(), new Date(record.end_time).getTime()] : null;
+                newFootprint.forEach(({ id: docId, key, day }) => {
+                    t.set(occupancy.doc(docId), { key, day, bookings: { [id]: interval } }, { merge: true });
+                    writes++;
+                });
+                Occupancy.footprint(current.get(id)).forEach(({ id: docId }) => {
+                    if (keep.has(docId)) return;
+                    t.set(occupancy.doc(docId), { bookings: { [id]: firebase.firestore.FieldValue.delete() } }, { merge: true });
+                    writes++;
+                });
+            });
+        }).finally(end);
+        API.countWrites(writes);
+
+        return { status: 'success' };
+    },
+
+    // Normalizes a last_update (ISO string, Date or empty) for version comparison
+    versionOf: (value) => {
+        if (value === '' || value === null || value === undefined) return '';
+        const t = new Date(value).getTime();
+        return isNaN(t) ? String(value) : String(t);
+    },
+
+    occupancyReady: null, // Promise that settles once the occupancy docs are known to be built
+
+    /**
+     * Make sure the occupancy docs have been built (config/occupancy is written by
+     * rebuildOccupancy); if not, backfill them before anything relies on them.
+     * Checked once per session. A failure is thrown as retryable, so queued
+     * writes wait for the backfill instead of being rolled back.
+     */
+    ensureOccupancy: () => {
+        if (!API.occupancyReady) {
+            API.occupancyReady = (async () => {
+                const marker = API.countReads(await db.collection('config').doc('occupancy').get());
+                if (marker.exists) return;
+                console.log('Occupancy documents not built yet; backfilling from scheduled reservations');
+                await API.rebuildOccupancy({ prune: false });
+            })().catch(error => {
+                API.occupancyReady = null;
+                if (!error.code) error.code = 'unavailable';
+                throw error;
+            });
+        }
+        return API.occupancyReady;
+    },
+
+    /**
+     * Rebuild the occupancy documents from every Scheduled reservation, then mark them built.
+     * Run from the console to repair them (or against a fresh emulator); ensureOccupancy
+     * runs it automatically the first time.
+     * @param {Object} [options]
+     * @param {boolean} [options.prune=true] - Replace every document and delete stale ones.
+     *     Without it bookings are only merged in, so a booking committed by another
+     *     client while this runs is never dropped.
+     */
+    rebuildOccupancy: async ({ prune = true } = {}) => {
+        const occupancy = db.collection(Occupancy.COLLECTION);
+        const existing = prune ? API.countReads(await occupancy.get()) : { docs: [] };
+        const scheduled = API.countReads(await db.collection('reservations').where('status', '==', 'Scheduled').get());
+
+        const docs = new Map();
+        scheduled.docs.forEach(doc => {
+            const record = { ...doc.data(), tx_id: doc.id };
+            const interval = [new Date(record.start_time).getTime(), new Date(record.end_time).getTime()];
+            Occupancy.footprint(record).forEach(({ id, key, day }) => {
+                if (!docs.has(id)) docs.set(id, { key, day, bookings: {} });
+                docs.get(id).bookings[doc.id] = interval;
+            });
+        });
+
+        // Deletes and sets in chunks (batches are limited to 500 writes)
+        const writes = existing.docs.filter(doc => !docs.has(doc.id)).map(doc => (batch) => batch.delete(doc.ref));
+        docs.forEach((data, id) => writes.push((batch) => batch.set(occupancy.doc(id), data, { merge: !prune })));
+        for (let i = 0; i < writes.length; i += 500) {
+            const batch = db.batch();
+            const chunk = writes.slice(i, i + 500);
+            chunk.forEach(write => write(batch));
+            await batch.commit();
+            API.countWrites(chunk.length);
         }
+
+        await db.collection('config').doc('occupancy').set({ built_at: firebase.firestore.FieldValue.serverTimestamp() });
+        API.countWrites(1);
+        API.occupancyReady = Promise.resolve();
+
+        console.log(`Occupancy rebuilt: ${docs.size} documents from ${scheduled.size} scheduled reservations`);
+        return { status: 'success', count: docs.size };
     }
 };
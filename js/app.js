@@ -5,7 +5,6 @@
 const App = {
     calendar: null,
     items: [],
-    reservations: [],
     staff: [],
     selectedStaff: null,
     currentSortField: 'item_id',
@@ -13,20 +12,63 @@ const App = {
     currentReservationSortField: null,
     currentReservationSortDirection: 'asc',
 
+    // Windowed reservation loading
+    RESERVATION_PAGE_SIZE: 500,
+    LIST_WINDOW_DAYS: 90,
+    listRowsByTx: new Map(), // tx_id -> list row models (see buildListRows)
+    listTable: null,
+    SEARCH_DEBOUNCE_MS: 120,
+    gearShedIndex: null,
+    gearShedIndexSource: null, // App.items array the index was built from
+    gearShedMatches: null, // Current search results (null = no query)
+    gearShedSearchTimer: null,
+    reservationSearchTimer: null,
+    gearShedUnavailable: new Set(), // Item names booked over the chosen range (from API.getAvailability)
+    gearShedAvailabilityTimer: null,
+    gearShedAvailabilityKey: null, // Range the current gearShedUnavailable answers
+    selectedCompletions: new Set(), // tx_ids ticked in the notifications panel
+    ARCHIVE_PAGE_SIZE: 100,
+    archive: { rows: [], cursor: null, loaded: false, loading: false }, // Archived list rows, loaded on demand
+    diagnosticsTimer: null,
+    DIAGNOSTICS_REFRESH_MS: 2000,
+    calendarEvents: new Map(), // tx_id -> FullCalendar EventApi objects
+    viewsRenderPending: false,
+    loadedFrom: null, // Every reservation ending on/after this ('YYYY-MM-DDTHH:MM') is loaded
+    listFrom: null, // Start of the list view's window (Date)
+    reservationQueue: Promise.resolve(),
+
     init: async () => {
         console.log('App Initializing...');
 
+        App.listFrom = new Date();
+        App.listFrom.setHours(0, 0, 0, 0);
+        App.listFrom.setDate(App.listFrom.getDate() - App.LIST_WINDOW_DAYS);
+
         // Initialize Calendar
         App.initCalendar();
         App.initTimePicker();
         App.initStaffSelector();
         App.initNotifications();
 
+        // Render cached items right away; the items listener (started by loadData) replaces them
+        const cachedItems = await Cache.getAll('items');
+        if (cachedItems.length > 0) App.items = cachedItems;
+
         // Load Data
         await App.loadData();
 
+        // Send any reservation changes that didn't reach the server last session
+        Mutations.resume();
+
+        // Daily sweep of old finished reservations into the archive
+        App.archiveIfDue();
+        App.pruneDeletionsIfDue();
+
         // Event Listeners
         App.bindEvents();
+
+        // Diagnostics panel is hidden unless asked for (?diagnostics or Ctrl+Shift+D)
+        if (new URLSearchParams(window.location.search).has('diagnostics')) App.toggleDiagnostics();
     },
 
     initCalendar: () => {
@@ -38,10 +80,22 @@ const App = {
                 center: 'title',
                 right: 'dayGridMonth,timeGridWeek,timeGridDay'
             },
-            events: App.reservations,
+            datesSet: (info) => {
+                // Fetch further back on demand once the initial window is loaded
+                if (App.loadedFrom) App.loadReservationsFrom(App.toQueryDate(info.start)).catch(() => {}); // Reported by the queue
+            },
             eventClick: (info) => {
-                App.openReservationModal(info.event.extendedProps);
+                const { tx_id, item } = info.event.extendedProps;
+                const props = App.reservationProps(tx_id, item);
+                if (!props) {
+                    // The event outlived its reservation (e.g. removed while the click was in flight)
+                    App.showAlert('This reservation is no longer available.', 'error');
+                    return;
+                }
+                App.openReservationModal(props);
             },
+            // Shade days a resource is fully booked (kept current by shadeCalendarDays)
+            dayCellClassNames: (arg) => App.fullDayClasses(Pricing.dayNumber(arg.date)),
             dateClick: (info) => {
                 // Store the clicked date for use in reservation creation
                 App.clickedDate = info.dateStr;
@@ -54,105 +108,34 @@ const App = {
     },
 
     loadData: async (forceRefresh = false, manageSpinner = true) => {
+        const endSpan = Metrics.start('loadData');
         try {
             // Show loading indicator only if not using cache (or forcing refresh)
             const refreshBtn = document.getElementById('refresh-data-btn');
 
-            const handleResponse = async (response, type) => {
-                if (response.status === 'success') {
-                    // Update Data
-                    if (type === 'items') App.items = response.data;
-                    if (type === 'staff') {
+            const handleResponse = (response) => {
+                const end = Metrics.start('loadData.handleResponse');
+                try {
+                    if (response.status === 'success') {
                         App.staff = response.data;
                         App.renderStaffList();
                     }
-                    if (type === 'reservations') {
-                        // Flatten reservations: if a reservation has multiple items, create an event for each
-                        const events = [];
-                        response.data.forEach(r => {
-                            // Determine items to display
-                            let itemsToDisplay = [];
-                            if (r.items && Array.isArray(r.items) && r.items.length > 0) {
-                                itemsToDisplay = r.items;
-                            } else if (r.item) {
-                                itemsToDisplay = [r.item];
-                            } else {
-                                itemsToDisplay = ['Unknown Item'];
-                            }
-
-                            // Determine color based on resource_type
-                            let bgColor, borderColor;
-                            if (r.resource_type === 'GUEST_SUITE') {
-                                bgColor = '#FBC02D'; // Yellow 700
-                                borderColor = '#F9A825'; // Yellow 800
-                            } else if (r.resource_type === 'GEAR_SHED') {
-                                bgColor = '#2E7D32'; // Green 800
-                                borderColor = '#1B5E20'; // Green 900
-                            } else if (r.resource_type === 'SKY_LOUNGE') {
-                                bgColor = '#1565C0'; // Blue 800
-                                borderColor = '#0D47A1'; // Blue 900
-                            } else {
-                                // Default colors based on status (fallback)
-                                bgColor = App.getStatusColor(r.status);
-                                borderColor = App.getStatusBorderColor(r.status);
-                            }
-
-                            itemsToDisplay.forEach(itemName => {
-                                events.push({
-                                    title: `${itemName} - ${r.rented_to}`,
-                                    start: r.start_time,
-                                    end: r.end_time,
-                                    extendedProps: { ...r, item: itemName }, // Override item for this specific event
-                                    classNames: [r.status.toLowerCase()],
-                                    backgroundColor: bgColor,
-                                    borderColor: borderColor,
-                                    textColor: '#ffffff' // Ensure white text for contrast
-                                });
-                            });
-                        });
-                        App.reservations = events;
-
-                        // Update UI
-                        App.calendar.removeAllEvents();
-                        App.calendar.addEventSource(App.reservations);
-                        App.renderListView();
-                        App.updateNotifications();
-                    }
-
-                    // Handle Background Revalidation
-                    if (response.revalidation) {
-                        console.log(`⏳ Background updating ${type}...`);
-                        if (refreshBtn) refreshBtn.classList.add('spinning');
-
-                        try {
-                            const freshResponse = await response.revalidation;
-                            if (freshResponse) {
-                                console.log(`✨ New data received for ${type}! Updating UI...`);
-                                await handleResponse(freshResponse, type);
-                                // Silent update - don't show alert (action-specific messages shown instead)
-                            } else {
-                                console.log(`✓ Background check complete: ${type} is up to date.`);
-                            }
-                        } catch (err) {
-                            console.warn(`Background update failed for ${type}`, err);
-                        } finally {
-                            if (refreshBtn) refreshBtn.classList.remove('spinning');
-                        }
-                    }
+                } finally {
+                    end();
                 }
             };
 
             // Start loading
             if (manageSpinner && forceRefresh && refreshBtn) refreshBtn.classList.add('spinning');
 
-            // Fetch Items
-            const itemsPromise = API.getItems({ forceRefresh }).then(res => handleResponse(res, 'items'));
+            // Items come from their listener (its first snapshot is the full list) and stay live after that
+            const itemsPromise = Sync.unsubscribeItems ? Promise.resolve() : Sync.startItems();
 
             // Fetch Staff
-            const staffPromise = API.getStaff({ forceRefresh }).then(res => handleResponse(res, 'staff'));
+            const staffPromise = API.getStaff({ forceRefresh }).then(handleResponse);
 
-            // Fetch Reservations
-            const resPromise = API.getReservations({ forceRefresh }).then(res => handleResponse(res, 'reservations'));
+            // Reservations (visible window only, kept live by listeners once started; a refresh re-pulls the change feed)
+            const resPromise = App.loadVisibleReservations(forceRefresh);
 
             await Promise.all([itemsPromise, staffPromise, resPromise]);
 
@@ -164,14 +147,222 @@ const App = {
                 const refreshBtn = document.getElementById('refresh-data-btn');
                 if (refreshBtn) refreshBtn.classList.remove('spinning');
             }
+            endSpan();
+        }
+    },
+
+    // Start live listeners on the calendar/list window plus every reservation still awaiting completion
+    loadVisibleReservations: (forceRefresh = false) => {
+        return App.enqueueReservationTask(async () => {
+            // Listeners keep the window current from here on, so only the first call fetches
+            if (!Sync.active) await Sync.startReservations(App.getVisibleFrom());
+            else if (forceRefresh) await Sync.refreshReservations();
+        });
+    },
+
+    // Make sure every reservation ending on/after `from` is loaded
+    loadReservationsFrom: (from) => {
+        return App.enqueueReservationTask(async () => {
+            if (App.loadedFrom && from >= App.loadedFrom) return;
+            await App.fetchReservationsFrom(from);
+        });
+    },
+
+    fetchReservationsFrom: async (from) => {
+        if (App.loadedFrom && from >= App.loadedFrom) return;
+        // Only fetch the gap before what is already loaded; older history is fetched once, not watched
+        const records = await App.fetchAllReservationPages({ from, before: App.loadedFrom || undefined });
+        await Sync.addFetchedRecords(records, from);
+        App.loadedFrom = from;
+    },
+
+    // Run reservation fetches one at a time so each sees the range the previous one loaded
+    // A failed task is reported and rejects its caller, but doesn't block the tasks queued after it
+    enqueueReservationTask: (task) => {
+        const run = App.reservationQueue.then(task).catch(error => {
+            console.error('Failed to load reservations:', error);
+            App.showAlert('Failed to load reservations.', 'error');
+            throw error;
+        });
+        App.reservationQueue = run.catch(() => {});
+        return run;
+    },
+
+    fetchAllReservationPages: async (options) => {
+        const records = [];
+        let cursor = null;
+        do {
+            const response = await API.getReservations({ ...options, limit: App.RESERVATION_PAGE_SIZE, cursor });
+            if (response.status !== 'success') throw new Error(response.message);
+            records.push(...response.data);
+            cursor = response.cursor;
+        } while (cursor);
+        return records;
+    },
+
+    getVisibleFrom: () => {
+        let from = App.listFrom;
+        if (App.calendar && App.calendar.view && App.calendar.view.activeStart < from) {
+            from = App.calendar.view.activeStart;
+        }
+        return App.toQueryDate(from);
+    },
+
+    // Format a Date the way reservation times are stored ('YYYY-MM-DDTHH:MM', local time)
+    toQueryDate: (date) => {
+        const pad = (n) => n.toString().padStart(2, '0');
+        return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T${pad(date.getHours())}:${pad(date.getMinutes())}`;
+    },
+
+    loadOlderReservations: async () => {
+        const previous = App.listFrom;
+        App.listFrom = new Date(App.listFrom);
+        App.listFrom.setDate(App.listFrom.getDate() - App.LIST_WINDOW_DAYS);
+        try {
+            await App.loadReservationsFrom(App.toQueryDate(App.listFrom));
+        } catch (error) {
+            App.listFrom = previous; // Keep the window on what was actually loaded
+            throw error;
+        }
+    },
+
+    /**
+     * Calendar events for one reservation: one per item, so multi-item bookings show each item.
+     * Events only carry tx_id + item; the reservation itself lives once in ReservationModel.
+     * @param {Object} entry - ReservationModel entry
+     */
+    buildEvents: (entry) => {
+        const r = entry.record;
+
+        // Determine color based on resource_type
+        let bgColor, borderColor;
+        if (r.resource_type === 'GUEST_SUITE') {
+            bgColor = '#FBC02D'; // Yellow 700
+            borderColor = '#F9A825'; // Yellow 800
+        } else if (r.resource_type === 'GEAR_SHED') {
+            bgColor = '#2E7D32'; // Green 800
+            borderColor = '#1B5E20'; // Green 900
+        } else if (r.resource_type === 'SKY_LOUNGE') {
+            bgColor = '#1565C0'; // Blue 800
+            borderColor = '#0D47A1'; // Blue 900
+        } else {
+            // Default colors based on status (fallback)
+            bgColor = App.getStatusColor(r.status);
+            borderColor = App.getStatusBorderColor(r.status);
+        }
+
+        return entry.items.map(itemName => ({
+            title: `${itemName} - ${r.rented_to}`,
+            start: r.start_time,
+            end: r.end_time,
+            extendedProps: { tx_id: r.tx_id, item: itemName },
+            classNames: [r.status.toLowerCase()],
+            backgroundColor: bgColor,
+            borderColor: borderColor,
+            textColor: '#ffffff' // Ensure white text for contrast
+        }));
+    },
+
+    /**
+     * Push reservation changes from Sync into the views.
+     * Only the affected calendar events are touched; events for a reservation whose
+     * item list is unchanged are updated in place rather than re-created.
+     * @param {Array} changes - [{ type: 'added'|'modified'|'removed', tx_id, record }]
+     */
+    applyReservationChanges: (changes) => {
+        const endSpan = Metrics.start('calendar.applyChanges');
+        ReservationModel.apply(changes);
+
+        App.calendar.batchRendering(() => {
+            changes.forEach(change => {
+                const oldEvents = App.calendarEvents.get(change.tx_id) || [];
+
+                if (change.type === 'removed') {
+                    oldEvents.forEach(event => event.remove());
+                    App.calendarEvents.delete(change.tx_id);
+                    App.listRowsByTx.delete(change.tx_id);
+                    return;
+                }
+
+                const entry = ReservationModel.get(change.tx_id);
+                const defs = App.buildEvents(entry);
+                App.listRowsByTx.set(change.tx_id, App.buildListRows(entry));
+
+                const sameItems = oldEvents.length === defs.length &&
+                    oldEvents.every((event, i) => event.extendedProps.item === defs[i].extendedProps.item);
+                if (sameItems) {
+                    oldEvents.forEach((event, i) => App.updateCalendarEvent(event, defs[i]));
+                } else {
+                    oldEvents.forEach(event => event.remove());
+                    App.calendarEvents.set(change.tx_id, defs.map(def => App.calendar.addEvent(def)));
+                }
+            });
+        });
+        endSpan();
+
+        App.scheduleReservationViews();
+    },
+
+    updateCalendarEvent: (event, def) => {
+        event.setProp('title', def.title);
+        event.setProp('classNames', def.classNames);
+        event.setProp('backgroundColor', def.backgroundColor);
+        event.setProp('borderColor', def.borderColor);
+        event.setDates(def.start, def.end);
+        Object.keys(def.extendedProps).forEach(key => event.setExtendedProp(key, def.extendedProps[key]));
+    },
+
+    // Reservation fields for one of its items, as the modal expects them
+    reservationProps: (txId, item) => {
+        const entry = ReservationModel.get(txId);
+        if (!entry) return null;
+        return { ...entry.record, item: item || entry.items[0] };
+    },
+
+    // Coalesce list/notification re-renders when several snapshots arrive in one frame
+    scheduleReservationViews: () => {
+        if (App.viewsRenderPending) return;
+        App.viewsRenderPending = true;
+        requestAnimationFrame(() => {
+            App.viewsRenderPending = false;
+            App.shadeCalendarDays();
+            App.renderListView();
+            App.updateNotifications();
+            if (!document.getElementById('notifications-popover').classList.contains('hidden')) {
+                App.renderNotifications();
+            }
+        });
+    },
+
+    applyItemChanges: (items) => {
+        App.items = items;
+        App.shadeCalendarDays(); // Gear Shed capacity may have changed
+        if (!document.getElementById('items-view').classList.contains('hidden')) {
+            App.renderItemsView();
         }
     },
 
     bindEvents: () => {
+        // Diagnostics panel
+        document.addEventListener('keydown', (e) => {
+            if (e.ctrlKey && e.shiftKey && (e.key === 'D' || e.key === 'd')) {
+                e.preventDefault();
+                App.toggleDiagnostics();
+            }
+        });
+        document.getElementById('diagnostics-close').addEventListener('click', App.toggleDiagnostics);
+
         // View Switching
         document.getElementById('view-calendar').addEventListener('click', () => App.switchView('calendar'));
         document.getElementById('view-list').addEventListener('click', () => App.switchView('list'));
 
+        // Gear Shed item panels
+        App.bindGearShedPanels();
+
+        // List filters
+        document.getElementById('search-reservations').addEventListener('input', App.handleReservationSearch);
+        document.getElementById('filter-status').addEventListener('change', App.renderListView);
+
         // New Reservation Flow
         document.getElementById('new-reservation-btn').addEventListener('click', () => {
             document.getElementById('type-selection-modal').classList.remove('hidden');
@@ -645,6 +836,8 @@ const App = {
                 // Perform view-specific actions
                 if (viewName === 'calendar') {
                     App.calendar.render(); // Re-render to fix sizing
+                } else if (viewName === 'list') {
+                    if (App.listTable) App.listTable.refresh(); // Row height can only be measured while visible
                 } else if (viewName === 'items') {
                     App.renderItemsView();
                 }
@@ -662,6 +855,8 @@ const App = {
 
             if (viewName === 'calendar') {
                 App.calendar.render();
+            } else if (viewName === 'list') {
+                if (App.listTable) App.listTable.refresh();
             } else if (viewName === 'items') {
                 App.renderItemsView();
             }
@@ -683,15 +878,18 @@ const App = {
         inputs.forEach(input => input.disabled = false);
 
         document.getElementById('res-id').value = '';
+        document.getElementById('res-version').value = '';
         document.getElementById('modal-title').textContent = 'New Reservation';
         document.getElementById('override-container').classList.add('hidden');
         document.getElementById('price-container').classList.add('hidden');
+        document.getElementById('res-availability').classList.add('hidden');
 
         // Hide tracking info by default
         document.getElementById('tracking-info').classList.add('hidden');
 
         // Reset price label to default
         document.getElementById('price-label').textContent = 'Cost';
+        document.getElementById('res-price-detail').textContent = '';
 
         // Reset inputs
         const startDate = document.getElementById('res-start-date');
@@ -719,6 +917,7 @@ const App = {
             // Edit Mode
             document.getElementById('modal-title').textContent = 'Edit Reservation';
             document.getElementById('res-id').value = data.tx_id;
+            document.getElementById('res-version').value = data.last_update || ''; // Sent back so a concurrent edit is caught
             document.getElementById('res-unit').value = data.rented_to;
             document.getElementById('res-type').value = data.resource_type;
 
@@ -727,10 +926,9 @@ const App = {
 
             // For Gear Shed, we need to populate all items with the same tx_id
             if (data.resource_type === 'GEAR_SHED') {
-                // Find all reservations with the same tx_id to get all items
-                const allItemsForReservation = App.reservations
-                    .filter(r => r.extendedProps.tx_id === data.tx_id)
-                    .map(r => r.extendedProps.item);
+                // All items booked under this tx_id
+                const entry = ReservationModel.get(data.tx_id);
+                const allItemsForReservation = entry ? entry.items : [data.item];
 
                 // Find the item_id for each item name and add to selectedGearShedItems
                 App.selectedGearShedItems = [];
@@ -940,14 +1138,14 @@ const App = {
                 itemSearchWrapper.style.display = 'block';
                 itemDualPanel.style.display = 'flex';
 
-                // Filter items (Case-insensitive)
-                const filteredItems = App.items.filter(i => i.resource_type && i.resource_type.toLowerCase() === type.toLowerCase());
-
-                // Store for search filtering
-                App.currentGearShedItems = filteredItems;
+                // Gear Shed items (sorted, indexed for search)
+                App.currentGearShedItems = App.getGearShedIndex().records;
+                App.gearShedMatches = null;
 
                 // Initialize selected items (store IDs, not names)
                 App.selectedGearShedItems = [];
+                App.gearShedUnavailable = new Set();
+                App.gearShedAvailabilityKey = null;
 
                 // Render dual-panel
                 App.renderGearShedDualPanel();
@@ -955,6 +1153,7 @@ const App = {
                 // Bind search
                 itemSearch.value = '';
                 itemSearchClear.style.display = 'none';
+                clearTimeout(App.gearShedSearchTimer);
                 itemSearch.removeEventListener('input', App.handleGearShedSearch);
                 itemSearch.addEventListener('input', App.handleGearShedSearch);
 
@@ -1089,173 +1288,219 @@ const App = {
         App.calculatePrice();
     },
 
-    getReservationCost: (type, sDate, eDate) => {
-        if (type === 'SKY_LOUNGE') {
-            return 300.00;
-        }
-
-        if (type === 'GUEST_SUITE' && sDate && eDate) {
-            const start = new Date(sDate);
-            const end = new Date(eDate);
-
-            let cost = 0;
-            let current = new Date(start);
-            // Simple day loop
-            while (current < end) {
-                const day = current.getUTCDay(); // 0=Sun, 6=Sat
-                // Fri(5) and Sat(6) are weekends? 
-                // "Fri-Sat" usually means Fri night and Sat night.
-                // If day is 5 (Fri) or 6 (Sat), rate is higher.
-                if (day === 5 || day === 6) cost += 175;
-                else cost += 125;
-                current.setDate(current.getDate() + 1);
-                if (cost > 10000) break;
-            }
-            return cost;
+    calculatePrice: () => {
+        const type = document.getElementById('res-type').value;
+        const sDate = document.getElementById('res-start-date').value;
+        const eDate = document.getElementById('res-end-date').value;
+
+        const quote = Pricing.quote(type, sDate, eDate);
+        document.getElementById('res-price').textContent = `$${quote.total.toFixed(2)}`;
+
+        let detail = '';
+        if (quote.nights > 0) {
+            detail = `${quote.nights} night${quote.nights === 1 ? '' : 's'}`;
+            if (quote.weekendNights > 0) detail += `, ${quote.weekendNights} weekend`;
+            if (quote.holidayNights > 0) detail += `, ${quote.holidayNights} holiday`;
         }
+        document.getElementById('res-price-detail').textContent = detail;
 
-        return 0;
+        if (type === 'GEAR_SHED') App.refreshGearShedAvailability();
+        App.updateAvailabilityHint();
     },
 
-    calculatePrice: () => {
-        const type = document.getElementById('res-type').value;
-        const priceDisplay = document.getElementById('res-price');
+    // Ask the backend which Gear Shed items are free for the chosen range (debounced)
+    refreshGearShedAvailability: () => {
         const sDate = document.getElementById('res-start-date').value;
         const eDate = document.getElementById('res-end-date').value;
-
-        const cost = App.getReservationCost(type, sDate, eDate);
-        priceDisplay.textContent = `$${cost.toFixed(2)}`;
+        if (!sDate || !eDate) return;
+        const startTime = `${sDate}T${document.getElementById('res-start-time').value || '00:00'}`;
+        const endTime = `${eDate}T${document.getElementById('res-end-time').value || '23:59'}`;
+        const key = `${startTime}|${endTime}`;
+        if (key === App.gearShedAvailabilityKey) return;
+
+        clearTimeout(App.gearShedAvailabilityTimer);
+        App.gearShedAvailabilityTimer = setTimeout(async () => {
+            App.gearShedAvailabilityKey = key;
+            const names = App.currentGearShedItems.map(item => item.item);
+            const result = await API.getAvailability(names, startTime, endTime, document.getElementById('res-id').value || null);
+            if (App.gearShedAvailabilityKey !== key) return; // Range changed while waiting
+            if (result.status !== 'success') {
+                App.gearShedAvailabilityKey = null;
+                console.error('Availability check failed:', result.message);
+                return;
+            }
+            App.gearShedUnavailable = new Set(result.data.unavailable);
+            App.renderGearShedDualPanel();
+        }, App.SEARCH_DEBOUNCE_MS);
     },
-    // --- Gear Shed Checkbox Functions ---
 
-    renderGearShedDualPanel: (filteredAvailable = null) => {
-        const availableList = document.getElementById('item-available-list');
-        const selectedList = document.getElementById('item-selected-list');
+    // Warn in the form when the chosen dates/items are already booked
+    updateAvailabilityHint: () => {
+        const hint = document.getElementById('res-availability');
+        const type = document.getElementById('res-type').value;
+        const sDate = document.getElementById('res-start-date').value;
+        const eDate = type === 'SKY_LOUNGE' ? sDate : document.getElementById('res-end-date').value;
+        const own = ReservationModel.get(document.getElementById('res-id').value);
 
-        // Get available items (not selected)
-        // Use filtered list if provided (from search), otherwise use all items
-        const sourceItems = filteredAvailable !== null ? filteredAvailable : App.currentGearShedItems;
-        const availableItems = sourceItems.filter(item =>
-            !App.selectedGearShedItems.includes(item.item_id)
-        );
+        let items = [];
+        if (type === 'GEAR_SHED') {
+            const selected = new Set(App.selectedGearShedItems || []);
+            items = (App.currentGearShedItems || []).filter(i => selected.has(i.item_id)).map(i => i.item);
+        }
 
-        // Sort available items alphabetically
-        availableItems.sort((a, b) => a.item.localeCompare(b.item));
+        if (!type || !sDate || !eDate || (own && own.record.status !== 'Scheduled') || (type === 'GEAR_SHED' && items.length === 0)) {
+            hint.classList.add('hidden');
+            return;
+        }
 
-        // Render available items
-        availableList.innerHTML = '';
-        if (availableItems.length === 0) {
-            availableList.innerHTML = '<div class="item-list-empty">No items available</div>';
+        const conflicts = Availability.conflicts({
+            resource_type: type,
+            items,
+            start_time: `${sDate}T${document.getElementById('res-start-time').value || '00:00'}`,
+            end_time: `${eDate}T${document.getElementById('res-end-time').value || '23:59'}`
+        }, own ? own.record : null);
+
+        if (conflicts.length === 0) {
+            hint.textContent = 'Available for these dates';
+            hint.classList.remove('unavailable');
         } else {
-            availableItems.forEach(item => {
-                const div = document.createElement('div');
-                div.className = 'item-list-item';
-                div.textContent = item.item;
-                div.dataset.itemId = item.item_id;
-                div.addEventListener('click', () => App.moveToSelected(item.item_id));
-                availableList.appendChild(div);
+            const dateOf = (day) => new Date(day * Pricing.DAY_MS).toLocaleDateString('en-US', { month: 'short', day: 'numeric', timeZone: 'UTC' });
+            const byKey = new Map();
+            conflicts.forEach(({ key, day }) => {
+                if (!byKey.has(key)) byKey.set(key, []);
+                byKey.get(key).push(dateOf(day));
             });
+            const parts = Array.from(byKey, ([key, days]) => (type === 'GEAR_SHED' ? `${key}: ` : '') + days.join(', '));
+            hint.textContent = `Already booked: ${parts.join('; ')}`;
+            hint.classList.add('unavailable');
         }
+        hint.classList.remove('hidden');
+    },
 
-        // Render selected items
-        selectedList.innerHTML = '';
-        if (App.selectedGearShedItems.length === 0) {
-            selectedList.innerHTML = '<div class="item-list-empty">No items selected</div>';
-        } else {
-            // Get item objects for selected IDs
-            const selectedItemObjects = App.selectedGearShedItems
-                .map(itemId => App.currentGearShedItems.find(i => i.item_id === itemId))
-                .filter(item => item !== undefined);
-
-            // Sort selected items alphabetically
-            selectedItemObjects.sort((a, b) => a.item.localeCompare(b.item));
+    // Calendar classes for resources with nothing left to book on a day
+    fullDayClasses: (day) => {
+        const classes = [];
+        if (Availability.isBooked('GUEST_SUITE', day)) classes.push('full-guest-suite');
+        if (Availability.isBooked('SKY_LOUNGE', day)) classes.push('full-sky-lounge');
+        if (Availability.isFull('GEAR_SHED', day, App.getGearShedIndex().records.length)) classes.push('full-gear-shed');
+        return classes;
+    },
 
-            selectedItemObjects.forEach(itemObj => {
-                const div = document.createElement('div');
-                div.className = 'item-list-item';
-                div.textContent = itemObj.item;
-                div.dataset.itemId = itemObj.item_id;
-                div.addEventListener('click', () => App.moveToAvailable(itemObj.item_id));
-                selectedList.appendChild(div);
+    // Re-apply full-day shading to the month cells currently on screen
+    shadeCalendarDays: () => {
+        document.querySelectorAll('#calendar .fc-daygrid-day[data-date]').forEach(cell => {
+            const classes = App.fullDayClasses(Pricing.dayNumber(cell.dataset.date));
+            ['full-guest-suite', 'full-sky-lounge', 'full-gear-shed'].forEach(name => {
+                cell.classList.toggle(name, classes.includes(name));
             });
-        }
+        });
     },
 
-    handleGearShedSearch: () => {
-        const query = document.getElementById('item-search').value;
-        const clearBtn = document.getElementById('item-search-clear');
+    // --- Gear Shed Checkbox Functions ---
 
-        // Show/hide clear button
-        if (clearBtn) {
-            clearBtn.style.display = query.length > 0 ? 'flex' : 'none';
+    // Search index over the Gear Shed inventory, rebuilt only when App.items is replaced
+    getGearShedIndex: () => {
+        if (!App.gearShedIndex || App.gearShedIndexSource !== App.items) {
+            const gearItems = App.items.filter(i => i.resource_type && i.resource_type.toLowerCase() === 'gear_shed');
+            App.gearShedIndex = SearchIndex.create(gearItems, item => item.item);
+            App.gearShedIndexSource = App.items;
         }
-
-        const filteredItems = App.filterGearShedItems(query, App.currentGearShedItems);
-        App.renderGearShedDualPanel(filteredItems);
+        return App.gearShedIndex;
     },
 
-    filterGearShedItems: (query, items) => {
-        if (!query.trim()) return items;
+    renderGearShedDualPanel: () => {
+        const selected = new Set(App.selectedGearShedItems);
+        const matches = App.gearShedMatches || App.currentGearShedItems;
 
-        // Parse query for modifiers
-        const exactPhrases = [];
-        const exclusions = [];
-        const wildcards = [];
+        // Both lists come from the index already sorted alphabetically
+        App.renderKeyedList(
+            document.getElementById('item-available-list'),
+            matches.filter(item => !selected.has(item.item_id)),
+            'No items available'
+        );
+        App.renderKeyedList(
+            document.getElementById('item-selected-list'),
+            App.currentGearShedItems.filter(item => selected.has(item.item_id)),
+            'No items selected'
+        );
+        App.updateAvailabilityHint();
+    },
 
-        // Extract exact phrases "..."
-        let remaining = query.replace(/"([^"]+)"/g, (match, phrase) => {
-            exactPhrases.push(phrase.toLowerCase());
-            return '';
+    /**
+     * Render items into a list container, reusing the existing node for each
+     * item_id and only inserting, moving or removing what changed.
+     */
+    renderKeyedList: (container, items, emptyText) => {
+        const existing = new Map();
+        Array.from(container.children).forEach(node => {
+            if (node.dataset.itemId !== undefined) existing.set(node.dataset.itemId, node);
+            else node.remove(); // empty-state placeholder
         });
 
-        // Extract tokens
-        const tokens = remaining.split(/\s+/).filter(t => t.length > 0);
-
-        tokens.forEach(token => {
-            if (token.startsWith('-')) {
-                exclusions.push(token.substring(1).toLowerCase());
+        let cursor = container.firstChild;
+        items.forEach(item => {
+            const key = String(item.item_id);
+            let node = existing.get(key);
+            if (node) {
+                existing.delete(key);
+                if (node.textContent !== item.item) node.textContent = item.item;
             } else {
-                wildcards.push(token.toLowerCase());
+                node = document.createElement('div');
+                node.className = 'item-list-item';
+                node.textContent = item.item;
+                node.dataset.itemId = key;
             }
+            node.classList.toggle('unavailable', App.gearShedUnavailable.has(item.item));
+            if (node !== cursor) container.insertBefore(node, cursor);
+            else cursor = cursor.nextSibling;
         });
+        existing.forEach(node => node.remove());
 
-        // Filter items
-        return items.filter(item => {
-            const itemLower = item.item.toLowerCase();
+        if (items.length === 0) {
+            container.innerHTML = `<div class="item-list-empty">${emptyText}</div>`;
+        }
+    },
 
-            // Check exclusions (must NOT match)
-            for (let exc of exclusions) {
-                if (itemLower.includes(exc)) return false;
-            }
+    handleGearShedSearch: () => {
+        const query = document.getElementById('item-search').value;
+        const clearBtn = document.getElementById('item-search-clear');
 
-            // Check exact phrases (must match ALL)
-            for (let phrase of exactPhrases) {
-                if (!itemLower.includes(phrase)) return false;
-            }
+        // Show/hide clear button
+        if (clearBtn) {
+            clearBtn.style.display = query.length > 0 ? 'flex' : 'none';
+        }
 
-            // Check wildcards (must match ALL)
-            for (let wild of wildcards) {
-                const regex = new RegExp(wild.replace(/\*/g, '.*'), 'i');
-                if (!regex.test(itemLower)) return false;
-            }
+        // Debounce: only filter once typing pauses
+        clearTimeout(App.gearShedSearchTimer);
+        App.gearShedSearchTimer = setTimeout(() => App.applyGearShedSearch(query), App.SEARCH_DEBOUNCE_MS);
+    },
 
-            return true;
-        });
+    // List view search: re-filter once typing pauses rather than on every keystroke
+    handleReservationSearch: () => {
+        clearTimeout(App.reservationSearchTimer);
+        App.reservationSearchTimer = setTimeout(App.renderListView, App.SEARCH_DEBOUNCE_MS);
     },
 
+    applyGearShedSearch: (query) => {
+        App.gearShedMatches = query.trim() ? App.filterGearShedItems(query) : null;
+        App.renderGearShedDualPanel();
+    },
+
+    filterGearShedItems: (query) => {
+        return App.getGearShedIndex().search(SearchIndex.compile(query));
+    },
+
+    // Moving items keeps the current search results; only the panels are re-rendered
     moveToSelected: (itemId) => {
+        const item = App.currentGearShedItems.find(i => i.item_id === itemId);
+        if (item && App.gearShedUnavailable.has(item.item)) {
+            App.showAlert(`${item.item} is already booked for these dates.`, 'error');
+            return;
+        }
         if (!App.selectedGearShedItems.includes(itemId)) {
             App.selectedGearShedItems.push(itemId);
             App.selectedGearShedItems.sort((a, b) => a - b); // Sort numerically by ID
-
-            // Preserve search - reapply current filter
-            const query = document.getElementById('item-search')?.value || '';
-            if (query) {
-                const filteredItems = App.filterGearShedItems(query, App.currentGearShedItems);
-                App.renderGearShedDualPanel(filteredItems);
-            } else {
-                App.renderGearShedDualPanel();
-            }
+            App.renderGearShedDualPanel();
         }
     },
 
@@ -1263,18 +1508,28 @@ const App = {
         const index = App.selectedGearShedItems.indexOf(itemId);
         if (index > -1) {
             App.selectedGearShedItems.splice(index, 1);
-
-            // Preserve search - reapply current filter
-            const query = document.getElementById('item-search')?.value || '';
-            if (query) {
-                const filteredItems = App.filterGearShedItems(query, App.currentGearShedItems);
-                App.renderGearShedDualPanel(filteredItems);
-            } else {
-                App.renderGearShedDualPanel();
-            }
+            App.renderGearShedDualPanel();
         }
     },
 
+    // Delegated clicks for both panels (bound once)
+    bindGearShedPanels: () => {
+        const itemIdOf = (e) => {
+            const node = e.target.closest('.item-list-item');
+            if (!node) return null;
+            const item = App.currentGearShedItems.find(i => String(i.item_id) === node.dataset.itemId);
+            return item ? item.item_id : null;
+        };
+        document.getElementById('item-available-list').addEventListener('click', (e) => {
+            const itemId = itemIdOf(e);
+            if (itemId !== null) App.moveToSelected(itemId);
+        });
+        document.getElementById('item-selected-list').addEventListener('click', (e) => {
+            const itemId = itemIdOf(e);
+            if (itemId !== null) App.moveToAvailable(itemId);
+        });
+    },
+
     handleClearSearch: () => {
         const itemSearch = document.getElementById('item-search');
         const clearBtn = document.getElementById('item-search-clear');
@@ -1283,7 +1538,8 @@ const App = {
         if (clearBtn) clearBtn.style.display = 'none';
 
         // Re-render with full list
-        App.renderGearShedDualPanel();
+        clearTimeout(App.gearShedSearchTimer);
+        App.applyGearShedSearch('');
     },
 
     handleFormSubmit: async (e) => {
@@ -1336,12 +1592,7 @@ const App = {
                 return;
             }
 
-            const start = new Date(sDate);
-            const end = new Date(eDate);
-            const diffTime = Math.abs(end - start);
-            const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-
-            if (diffDays < 2) {
+            if (Pricing.quote(type, sDate, eDate).nights < 2) {
                 App.showAlert('Guest Suite must be booked for 2 or more nights.', 'error');
                 return;
             }
@@ -1369,7 +1620,7 @@ const App = {
             rental_notes: document.getElementById('res-notes').value,
             override_lock: document.getElementById('res-override').checked,
             scheduled_by: App.selectedStaff ? (App.selectedStaff.name || App.selectedStaff.staff_name) : 'Staff',
-            total_cost: App.getReservationCost(type, sDate, eDate)
+            total_cost: Pricing.cost(type, sDate, eDate)
         };
 
         // Add edit tracking if this is an update
@@ -1379,53 +1630,55 @@ const App = {
             formData.last_update = App.formatTimestamp();
         }
 
-        const refreshBtn = document.getElementById('refresh-data-btn');
+        // Applied locally right away; the write is queued for Firestore (see Mutations)
+        let write;
+        if (id) {
+            // Update existing reservation
+            formData.tx_id = id;
+            write = Mutations.updateReservation(formData, document.getElementById('res-version').value);
+        } else {
+            // Create new reservation (single document with items array)
+            write = Mutations.createReservation(formData);
+        }
+
+        document.getElementById('reservation-modal').classList.add('hidden');
 
-        try {
-            // Start spinner
-            if (refreshBtn) refreshBtn.classList.add('spinning');
-
-            let response;
-            if (id) {
-                // Update existing reservation
-                formData.tx_id = id;
-                response = await API.updateReservation(formData);
-            } else {
-                // Create new reservation (single document with items array)
-                response = await API.createReservation(formData);
+        // Check if calendar email should be sent (only once the booking is actually saved)
+        const sendCalendarEmail = document.getElementById('send-calendar-email').checked;
+        App.reportWhenCommitted(write, 'Reservation saved!', sendCalendarEmail ? async () => {
+            try {
+                // Send calendar email with reservation details
+                await CalendarUtils.sendCalendarEmail(formData, 'beacon85@greystar.com');
+                App.showAlert('Reservation saved and calendar email sent!', 'success');
+            } catch (emailError) {
+                console.error('Failed to send calendar email:', emailError);
+                App.showAlert('Reservation saved, but failed to send calendar email. Please check your Gmail permissions.', 'warning');
             }
+        } : null);
+    },
 
-            if (response.status === 'success') {
-                document.getElementById('reservation-modal').classList.add('hidden');
-                await App.loadData(true, false); // Force refresh and wait, don't manage spinner
-
-                // Check if calendar email should be sent
-                const sendCalendarEmail = document.getElementById('send-calendar-email').checked;
-                if (sendCalendarEmail) {
-                    try {
-                        // Send calendar email with reservation details
-                        await CalendarUtils.sendCalendarEmail(formData, 'beacon85@greystar.com');
-                        App.showAlert('Reservation saved and calendar email sent!', 'success');
-                    } catch (emailError) {
-                        console.error('Failed to send calendar email:', emailError);
-                        App.showAlert('Reservation saved, but failed to send calendar email. Please check your Gmail permissions.', 'warning');
-                    }
-                } else {
-                    App.showAlert('Reservation saved!', 'success');
-                }
-            } else {
-                App.showAlert(response.message || 'Error saving reservation', 'error');
+    /**
+     * Confirm a queued write once the server has accepted it. While offline the
+     * user is told it is queued; a rejected write is undone and reported by
+     * Mutations.rollback, so nothing is shown here for it.
+     * @param {Object} write - { committed } as returned by Mutations
+     * @param {string|Function} message - Success message, or (result) => message (null = none)
+     * @param {Function} [onCommitted] - Runs instead of showing `message`
+     */
+    reportWhenCommitted: (write, message, onCommitted = null) => {
+        if (!navigator.onLine) App.showAlert('You are offline: the change is queued and will be saved when the connection returns.', 'warning');
+        return write.committed.then(async (result) => {
+            if (onCommitted) {
+                await onCommitted();
+                return;
             }
-        } catch (error) {
-            App.showAlert('An error occurred.', 'error');
-        } finally {
-            if (refreshBtn) refreshBtn.classList.remove('spinning');
-        }
+            const text = typeof message === 'function' ? message(result) : message;
+            if (text) App.showAlert(text, 'success');
+        }, () => {});
     },
     handleCancellation: async () => {
         const id = document.getElementById('res-id').value;
         const btn = document.getElementById('cancel-reservation-btn');
-        const refreshBtn = document.getElementById('refresh-data-btn');
         const type = document.getElementById('res-type').value;
         const startDateStr = document.getElementById('res-start-date').value;
         const startTimeStr = document.getElementById('res-start-time').value;
@@ -1437,25 +1690,10 @@ const App = {
             App.showConfirmation(
                 'Delete Reservation',
                 'Are you sure you want to permanently delete this cancelled reservation? This action cannot be undone.',
-                async () => {
-                    try {
-                        // Start spinner
-                        if (refreshBtn) refreshBtn.classList.add('spinning');
-
-                        const response = await API.deleteReservation(id);
-                        if (response.status === 'success') {
-                            document.getElementById('reservation-modal').classList.add('hidden');
-                            await App.loadData(true, false); // Force refresh and wait, don't manage spinner
-                            App.showAlert('Reservation deleted successfully.', 'success');
-                        } else {
-                            App.showAlert(response.message || 'Error deleting reservation', 'error');
-                        }
-                    } catch (error) {
-                        console.error('Deletion failed:', error);
-                        App.showAlert('Failed to delete reservation.', 'error');
-                    } finally {
-                        if (refreshBtn) refreshBtn.classList.remove('spinning');
-                    }
+                () => {
+                    const write = Mutations.deleteReservation(id);
+                    document.getElementById('reservation-modal').classList.add('hidden');
+                    App.reportWhenCommitted(write, 'Reservation deleted successfully.');
                 },
                 'Yes, Delete',
                 'var(--error)'
@@ -1488,33 +1726,12 @@ const App = {
         App.showConfirmation(
             'Cancel Reservation',
             message,
-            async () => {
-                try {
-                    // Start spinner
-                    if (refreshBtn) refreshBtn.classList.add('spinning');
-
-                    let response;
-                    if (fee > 0) {
-                        // Soft Cancel (Fee applied)
-                        response = await API.cancelReservation(id, fee);
-                    } else {
-                        // Hard Delete (No fee)
-                        response = await API.deleteReservation(id);
-                    }
+            () => {
+                // Soft Cancel (Fee applied) or Hard Delete (No fee)
+                const write = fee > 0 ? Mutations.cancelReservation(id, fee) : Mutations.deleteReservation(id);
 
-                    if (response.status === 'success') {
-                        document.getElementById('reservation-modal').classList.add('hidden');
-                        await App.loadData(true, false); // Force refresh and wait, don't manage spinner
-                        App.showAlert(fee > 0 ? `Reservation cancelled. $${fee} fee applied.` : 'Reservation cancelled successfully.', 'success');
-                    } else {
-                        App.showAlert(response.message || 'Error cancelling reservation', 'error');
-                    }
-                } catch (error) {
-                    console.error('Cancellation failed:', error);
-                    App.showAlert('Failed to cancel reservation.', 'error');
-                } finally {
-                    if (refreshBtn) refreshBtn.classList.remove('spinning');
-                }
+                document.getElementById('reservation-modal').classList.add('hidden');
+                App.reportWhenCommitted(write, fee > 0 ? `Reservation cancelled. $${fee} fee applied.` : 'Reservation cancelled successfully.');
             },
             'Yes, Cancel',
             'var(--warning)'
@@ -1523,32 +1740,17 @@ const App = {
 
     handleRestore: async () => {
         const id = document.getElementById('res-id').value;
-        const refreshBtn = document.getElementById('refresh-data-btn');
 
         if (!id) return;
 
         App.showConfirmation(
             'Restore Reservation',
             "Are you sure you want to restore this cancelled reservation? It will be returned to 'Scheduled' status.",
-            async () => {
-                try {
-                    // Start spinner
-                    if (refreshBtn) refreshBtn.classList.add('spinning');
-
-                    const response = await API.restoreReservation(id);
-                    if (response.status === 'success') {
-                        document.getElementById('reservation-modal').classList.add('hidden');
-                        await App.loadData(true, false); // Force refresh and wait, don't manage spinner
-                        App.showAlert('Reservation restored successfully.', 'success');
-                    } else {
-                        App.showAlert(response.message || 'Error restoring reservation', 'error');
-                    }
-                } catch (error) {
-                    console.error('Restore failed:', error);
-                    App.showAlert('Failed to restore reservation.', 'error');
-                } finally {
-                    if (refreshBtn) refreshBtn.classList.remove('spinning');
-                }
+            () => {
+                const write = Mutations.restoreReservation(id);
+                document.getElementById('reservation-modal').classList.add('hidden');
+                App.reportWhenCommitted(write, 'Reservation restored successfully.');
+                write.committed.then(App.resetArchive, () => {}); // Archived rows may be stale now
             },
             'Yes, Restore',
             'var(--success)'
@@ -1655,167 +1857,318 @@ const App = {
         const form = e.target;
         const txId = form.dataset.txId;
         const returnNotes = document.getElementById('complete-return-notes').value;
-        const refreshBtn = document.getElementById('refresh-data-btn');
 
-        try {
-            // Start spinner
-            if (refreshBtn) refreshBtn.classList.add('spinning');
+        const write = Mutations.completeReservation(txId, returnNotes, App.selectedStaff ? (App.selectedStaff.name || App.selectedStaff.staff_name) : 'Staff');
 
-            const response = await API.completeReservation(txId, returnNotes, App.selectedStaff ? (App.selectedStaff.name || App.selectedStaff.staff_name) : 'Staff');
+        // Close both modals
+        document.getElementById('complete-reservation-modal').classList.add('hidden');
+        document.getElementById('reservation-modal').classList.add('hidden');
 
-            if (response.status === 'success') {
-                // Close both modals
-                document.getElementById('complete-reservation-modal').classList.add('hidden');
-                document.getElementById('reservation-modal').classList.add('hidden');
+        App.reportWhenCommitted(write, 'Reservation marked as complete!');
+    },
 
-                // Reload data
-                await App.loadData(true, false);
+    // --- List View ---
 
-                App.showAlert('Reservation marked as complete!', 'success');
-            } else {
-                App.showAlert(response.message || 'Error completing reservation', 'error');
-            }
-        } catch (error) {
-            console.error('Completion failed:', error);
-            App.showAlert('Failed to complete reservation.', 'error');
-        } finally {
-            if (refreshBtn) refreshBtn.classList.remove('spinning');
-        }
+    // Format date as DD/MM/YY
+    formatListDate: (d) => {
+        const day = d.getDate().toString().padStart(2, '0');
+        const month = (d.getMonth() + 1).toString().padStart(2, '0');
+        const year = d.getFullYear().toString().slice(-2);
+        return `${day}/${month}/${year}`;
     },
 
-    renderListView: () => {
-        const tbody = document.querySelector('#reservations-table tbody');
-        tbody.innerHTML = '';
+    // Format time as 12-hour format (H:MM AM/PM)
+    formatListTime: (d) => {
+        let hours = d.getHours();
+        const minutes = d.getMinutes().toString().padStart(2, '0');
+        const ampm = hours >= 12 ? 'PM' : 'AM';
+        hours = hours % 12;
+        hours = hours ? hours : 12; // 0 should be 12
+        return `${hours}:${minutes} ${ampm}`;
+    },
 
-        // Helper function to format date as DD/MM/YY
-        const formatDate = (date) => {
-            const d = new Date(date);
-            const day = d.getDate().toString().padStart(2, '0');
-            const month = (d.getMonth() + 1).toString().padStart(2, '0');
-            const year = d.getFullYear().toString().slice(-2);
-            return `${day}/${month}/${year}`;
+    /**
+     * List row model for one reservation (one row per item). Dates are parsed,
+     * search/sort keys lowercased and display strings formatted once here,
+     * when the reservation changes, instead of on every keystroke or sort.
+     */
+    buildListRows: (entry) => entry.items.map(item => {
+        const props = entry.record;
+        const start = new Date(entry.startMs);
+        const end = new Date(entry.endMs);
+        const lower = (value) => (value || '').toString().toLowerCase();
+        const price = parseFloat(props.status === 'Cancelled' && props.cancellation_fee ? props.cancellation_fee : (props.total_cost || 0));
+
+        return {
+            key: `${entry.tx_id}:${item}`,
+            props,
+            item,
+            startMs: entry.startMs,
+            endMs: entry.endMs,
+            totalCost: parseFloat(props.total_cost || 0),
+            searchKey: [props.rented_to, item, props.scheduled_by].filter(Boolean).join('\n').toLowerCase(),
+            sortKeys: {
+                rented_to: lower(props.rented_to),
+                item: lower(item),
+                status: lower(props.status),
+                scheduled_by: lower(props.scheduled_by)
+            },
+            startText: `${App.formatListDate(start)} ${App.formatListTime(start)}`,
+            endText: `${App.formatListDate(end)} ${App.formatListTime(end)}`,
+            priceText: `$${price.toFixed(2)}`
         };
+    }),
 
-        // Helper function to format time as 12-hour format (HH:MM AM/PM)
-        const formatTime = (date) => {
-            const d = new Date(date);
-            let hours = d.getHours();
-            const minutes = d.getMinutes().toString().padStart(2, '0');
-            const ampm = hours >= 12 ? 'PM' : 'AM';
-            hours = hours % 12;
-            hours = hours ? hours : 12; // 0 should be 12
-            return `${hours}:${minutes} ${ampm}`;
-        };
+    renderListRow: (tr, row) => {
+        const props = row.props;
+        tr.className = props.status === 'Cancelled' ? 'cancelled' : '';
 
+        const rentalNotes = props.rental_notes || '';
+        const returnNotes = props.return_notes || '';
+
+        // Color Coding Logic
+        let colorClass = '';
+        const type = props.resource_type;
+
+        if (type === 'GUEST_SUITE') {
+            colorClass = 'text-guest-suite';
+        } else if (type === 'GEAR_SHED') {
+            colorClass = 'text-gear-shed';
+        } else if (type === 'SKY_LOUNGE') {
+            colorClass = 'text-sky-lounge';
+        }
+
+        // Item Cell Content: Indicator + Item Name
+        const itemContent = `
+            <span class="color-indicator ${type === 'GUEST_SUITE' ? 'bg-guest-suite' : type === 'GEAR_SHED' ? 'bg-gear-shed' : 'bg-sky-lounge'}"></span>
+            <span class="${colorClass}" style="font-weight: 500;">${row.item}</span>
+        `;
+
+        tr.innerHTML = `
+            <td>${props.rented_to}</td>
+            <td>${itemContent}</td>
+            <td>${row.startText}</td>
+            <td>${row.endText}</td>
+            <td>${row.priceText}</td>
+            <td><span class="status-badge ${props.status.toLowerCase()}">${props.status}</span></td>
+            <td>${props.scheduled_by || ''}</td>
+            <td>${props.completed_by || ''}</td>
+            <td class="notes-cell" title="${rentalNotes.replace(/"/g, '&quot;')}">${rentalNotes}</td>
+            <td class="notes-cell" title="${returnNotes.replace(/"/g, '&quot;')}">${returnNotes}</td>
+            <td>
+                ${row.archived ? '<span class="status-badge archived">Archived</span>' : `<button class="icon-btn edit-btn" data-id="${props.tx_id}">Edit</button>`}
+            </td>
+        `;
+    },
+
+    renderListView: () => {
+        const endSpan = Metrics.start('renderListView');
+        if (!App.listTable) {
+            const tbody = document.querySelector('#reservations-table tbody');
+            App.listTable = VirtualTable.create({
+                container: document.querySelector('#list-view .table-container'),
+                tbody,
+                columns: 11,
+                getKey: (row) => row.key,
+                renderRow: App.renderListRow,
+                emptyText: 'No reservations found.'
+            });
 
+            // One delegated handler instead of re-binding every Edit button
+            tbody.addEventListener('click', (e) => {
+                const btn = e.target.closest('.edit-btn');
+                if (!btn) return;
+                const props = App.reservationProps(btn.dataset.id);
+                if (props) App.openReservationModal(props);
+            });
+        }
 
-        // Filter by status if needed (simple client-side filter for now)
+        // Filter by status and search text against the precomputed row model
         const statusFilter = document.getElementById('filter-status').value;
         const searchFilter = document.getElementById('search-reservations').value.toLowerCase();
 
-        let filteredReservations = App.reservations.filter(r => {
-            const props = r.extendedProps;
-            const matchesStatus = statusFilter === 'all' || props.status === statusFilter;
-            const matchesSearch = !searchFilter ||
-                (props.rented_to && props.rented_to.toLowerCase().includes(searchFilter)) ||
-                (props.item && props.item.toLowerCase().includes(searchFilter)) ||
-                (props.scheduled_by && props.scheduled_by.toLowerCase().includes(searchFilter));
-            return matchesStatus && matchesSearch;
+        const filteredRows = [];
+        const addRows = (txRows) => txRows.forEach(row => {
+            if (!searchFilter || row.searchKey.includes(searchFilter)) filteredRows.push(row);
         });
+        if (statusFilter === 'archived') {
+            // Archived reservations aren't in the live model; they're paged in on demand
+            if (!App.archive.loaded) App.loadArchivePage();
+            addRows(App.archive.rows);
+        } else if (statusFilter === 'all') {
+            App.listRowsByTx.forEach(addRows);
+        } else {
+            ReservationModel.idsWithStatus(statusFilter).forEach(txId => addRows(App.listRowsByTx.get(txId) || []));
+        }
 
         // Sort Reservations
-        if (App.currentReservationSortField) {
-            filteredReservations.sort((a, b) => {
-                const field = App.currentReservationSortField;
-                const dir = App.currentReservationSortDirection === 'asc' ? 1 : -1;
-                let valA, valB;
-
-                // Extract values based on field
-                if (field === 'start') {
-                    valA = new Date(a.start).getTime();
-                    valB = new Date(b.start).getTime();
-                } else if (field === 'end') {
-                    valA = new Date(a.end).getTime();
-                    valB = new Date(b.end).getTime();
-                } else if (field === 'total_cost') {
-                    valA = parseFloat(a.extendedProps.total_cost || 0);
-                    valB = parseFloat(b.extendedProps.total_cost || 0);
-                } else {
-                    // String fields
-                    valA = (a.extendedProps[field] || '').toString().toLowerCase();
-                    valB = (b.extendedProps[field] || '').toString().toLowerCase();
-                }
-
+        const field = App.currentReservationSortField;
+        if (field) {
+            const dir = App.currentReservationSortDirection === 'asc' ? 1 : -1;
+            const valueOf = field === 'start' ? (row) => row.startMs
+                : field === 'end' ? (row) => row.endMs
+                    : field === 'total_cost' ? (row) => row.totalCost
+                        : (row) => row.sortKeys[field] || '';
+
+            filteredRows.sort((a, b) => {
+                const valA = valueOf(a);
+                const valB = valueOf(b);
                 if (valA < valB) return -1 * dir;
                 if (valA > valB) return 1 * dir;
                 return 0;
             });
         } else {
             // Default Sort: Start Date Descending (Newest first)
-            filteredReservations.sort((a, b) => {
-                return new Date(b.start).getTime() - new Date(a.start).getTime();
-            });
+            filteredRows.sort((a, b) => b.startMs - a.startMs);
         }
 
-        filteredReservations.forEach(r => {
-            const tr = document.createElement('tr');
-            if (r.extendedProps.status === 'Cancelled') {
-                tr.classList.add('cancelled');
-            }
+        App.listTable.setRows(filteredRows);
+        App.renderListPagination();
+        endSpan();
+    },
 
-            const rentalNotes = r.extendedProps.rental_notes || '';
-            const returnNotes = r.extendedProps.return_notes || '';
+    renderListPagination: () => {
+        const container = document.getElementById('pagination-controls');
+        if (!container || !App.listFrom) return;
+
+        if (document.getElementById('filter-status').value === 'archived') {
+            container.innerHTML = '';
+            if (!App.archive.cursor) return;
+            // Archived search runs on the client, so it can't see pages that haven't been loaded
+            const hint = document.createElement('p');
+            hint.className = 'list-hint';
+            hint.textContent = `Search covers the ${App.archive.rows.length} archived reservations loaded so far.`;
+            container.appendChild(hint);
+            const more = document.createElement('button');
+            more.type = 'button';
+            more.className = 'secondary-btn';
+            more.textContent = 'Load more archived reservations';
+            more.addEventListener('click', () => {
+                more.disabled = true;
+                App.loadArchivePage();
+            });
+            container.appendChild(more);
+            return;
+        }
 
+        const d = App.listFrom;
+        const label = `${d.getDate().toString().padStart(2, '0')}/${(d.getMonth() + 1).toString().padStart(2, '0')}/${d.getFullYear().toString().slice(-2)}`;
 
+        container.innerHTML = '';
+        const btn = document.createElement('button');
+        btn.type = 'button';
+        btn.className = 'secondary-btn';
+        btn.textContent = `Load reservations ending before ${label}`;
+        btn.addEventListener('click', async () => {
+            btn.disabled = true;
+            try {
+                await App.loadOlderReservations();
+            } catch (error) {
+                btn.disabled = false; // Already reported; let the user retry
+            }
+        });
+        container.appendChild(btn);
+    },
 
-            // Color Coding Logic
-            let colorClass = '';
-            let typeLabel = '';
-            const type = r.extendedProps.resource_type;
+    loadArchivePage: async () => {
+        if (App.archive.loading) return;
+        App.archive.loading = true;
+        try {
+            const response = await API.getArchivedReservations({ limit: App.ARCHIVE_PAGE_SIZE, cursor: App.archive.cursor });
+            if (response.status !== 'success') throw new Error(response.message);
+            response.data.forEach(record => {
+                App.buildListRows(ReservationModel.entryFor(record)).forEach(row => {
+                    row.archived = true;
+                    App.archive.rows.push(row);
+                });
+            });
+            App.archive.cursor = response.cursor;
+        } catch (error) {
+            console.error('Failed to load archived reservations:', error);
+            App.showAlert('Failed to load archived reservations.', 'error');
+        } finally {
+            App.archive.loaded = true;
+            App.archive.loading = false;
+        }
+        App.renderListView();
+    },
 
-            if (type === 'GUEST_SUITE') {
-                colorClass = 'text-guest-suite';
-                typeLabel = 'Guest Suite';
-            } else if (type === 'GEAR_SHED') {
-                colorClass = 'text-gear-shed';
-                typeLabel = 'Gear Shed';
-            } else if (type === 'SKY_LOUNGE') {
-                colorClass = 'text-sky-lounge';
-                typeLabel = 'Sky Lounge';
+    /**
+     * Run a daily maintenance job (`run` resolves with an API result) at most once a day
+     * across all clients: the first client to claim the Firestore lease runs it.
+     * The local meta only saves the lease check once this browser knows today is done.
+     * @returns {Promise<Object|null>} The job's result, or null if it didn't run here
+     */
+    runDailyJob: async (job, run) => {
+        const today = App.toQueryDate(new Date()).slice(0, 10);
+        const meta = await Cache.getMeta(job);
+        if (meta && meta.lastRun === today) return null;
+
+        let result = null;
+        try {
+            const token = await API.claimDailyJob(job, today);
+            if (!token) {
+                await Cache.setMeta(job, { lastRun: today }); // Done (or being done) elsewhere
+                return null;
             }
+            result = await run();
+            await API.finishDailyJob(job, token, today, result.status === 'success');
+            if (result.status !== 'success') throw new Error(result.message);
+            await Cache.setMeta(job, { lastRun: today });
+        } catch (error) {
+            console.error(`Daily ${job} job failed:`, error);
+        }
+        return result;
+    },
 
-            // Item Cell Content: Indicator + Item Name
-            const itemContent = `
-                <span class="color-indicator ${type === 'GUEST_SUITE' ? 'bg-guest-suite' : type === 'GEAR_SHED' ? 'bg-gear-shed' : 'bg-sky-lounge'}"></span>
-                <span class="${colorClass}" style="font-weight: 500;">${r.extendedProps.item}</span>
-            `;
+    // Prune old deletion tombstones once a day
+    pruneDeletionsIfDue: () => App.runDailyJob('deletions', API.pruneDeletions),
 
-            tr.innerHTML = `
-                <td>${r.extendedProps.rented_to}</td>
-                <td>${itemContent}</td>
-                <td>${formatDate(r.start)} ${formatTime(r.start)}</td>
-                <td>${formatDate(r.end)} ${formatTime(r.end)}</td>
-                <td>$${parseFloat(r.extendedProps.status === 'Cancelled' && r.extendedProps.cancellation_fee ? r.extendedProps.cancellation_fee : (r.extendedProps.total_cost || 0)).toFixed(2)}</td>
-                <td><span class="status-badge ${r.extendedProps.status.toLowerCase()}">${r.extendedProps.status}</span></td>
-                <td>${r.extendedProps.scheduled_by || ''}</td>
-                <td>${r.extendedProps.completed_by || ''}</td>
-                <td class="notes-cell">${rentalNotes}</td>
-                <td class="notes-cell">${returnNotes}</td>
-                <td>
-                    <button class="icon-btn edit-btn" data-id="${r.extendedProps.tx_id}">Edit</button>
-                </td>
-            `;
-            tbody.appendChild(tr);
-        });
+    // Sweep old finished reservations into the archive once a day
+    archiveIfDue: async () => {
+        const result = await App.runDailyJob('archive', () => API.archiveReservations());
+        if (result && result.status === 'success' && result.archived > 0) {
+            App.resetArchive();
+            if (document.getElementById('filter-status').value === 'archived') App.renderListView();
+        }
+    },
 
-        // Re-bind edit buttons
-        document.querySelectorAll('.edit-btn').forEach(btn => {
-            btn.addEventListener('click', (e) => {
-                const id = e.target.dataset.id;
-                const res = App.reservations.find(r => r.extendedProps.tx_id === id);
-                if (res) App.openReservationModal(res.extendedProps);
-            });
-        });
+    // Drop the archived rows loaded so far; they're paged in again when next shown
+    resetArchive: () => {
+        App.archive = { rows: [], cursor: null, loaded: false, loading: false };
+    },
+
+    // --- Diagnostics ---
+
+    toggleDiagnostics: () => {
+        const panel = document.getElementById('diagnostics-panel');
+        const show = panel.classList.contains('hidden');
+        panel.classList.toggle('hidden', !show);
+        clearInterval(App.diagnosticsTimer);
+        App.diagnosticsTimer = null;
+        if (show) {
+            App.renderDiagnostics();
+            App.diagnosticsTimer = setInterval(App.renderDiagnostics, App.DIAGNOSTICS_REFRESH_MS);
+        }
+    },
+
+    renderDiagnostics: async () => {
+        const stats = await Cache.getStats();
+        const ms = (value) => `${value.toFixed(1)} ms`;
+        const table = (headers, rows) => `
+            <table class="diagnostics-table">
+                <thead><tr>${headers.map(h => `<th>${h}</th>`).join('')}</tr></thead>
+                <tbody>${rows.length ? rows.map(r => `<tr>${r.map(c => `<td>${c}</td>`).join('')}</tr>`).join('') : `<tr><td colspan="${headers.length}">No data yet</td></tr>`}</tbody>
+            </table>`;
+
+        document.getElementById('diagnostics-body').innerHTML = `
+            <h4>Operations</h4>
+            ${table(['Operation', 'Count', 'p50', 'p95', 'Max'], Metrics.summary().map(o => [o.name, o.count, ms(o.p50), ms(o.p95), ms(o.max)]))}
+            <h4>Counters</h4>
+            ${table(['Counter', 'Total'], Array.from(Metrics.counters.keys()).sort().map(name => [name, Metrics.counters.get(name)]))}
+            <h4>Cache</h4>
+            ${table(['Store', 'Docs', 'Size', 'Mark'], stats.stores.map(c => [c.key, c.count, `${(c.size / 1024).toFixed(1)} KB`, c.mark ? new Date(c.mark).toLocaleString() : '-']))}
+            <p class="diagnostics-note">Queued writes: ${stats.queued} &middot; Loaded reservations: ${ReservationModel.byTx.size}</p>`;
     },
 
     showAlert: (msg, type = 'info') => {
@@ -1965,6 +2318,13 @@ const App = {
                 popover.classList.add('hidden');
             }
         });
+
+        // Multi-select: select all / complete selected
+        document.getElementById('notifications-select-all').addEventListener('change', (e) => {
+            App.selectedCompletions = new Set(e.target.checked ? App.getPendingCompletions().map(entry => entry.tx_id) : []);
+            App.renderNotifications();
+        });
+        document.getElementById('notifications-complete-btn').addEventListener('click', App.completeSelectedNotifications);
     },
 
     toggleNotifications: () => {
@@ -1989,28 +2349,17 @@ const App = {
         }
     },
 
-    updateNotifications: () => {
-        // Count unique reservations (by tx_id) that need completion
-        const today = new Date();
-        today.setHours(0, 0, 0, 0);
-
-        const uniqueTxIds = new Set();
-
-        App.reservations.forEach(res => {
-            const props = res.extendedProps;
-
-            // Only count scheduled reservations where end date has passed
-            if (props.status === 'Scheduled') {
-                const endDate = new Date(props.end_time);
-                endDate.setHours(0, 0, 0, 0);
-
-                if (endDate <= today) {
-                    uniqueTxIds.add(props.tx_id);
-                }
-            }
-        });
+    // Scheduled reservations ending today or earlier, oldest first
+    getPendingCompletions: () => {
+        const tomorrow = new Date();
+        tomorrow.setHours(0, 0, 0, 0);
+        tomorrow.setDate(tomorrow.getDate() + 1);
+        return ReservationModel.pendingBefore(tomorrow.getTime());
+    },
 
-        const count = uniqueTxIds.size;
+    updateNotifications: () => {
+        // Count reservations (by tx_id) that need completion
+        const count = App.getPendingCompletions().length;
         const badge = document.getElementById('notifications-badge');
 
         if (count > 0) {
@@ -2027,44 +2376,32 @@ const App = {
 
         list.innerHTML = '';
 
-        // Get unique reservations that need completion
+        // Reservations that need completion, already sorted by end date (oldest first)
         const today = new Date();
         today.setHours(0, 0, 0, 0);
 
-        const pendingReservations = new Map(); // Use Map to group by tx_id
-
-        App.reservations.forEach(res => {
-            const props = res.extendedProps;
-
-            if (props.status === 'Scheduled') {
-                const endDate = new Date(props.end_time);
-                endDate.setHours(0, 0, 0, 0);
+        const pendingReservations = App.getPendingCompletions();
 
-                if (endDate <= today) {
-                    // If we haven't seen this tx_id yet, or if this is the first item, store it
-                    if (!pendingReservations.has(props.tx_id)) {
-                        pendingReservations.set(props.tx_id, props);
-                    }
-                }
-            }
+        // Drop selections that are no longer pending
+        const pendingIds = new Set(pendingReservations.map(entry => entry.tx_id));
+        App.selectedCompletions.forEach(id => {
+            if (!pendingIds.has(id)) App.selectedCompletions.delete(id);
         });
+        App.updateNotificationActions(pendingReservations.length);
 
-        if (pendingReservations.size === 0) {
+        if (pendingReservations.length === 0) {
             list.innerHTML = '<div class="notifications-empty">No pending completions</div>';
             return;
         }
 
-        // Sort by end date (oldest first)
-        const sortedReservations = Array.from(pendingReservations.values()).sort((a, b) => {
-            return new Date(a.end_time) - new Date(b.end_time);
-        });
-
-        sortedReservations.forEach(props => {
+        pendingReservations.forEach(entry => {
+            const props = App.reservationProps(entry.tx_id);
             const item = document.createElement('div');
             item.className = 'notification-item';
             item.dataset.txId = props.tx_id;
+            if (App.selectedCompletions.has(props.tx_id)) item.classList.add('selected');
 
-            const endDate = new Date(props.end_time);
+            const endDate = new Date(entry.endMs);
             const daysOverdue = Math.floor((today - endDate) / (1000 * 60 * 60 * 24));
 
             // Format dates
@@ -2085,14 +2422,25 @@ const App = {
 
             item.innerHTML = `
                 <div class="notification-item-header">
-                    <span class="notification-item-unit">Unit ${props.rented_to}</span>
+                    <span class="notification-item-select">
+                        <input type="checkbox" class="notification-select" aria-label="Select Unit ${props.rented_to}" ${App.selectedCompletions.has(props.tx_id) ? 'checked' : ''}>
+                        <span class="notification-item-unit">Unit ${props.rented_to}</span>
+                    </span>
                     <span class="notification-item-overdue">${overdueText}</span>
                 </div>
                 <div class="notification-item-item">${props.item}</div>
                 <div class="notification-item-period">${formatDateTime(props.start_time)} - ${formatDateTime(props.end_time)}</div>
             `;
 
-            item.addEventListener('click', () => {
+            item.addEventListener('click', (e) => {
+                // Only the checkbox toggles selection; anywhere else (the unit included) opens the reservation
+                if (e.target.classList.contains('notification-select')) {
+                    if (e.target.checked) App.selectedCompletions.add(props.tx_id);
+                    else App.selectedCompletions.delete(props.tx_id);
+                    item.classList.toggle('selected', e.target.checked);
+                    App.updateNotificationActions(pendingReservations.length);
+                    return;
+                }
                 App.openNotificationReservation(props);
             });
 
@@ -2100,6 +2448,41 @@ const App = {
         });
     },
 
+    updateNotificationActions: (pendingCount) => {
+        const actions = document.getElementById('notifications-actions');
+        const selectAll = document.getElementById('notifications-select-all');
+        const completeBtn = document.getElementById('notifications-complete-btn');
+        const selected = App.selectedCompletions.size;
+
+        actions.classList.toggle('hidden', pendingCount === 0);
+        selectAll.checked = pendingCount > 0 && selected === pendingCount;
+        selectAll.indeterminate = selected > 0 && selected < pendingCount;
+        completeBtn.disabled = selected === 0;
+        completeBtn.textContent = selected > 0 ? `Complete selected (${selected})` : 'Complete selected';
+    },
+
+    // End-of-day closeout: complete every selected reservation in one go
+    completeSelectedNotifications: () => {
+        const ids = Array.from(App.selectedCompletions);
+        if (ids.length === 0) return;
+
+        App.showConfirmation(
+            'Complete Reservations',
+            `Mark ${ids.length} reservation${ids.length > 1 ? 's' : ''} as complete?`,
+            () => {
+                const completedBy = App.selectedStaff ? (App.selectedStaff.name || App.selectedStaff.staff_name) : 'Staff';
+                const write = Mutations.completeReservations(ids, '', completedBy);
+                App.selectedCompletions.clear();
+                App.renderNotifications();
+                // Any that were rejected have already been undone and reported
+                App.reportWhenCommitted(write, (result) => (result.updated.length === 0 ? null
+                    : `${result.updated.length} reservation${result.updated.length > 1 ? 's' : ''} marked as complete!`));
+            },
+            'Yes, Complete',
+            'var(--success)'
+        );
+    },
+
     openNotificationReservation: (props) => {
         // Close notifications popover
         document.getElementById('notifications-popover').classList.add('hidden');
@@ -0,0 +1,136 @@
+/**
+ * Availability
+ * Day-level occupancy of every resource, kept in step with the ReservationModel
+ * as Scheduled reservations come and go (no scanning of reservations):
+ * - counts: resource -> Map(dayNumber -> bookings covering that day)
+ * - bitmaps: resource -> Map(month -> bit per booked day of that month)
+ * - booked: resource type -> Map(dayNumber -> resources of that type booked)
+ *
+ * Resources are the keys from Occupancy.keysOf (item names, GUEST_SUITE, SKY_LOUNGE);
+ * day numbers come from Pricing.dayNumber. This is a local hint for the calendar
+ * and booking form; the transaction in API.commitReservationMutations has the final say.
+ */
+
+const Availability = {
+    counts: new Map(),
+    bitmaps: new Map(),
+    booked: new Map(),
+    MAX_SPAN_DAYS: 366, // Ignore obviously broken ranges rather than walk them
+
+    /**
+     * Days a reservation blocks, as [first, last) day numbers.
+     * Guest Suite blocks its nights (check-out day stays bookable), Sky Lounge its
+     * start day, Gear Shed every day its range touches.
+     * @returns {Array|null}
+     */
+    span: (record) => {
+        const startMs = new Date(record.start_time).getTime();
+        const endMs = new Date(record.end_time).getTime();
+        if (isNaN(startMs) || isNaN(endMs) || startMs >= endMs) return null;
+
+        const type = (record.resource_type || '').toUpperCase();
+        const first = Pricing.dayNumber(startMs);
+        const last = type === 'SKY_LOUNGE' ? first + 1
+            : type === 'GUEST_SUITE' ? Pricing.dayNumber(endMs)
+                : Pricing.dayNumber(endMs - 1) + 1;
+        return last > first && last - first <= Availability.MAX_SPAN_DAYS ? [first, last] : null;
+    },
+
+    // [month index, bit] for a day number
+    monthBit: (day) => {
+        const d = new Date(day * Pricing.DAY_MS);
+        return [d.getUTCFullYear() * 12 + d.getUTCMonth(), 1 << (d.getUTCDate() - 1)];
+    },
+
+    add: (entry) => Availability.update(entry.record, 1),
+
+    remove: (entry) => Availability.update(entry.record, -1),
+
+    update: (record, delta) => {
+        const span = Availability.span(record);
+        if (!span) return;
+        const type = (record.resource_type || '').toUpperCase();
+
+        Occupancy.keysOf(record).forEach(key => {
+            let counts = Availability.counts.get(key);
+            if (!counts) Availability.counts.set(key, counts = new Map());
+
+            for (let day = span[0]; day < span[1]; day++) {
+                const before = counts.get(day) || 0;
+                const after = Math.max(0, before + delta);
+                if (after > 0) counts.set(day, after);
+                else counts.delete(day);
+
+                // Bitmaps and per-type totals only change when a day flips between free and booked
+                if ((before > 0) !== (after > 0)) {
+                    Availability.setBit(key, day, after > 0);
+                    Availability.bumpBooked(type, day, after > 0 ? 1 : -1);
+                }
+            }
+        });
+    },
+
+    setBit: (key, day, on) => {
+        let months = Availability.bitmaps.get(key);
+        if (!months) Availability.bitmaps.set(key, months = new Map());
+        const [month, bit] = Availability.monthBit(day);
+        const mask = on ? (months.get(month) || 0) | bit : (months.get(month) || 0) & ~bit;
+        if (mask) months.set(month, mask);
+        else months.delete(month);
+    },
+
+    bumpBooked: (type, day, delta) => {
+        let days = Availability.booked.get(type);
+        if (!days) Availability.booked.set(type, days = new Map());
+        const count = (days.get(day) || 0) + delta;
+        if (count > 0) days.set(day, count);
+        else days.delete(day);
+    },
+
+    isBooked: (key, day) => {
+        const months = Availability.bitmaps.get(key);
+        if (!months) return false;
+        const [month, bit] = Availability.monthBit(day);
+        return ((months.get(month) || 0) & bit) !== 0;
+    },
+
+    // Whether every one of `capacity` resources of a type is booked on a day
+    isFull: (type, day, capacity) => {
+        const days = Availability.booked.get(type);
+        return capacity > 0 && !!days && (days.get(day) || 0) >= capacity;
+    },
+
+    /**
+     * Days in a proposed reservation's span on which its resources are already booked.
+     * @param {Object} record - Proposed reservation (start_time, end_time, resource_type, items)
+     * @param {Object} [own] - The reservation being edited, whose own bookings don't count
+     * @returns {Array} [{ key, day }] in key, then day order
+     */
+    conflicts: (record, own = null) => {
+        const span = Availability.span(record);
+        if (!span) return [];
+        const ownSpan = own && own.status === 'Scheduled' ? Availability.span(own) : null;
+        const ownKeys = ownSpan ? new Set(Occupancy.keysOf(own)) : new Set();
+
+        const result = [];
+        Occupancy.keysOf(record).forEach(key => {
+            const months = Availability.bitmaps.get(key);
+            if (!months) return;
+            const counts = Availability.counts.get(key);
+            for (let day = span[0]; day < span[1]; day++) {
+                const [month, bit] = Availability.monthBit(day);
+                const mask = months.get(month) || 0;
+                if (mask === 0) {
+                    // Nothing booked this month: jump to the 1st of the next one
+                    const d = new Date(day * Pricing.DAY_MS);
+                    day += new Date(Date.UTC(d.getUTCFullYear(), d.getUTCMonth() + 1, 0)).getUTCDate() - d.getUTCDate();
+                    continue;
+                }
+                if (!(mask & bit)) continue;
+                const mine = ownKeys.has(key) && day >= ownSpan[0] && day < ownSpan[1] ? 1 : 0;
+                if (counts.get(day) - mine > 0) result.push({ key, day });
+            }
+        });
+        return result;
+    }
+};
@@ -1,115 +1,286 @@
 /**
- * Smart Caching System with Hash-based Validation
- * Improves load times by caching Google Sheets data and only fetching when changes are detected
+ * Persistent Document Cache (IndexedDB)
+ * Stores Firestore documents individually, keyed by collection + id, so the app
+ * can render instantly on cold start and only fetch what changed since the
+ * cached high-water mark
  */
 
 const Cache = {
-    // Simple hash function for data comparison
-    hashData: (data) => {
-        const str = JSON.stringify(data);
-        let hash = 0;
-        for (let i = 0; i < str.length; i++) {
-            const char = str.charCodeAt(i);
-            hash = ((hash << 5) - hash) + char;
-            hash = hash & hash; // Convert to 32bit integer
-        }
-        return hash.toString(36);
+    DB_NAME: 'amenity-scheduler',
+    DB_VERSION: 2,
+    MAX_DOCS: 5000, // Per collection; oldest-ending terminal documents are evicted first
+    dbPromise: null,
+
+    open: () => {
+        if (Cache.dbPromise) return Cache.dbPromise;
+
+        Cache.dbPromise = new Promise((resolve, reject) => {
+            if (!window.indexedDB) {
+                reject(new Error('IndexedDB not available'));
+                return;
+            }
+            const request = indexedDB.open(Cache.DB_NAME, Cache.DB_VERSION);
+            request.onupgradeneeded = (e) => {
+                const idb = request.result;
+                if (e.oldVersion < 1) {
+                    // docs: { key, collection, id, data, version, end, pinned }
+                    const docs = idb.createObjectStore('docs', { keyPath: 'key' });
+                    docs.createIndex('collection', 'collection');
+                    docs.createIndex('collection_end', ['collection', 'end']);
+                    // meta: { collection, mark, loadedFrom }
+                    idb.createObjectStore('meta', { keyPath: 'collection' });
+                }
+                if (e.oldVersion < 2) {
+                    // mutations: queued local writes not yet committed to Firestore (see Mutations)
+                    idb.createObjectStore('mutations', { keyPath: 'id' });
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+
+        // Drop the old localStorage cache entries
+        Object.keys(localStorage).filter(k => k.startsWith('cache_')).forEach(k => localStorage.removeItem(k));
+
+        return Cache.dbPromise;
     },
 
-    // Get cached data if valid
-    get: (key) => {
-        try {
-            const cached = localStorage.getItem(`cache_${key}`);
-            if (!cached) return null;
+    // Run fn(stores...) in one transaction; resolves with fn's result once committed
+    transaction: async (storeNames, mode, fn) => {
+        const idb = await Cache.open();
+        return new Promise((resolve, reject) => {
+            const tx = idb.transaction(storeNames, mode);
+            const result = fn(...storeNames.map(name => tx.objectStore(name)));
+            tx.oncomplete = () => resolve(result);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    },
 
-            const { data, hash, timestamp } = JSON.parse(cached);
+    request: (req) => new Promise((resolve, reject) => {
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    }),
 
-            // Optional: Add expiration check (e.g., 24 hours)
-            const MAX_AGE = 24 * 60 * 60 * 1000; // 24 hours
-            if (Date.now() - timestamp > MAX_AGE) {
-                console.log(`Cache expired for ${key}`);
-                return null;
-            }
+    /**
+     * Per-document version used to keep the fresher copy.
+     * `updated_at` is stamped by the Firestore server (millis once normalized by API);
+     * documents written before it existed fall back to `last_update`.
+     */
+    versionOf: (doc) => {
+        if (typeof doc.updated_at === 'number') return doc.updated_at;
+        const t = doc.last_update ? Date.parse(doc.last_update) : NaN;
+        return isNaN(t) ? 0 : t;
+    },
 
-            console.log(`✓ Cache hit for ${key}`);
-            return { data, hash };
+    // All cached documents of a collection
+    getAll: async (collection) => {
+        try {
+            const entries = await Cache.transaction(['docs'], 'readonly', (docs) => {
+                return Cache.request(docs.index('collection').getAll(collection));
+            });
+            return entries.map(entry => entry.data);
         } catch (error) {
-            console.error('Cache read error:', error);
-            return null;
+            console.warn('Cache read error:', error);
+            return [];
         }
     },
 
-    // Store data with its hash
-    set: (key, data) => {
+    /**
+     * Store documents individually. An existing entry is only replaced by a
+     * document with the same or a newer version.
+     * @param {string} collection
+     * @param {Array} docs
+     * @param {string} idField - Property holding the document ID
+     */
+    putDocs: async (collection, docs, idField = 'tx_id') => {
+        if (!docs.length) return;
         try {
-            const hash = Cache.hashData(data);
-            const cacheEntry = {
-                data,
-                hash,
-                timestamp: Date.now()
-            };
-            localStorage.setItem(`cache_${key}`, JSON.stringify(cacheEntry));
-            console.log(`✓ Cached ${key} with hash ${hash}`);
-            return hash;
+            await Cache.transaction(['docs'], 'readwrite', (store) => {
+                docs.forEach(doc => {
+                    const key = `${collection}:${doc[idField]}`;
+                    const version = Cache.versionOf(doc);
+                    store.get(key).onsuccess = (e) => {
+                        const existing = e.target.result;
+                        if (existing && existing.version > version) return;
+                        store.put({
+                            key,
+                            collection,
+                            id: doc[idField],
+                            data: doc,
+                            version,
+                            end: doc.end_time || '',
+                            pinned: doc.status === 'Scheduled' ? 1 : 0
+                        });
+                    };
+                });
+            });
+            await Cache.evict(collection);
         } catch (error) {
             console.error('Cache write error:', error);
-            // Handle localStorage quota exceeded
-            if (error.name === 'QuotaExceededError') {
-                console.warn('LocalStorage quota exceeded, clearing old cache...');
-                Cache.clear();
-                // Try again after clearing
-                try {
-                    const hash = Cache.hashData(data);
-                    const cacheEntry = { data, hash, timestamp: Date.now() };
-                    localStorage.setItem(`cache_${key}`, JSON.stringify(cacheEntry));
-                    return hash;
-                } catch (e) {
-                    console.error('Failed to cache even after clearing:', e);
+            if (error && error.name === 'QuotaExceededError') {
+                // Make room by evicting down to half the limit rather than wiping everything
+                await Cache.evict(collection, Math.floor(Cache.MAX_DOCS / 2));
+            }
+        }
+    },
+
+    removeDocs: async (collection, ids) => {
+        if (!ids.length) return;
+        try {
+            await Cache.transaction(['docs'], 'readwrite', (store) => {
+                ids.forEach(id => store.delete(`${collection}:${id}`));
+            });
+        } catch (error) {
+            console.error('Cache delete error:', error);
+        }
+    },
+
+    // Replace a whole collection (used for small collections fetched in full)
+    replaceCollection: async (collection, docs, idField) => {
+        try {
+            await Cache.transaction(['docs'], 'readwrite', (store) => {
+                store.index('collection').openKeyCursor(IDBKeyRange.only(collection)).onsuccess = (e) => {
+                    const cursor = e.target.result;
+                    if (!cursor) return;
+                    store.delete(cursor.primaryKey);
+                    cursor.continue();
+                };
+            });
+        } catch (error) {
+            console.error('Cache clear error:', error);
+        }
+        await Cache.putDocs(collection, docs, idField);
+    },
+
+    /**
+     * Size-bounded eviction: drop the oldest-ending, non-Scheduled documents until
+     * the collection is within `limit`. The cached window start (meta.loadedFrom)
+     * moves past the evicted range so it is fetched again on demand, never served
+     * with holes in it (null means the window has to be fetched from scratch).
+     */
+    evict: async (collection, limit = Cache.MAX_DOCS) => {
+        const count = await Cache.transaction(['docs'], 'readonly', (docs) => {
+            return Cache.request(docs.index('collection').count(collection));
+        });
+        if (count <= limit) return;
+
+        let toEvict = count - limit;
+        let evictedEnd = '';
+        let nextEnd = '';
+        await Cache.transaction(['docs'], 'readwrite', (docs) => {
+            const range = IDBKeyRange.bound([collection, ''], [collection, '\uffff']);
+            docs.index('collection_end').openCursor(range).onsuccess = (e) => {
+                const cursor = e.target.result;
+                if (!cursor) return;
+                const entry = cursor.value;
+                if (!entry.pinned && entry.end) {
+                    // Keep going past the quota until the end time changes, so no end time is half-evicted
+                    if (toEvict <= 0 && entry.end !== evictedEnd) {
+                        nextEnd = entry.end;
+                        return;
+                    }
+                    evictedEnd = entry.end;
+                    cursor.delete();
+                    toEvict--;
                 }
+                cursor.continue();
+            };
+        });
+
+        if (evictedEnd) {
+            const meta = await Cache.getMeta(collection);
+            if (meta && meta.loadedFrom && meta.loadedFrom <= evictedEnd) {
+                await Cache.setMeta(collection, { loadedFrom: nextEnd || null });
             }
+        }
+    },
+
+    getMeta: async (collection) => {
+        try {
+            const meta = await Cache.transaction(['meta'], 'readonly', (store) => {
+                return Cache.request(store.get(collection));
+            });
+            return meta || null;
+        } catch (error) {
+            console.warn('Cache meta read error:', error);
             return null;
         }
     },
 
-    // Check if remote data has changed
-    hasChanged: (key, newData) => {
-        const cached = Cache.get(key);
-        if (!cached) return true; // No cache = assume changed
+    // Merge fields into a collection's metadata (mark = high-water updated_at, loadedFrom = window start)
+    setMeta: async (collection, fields) => {
+        try {
+            const existing = await Cache.getMeta(collection);
+            await Cache.transaction(['meta'], 'readwrite', (store) => {
+                store.put({ ...(existing || {}), ...fields, collection });
+            });
+        } catch (error) {
+            console.error('Cache meta write error:', error);
+        }
+    },
 
-        const newHash = Cache.hashData(newData);
-        const changed = cached.hash !== newHash;
+    // Queued writes, oldest first
+    getMutations: async () => {
+        try {
+            return await Cache.transaction(['mutations'], 'readonly', (store) => Cache.request(store.getAll()));
+        } catch (error) {
+            console.warn('Mutation queue read error:', error);
+            return [];
+        }
+    },
 
-        if (changed) {
-            console.log(`✗ Data changed for ${key} (old: ${cached.hash}, new: ${newHash})`);
-        } else {
-            console.log(`✓ Data unchanged for ${key} (${newHash})`);
+    putMutations: async (mutations) => {
+        try {
+            await Cache.transaction(['mutations'], 'readwrite', (store) => {
+                mutations.forEach(mutation => store.put(mutation));
+            });
+        } catch (error) {
+            console.error('Mutation queue write error:', error);
         }
+    },
 
-        return changed;
+    removeMutations: async (ids) => {
+        if (!ids.length) return;
+        try {
+            await Cache.transaction(['mutations'], 'readwrite', (store) => {
+                ids.forEach(id => store.delete(id));
+            });
+        } catch (error) {
+            console.error('Mutation queue delete error:', error);
+        }
     },
 
-    // Clear all cache
-    clear: () => {
-        const keys = Object.keys(localStorage).filter(k => k.startsWith('cache_'));
-        keys.forEach(k => localStorage.removeItem(k));
-        console.log(`Cleared ${keys.length} cache entries`);
+    // Clear all cache (queued writes are kept; they haven't reached the server yet)
+    clear: async () => {
+        try {
+            await Cache.transaction(['docs', 'meta'], 'readwrite', (docs, meta) => {
+                docs.clear();
+                meta.clear();
+            });
+            console.log('Cleared document cache');
+        } catch (error) {
+            console.error('Cache clear error:', error);
+        }
     },
 
-    // Get cache info
-    getInfo: () => {
-        const keys = Object.keys(localStorage).filter(k => k.startsWith('cache_'));
-        return keys.map(key => {
-            try {
-                const data = JSON.parse(localStorage.getItem(key));
-                return {
-                    key: key.replace('cache_', ''),
-                    hash: data.hash,
-                    timestamp: new Date(data.timestamp).toLocaleString(),
-                    size: new Blob([localStorage.getItem(key)]).size
-                };
-            } catch (e) {
-                return null;
-            }
-        }).filter(Boolean);
+    /**
+     * Per-store contents plus the write queue length (scans every cached document).
+     * @returns {{ stores: Array, queued: number }} stores: [{ key, count, mark, loadedFrom, size }]
+     */
+    getStats: async () => {
+        const stores = [];
+        for (const collection of ['reservations', 'items']) {
+            const docs = await Cache.getAll(collection);
+            const meta = await Cache.getMeta(collection);
+            stores.push({
+                key: collection,
+                count: docs.length,
+                mark: meta && meta.mark ? meta.mark : null,
+                loadedFrom: meta ? meta.loadedFrom || null : null,
+                size: new Blob([JSON.stringify(docs)]).size
+            });
+        }
+        return { stores, queued: (await Cache.getMutations()).length };
     }
 };
@@ -12,6 +12,11 @@ const firebaseConfig = {
 // Initialize Firebase
 firebase.initializeApp(firebaseConfig);
 const db = firebase.firestore();
+
+// Local Firestore emulator (firebase emulators:start) when the app is opened with ?emulator
+if (new URLSearchParams(window.location.search).has('emulator')) {
+    db.useEmulator('127.0.0.1', 8081);
+}
 const auth = firebase.auth();
 const analytics = firebase.analytics();
 
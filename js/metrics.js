@@ -0,0 +1,69 @@
+/**
+ * Client Metrics
+ * Timing spans recorded as performance.measure entries (so they also show up
+ * in the browser's Performance panel) plus a recent-sample window per
+ * operation for p50/p95, and simple counters (e.g. Firestore reads/writes).
+ * Read by the diagnostics panel (App.renderDiagnostics).
+ */
+
+const Metrics = {
+    SAMPLES: 200, // Most recent durations kept per operation
+    samples: new Map(), // operation -> durations (ms), oldest first
+    counters: new Map(), // name -> running total
+    seq: 0,
+
+    /**
+     * Start a span; call the returned function when the operation ends.
+     * @param {string} name
+     * @returns {Function} end() -> duration in ms
+     */
+    start: (name) => {
+        const mark = `${name}#${Metrics.seq++}`;
+        const startedAt = performance.now();
+        performance.mark(mark);
+        return () => {
+            let duration = performance.now() - startedAt;
+            try {
+                const measure = performance.measure(name, mark);
+                if (measure) duration = measure.duration;
+            } catch (e) {
+                // Mark already cleared (ended twice); keep the wall-clock duration
+            }
+            performance.clearMarks(mark);
+            performance.clearMeasures(name); // Only the samples are kept; the timeline has already seen it
+            Metrics.record(name, duration);
+            return duration;
+        };
+    },
+
+    record: (name, duration) => {
+        let list = Metrics.samples.get(name);
+        if (!list) Metrics.samples.set(name, list = []);
+        list.push(duration);
+        if (list.length > Metrics.SAMPLES) list.shift();
+    },
+
+    count: (name, n = 1) => {
+        Metrics.counters.set(name, (Metrics.counters.get(name) || 0) + n);
+    },
+
+    // Nearest-rank percentile of a sorted list
+    percentile: (sorted, p) => {
+        if (sorted.length === 0) return 0;
+        return sorted[Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1)];
+    },
+
+    /**
+     * @returns {Array} [{ name, count, p50, p95, max }] sorted by name; durations in ms
+     */
+    summary: () => Array.from(Metrics.samples, ([name, list]) => {
+        const sorted = list.slice().sort((a, b) => a - b);
+        return {
+            name,
+            count: list.length,
+            p50: Metrics.percentile(sorted, 50),
+            p95: Metrics.percentile(sorted, 95),
+            max: sorted[sorted.length - 1]
+        };
+    }).sort((a, b) => a.name.localeCompare(b.name))
+};
@@ -0,0 +1,279 @@
+/**
+ * Reservation Mutation Queue
+ * Reservation writes are applied to the local model immediately and queued
+ * for Firestore. Queued writes are persisted in the Cache, committed in chunks
+ * by API.commitReservationMutations, and retried with backoff while the
+ * connection is down. Conflict detection is that transaction's job (it checks
+ * bookings against the occupancy docs); whatever it rejects is rolled back
+ * here to the server's copy and reported.
+ *
+ * Mutation: { id, kind: 'create'|'update'|'delete', tx_id, data, previous, expect_status, expect_last_update }
+ * (`data` is the field patch; `previous` is the local record before it was applied;
+ * `expect_status` / `expect_last_update` make the server reject an update unless the
+ * stored status / last_update match)
+ */
+
+const Mutations = {
+    queue: [], // Oldest first
+    flushTimer: null,
+    flushing: false,
+    retryDelay: 0,
+    seq: 0,
+    FLUSH_DELAY_MS: 50, // Coalesce writes made in quick succession into one commit
+    RETRY_MIN_MS: 2000,
+    RETRY_MAX_MS: 60000,
+    RETRYABLE_CODES: ['unavailable', 'deadline-exceeded', 'resource-exhausted', 'aborted', 'internal', 'unknown'],
+    waiters: new Map(), // mutation id -> { resolve, reject }
+
+    // --- Reservation actions (mirror the API methods) ---
+
+    createReservation: (reservation) => Mutations.enqueue({
+        kind: 'create',
+        tx_id: API.newReservationId(),
+        data: { ...reservation, created_at: new Date().toISOString(), status: 'Scheduled' }
+    }),
+
+    /**
+     * @param {Object} reservation - Edited fields plus tx_id
+     * @param {string} [expect_last_update] - last_update of the copy that was edited
+     *   ('' if it was never edited); the update is rejected if the stored one differs
+     */
+    updateReservation: (reservation, expect_last_update) => {
+        const { tx_id, ...data } = reservation;
+        data.last_update = new Date().toISOString();
+        return Mutations.enqueue({ kind: 'update', tx_id, data, expect_last_update });
+    },
+
+    cancelReservation: (tx_id, fee = 0) => Mutations.enqueue(Mutations.cancelSpec(tx_id, fee)),
+
+    deleteReservation: (tx_id) => Mutations.enqueue({ kind: 'delete', tx_id, data: null }),
+
+    restoreReservation: (tx_id) => Mutations.enqueue(Mutations.restoreSpec(tx_id)),
+
+    completeReservation: (tx_id, return_notes, completed_by) => {
+        return Mutations.enqueue(Mutations.completeSpec(tx_id, return_notes, completed_by));
+    },
+
+    // Only Scheduled reservations can be completed or cancelled, and only Cancelled ones restored
+    completeSpec: (tx_id, return_notes, completed_by) => ({
+        kind: 'update',
+        tx_id,
+        data: { status: 'Complete', return_notes, completed_by, last_update: new Date().toISOString() },
+        expect_status: 'Scheduled'
+    }),
+
+    cancelSpec: (tx_id, fee) => {
+        const data = { status: 'Cancelled', last_update: new Date().toISOString() };
+        if (fee > 0) data.cancellation_fee = fee;
+        return { kind: 'update', tx_id, data, expect_status: 'Scheduled' };
+    },
+
+    restoreSpec: (tx_id) => ({
+        kind: 'update',
+        tx_id,
+        data: { status: 'Scheduled', last_update: new Date().toISOString() },
+        expect_status: 'Cancelled'
+    }),
+
+    // Bulk actions: one cache write and one local apply for the lot; the queue commits them in chunks.
+    // committed resolves with { status, updated: [tx_id], failed: [{ tx_id, message }] }
+    completeReservations: (tx_ids, return_notes, completed_by) => {
+        return Mutations.enqueueBulk(tx_ids.map(tx_id => Mutations.completeSpec(tx_id, return_notes, completed_by)));
+    },
+
+    cancelReservations: (tx_ids, fees = {}) => Mutations.enqueueBulk(tx_ids.map(tx_id => Mutations.cancelSpec(tx_id, fees[tx_id] || 0))),
+
+    restoreReservations: (tx_ids) => Mutations.enqueueBulk(tx_ids.map(Mutations.restoreSpec)),
+
+    // --- Queue ---
+
+    /**
+     * Apply a write locally and queue it.
+     * @param {Object} spec - { kind, tx_id, data, expect_status, expect_last_update }
+     * @returns {{ tx_id: string, committed: Promise }} committed settles once the server accepts or rejects it
+     */
+    enqueue: (spec) => Mutations.enqueueAll([spec])[0],
+
+    enqueueBulk: (specs) => {
+        const writes = Mutations.enqueueAll(specs);
+        const committed = Promise.allSettled(writes.map(write => write.committed)).then(results => {
+            const updated = [];
+            const failed = [];
+            results.forEach((result, i) => {
+                if (result.status === 'fulfilled') updated.push(writes[i].tx_id);
+                else failed.push({ tx_id: writes[i].tx_id, message: result.reason.message });
+            });
+            return { status: failed.length === 0 ? 'success' : 'partial', updated, failed };
+        });
+        return { tx_ids: writes.map(write => write.tx_id), committed };
+    },
+
+    // Queue several writes with a single cache write and a single local apply
+    enqueueAll: (specs) => {
+        const mutations = specs.map(spec => {
+            const entry = ReservationModel.get(spec.tx_id);
+            const mutation = {
+                id: Date.now() * 1000 + (Mutations.seq++ % 1000),
+                kind: spec.kind,
+                tx_id: spec.tx_id,
+                data: spec.data,
+                previous: entry ? entry.record : null
+            };
+            if (spec.expect_status) mutation.expect_status = spec.expect_status;
+            if (spec.expect_last_update !== undefined) mutation.expect_last_update = spec.expect_last_update;
+            return mutation;
+        });
+
+        const writes = mutations.map(mutation => {
+            const committed = new Promise((resolve, reject) => {
+                Mutations.waiters.set(mutation.id, { resolve, reject });
+            });
+            committed.catch(() => {}); // Rejections are reported to the user by rollback
+            return { tx_id: mutation.tx_id, committed };
+        });
+
+        Mutations.queue.push(...mutations);
+        Mutations.applyLocal(mutations);
+        Cache.putMutations(mutations);
+        Mutations.scheduleFlush(Mutations.FLUSH_DELAY_MS);
+
+        return writes;
+    },
+
+    // Reload writes left over from a previous session, show them, and send them
+    resume: async () => {
+        const stored = await Cache.getMutations();
+        const known = new Set(Mutations.queue.map(m => m.id));
+        const pending = stored.filter(m => !known.has(m.id));
+        if (pending.length === 0) return;
+
+        console.log(`Resuming ${pending.length} queued reservation change(s)`);
+        Mutations.queue = pending.concat(Mutations.queue).sort((a, b) => a.id - b.id);
+        Mutations.applyLocal(pending);
+        Mutations.scheduleFlush(0);
+    },
+
+    // Show writes in the local model, in one Sync pass however many there are
+    applyLocal: (mutations) => {
+        const records = new Map(); // tx_id -> record with the writes so far applied (null = deleted)
+        mutations.forEach(mutation => {
+            if (mutation.kind === 'delete') {
+                records.set(mutation.tx_id, null);
+                return;
+            }
+            let base = records.get(mutation.tx_id);
+            if (base === undefined) {
+                const entry = ReservationModel.get(mutation.tx_id);
+                base = entry ? entry.record : null;
+            }
+            records.set(mutation.tx_id, { ...(base || {}), ...mutation.data, tx_id: mutation.tx_id });
+        });
+
+        Sync.applyChanges(Array.from(records, ([tx_id, data]) => (data === null
+            ? { type: 'removed', tx_id }
+            : { type: ReservationModel.has(tx_id) ? 'modified' : 'added', tx_id, data, pending: true })));
+    },
+
+    /**
+     * Server data for a reservation with any still-queued writes layered on top,
+     * so a listener snapshot never shows a write as undone while it's in flight.
+     * @returns {Object|null} null when a delete is queued
+     */
+    overlay: (tx_id, data) => {
+        let result = data;
+        Mutations.queue.forEach(m => {
+            if (m.tx_id !== tx_id || result === null) return;
+            result = m.kind === 'delete' ? null : { ...result, ...m.data };
+        });
+        return result;
+    },
+
+    hasPending: (tx_id) => Mutations.queue.some(m => m.tx_id === tx_id),
+
+    scheduleFlush: (delay) => {
+        if (Mutations.flushTimer) return;
+        Mutations.flushTimer = setTimeout(() => {
+            Mutations.flushTimer = null;
+            Mutations.flush();
+        }, delay);
+    },
+
+    // Next batch from the front of the queue, sized to fit one transaction
+    nextBatch: () => Mutations.queue.slice(0, API.chunkEnd(Mutations.queue)),
+
+    flush: async () => {
+        if (Mutations.flushing || Mutations.queue.length === 0) return;
+        Mutations.flushing = true;
+
+        // Spin the refresh button while changes are on their way
+        const refreshBtn = document.getElementById('refresh-data-btn');
+        if (refreshBtn) refreshBtn.classList.add('spinning');
+
+        try {
+            while (Mutations.queue.length > 0) {
+                await Mutations.commit(Mutations.nextBatch());
+            }
+            Mutations.retryDelay = 0;
+        } catch (error) {
+            // Connection problem: keep everything queued and try again later
+            Mutations.retryDelay = Math.min(Mutations.RETRY_MAX_MS, Math.max(Mutations.RETRY_MIN_MS, Mutations.retryDelay * 2));
+            console.warn(`Reservation changes not sent (${error.code || error.message}); retrying in ${Mutations.retryDelay / 1000}s`);
+            Mutations.scheduleFlush(Mutations.retryDelay);
+        } finally {
+            Mutations.flushing = false;
+            if (refreshBtn) refreshBtn.classList.remove('spinning');
+        }
+    },
+
+    /**
+     * Commit a batch. If the server rejects it, each write is retried on its own
+     * so only the offending ones are rolled back. Retryable errors are rethrown.
+     */
+    commit: async (batch) => {
+        try {
+            await API.commitReservationMutations(batch);
+            Mutations.settle(batch);
+        } catch (error) {
+            if (Mutations.RETRYABLE_CODES.includes(error.code) || !navigator.onLine) throw error;
+
+            if (batch.length > 1) {
+                for (const m of batch) await Mutations.commit([m]);
+                return;
+            }
+            await Mutations.rollback(batch[0], error);
+        }
+    },
+
+    settle: (batch, error = null) => {
+        const ids = new Set(batch.map(m => m.id));
+        Mutations.queue = Mutations.queue.filter(m => !ids.has(m.id));
+        Cache.removeMutations(Array.from(ids));
+
+        batch.forEach(m => {
+            const waiter = Mutations.waiters.get(m.id);
+            if (!waiter) return;
+            Mutations.waiters.delete(m.id);
+            if (error) waiter.reject(error);
+            else waiter.resolve({ status: 'success', tx_id: m.tx_id });
+        });
+    },
+
+    // Drop a rejected write and put the reservation back to what the server has
+    rollback: async (mutation, error) => {
+        console.error('Reservation change rejected, rolling back:', mutation, error);
+        Mutations.settle([mutation], error);
+
+        let server = await API.getReservation(mutation.tx_id);
+        if (server.status !== 'success') server = { data: mutation.previous };
+
+        if (server.data) {
+            Sync.applyChanges([{ type: 'modified', tx_id: mutation.tx_id, data: server.data, pending: server.data === mutation.previous }]);
+        } else if (!Mutations.hasPending(mutation.tx_id)) {
+            Sync.removeRecords([mutation.tx_id]);
+        }
+
+        App.showAlert(`A reservation change could not be saved and was undone: ${error.message}`, 'error');
+    }
+};
+
+window.addEventListener('online', () => Mutations.scheduleFlush(0));
@@ -0,0 +1,118 @@
+/**
+ * Occupancy
+ * Compact per-resource, per-day booking documents used to check availability
+ * inside a Firestore transaction without scanning reservations.
+ *
+ * occupancy/{resource}_{YYYY-MM-DD}: { key, day, bookings: { [tx_id]: [startMs, endMs] } }
+ *
+ * A resource is a Gear Shed item name, or GUEST_SUITE / SKY_LOUNGE for the spaces.
+ * Only Scheduled reservations occupy; a reservation is listed on every local
+ * day its [start, end) range touches, so a check reads one document per
+ * item-day no matter how much history exists.
+ */
+
+const Occupancy = {
+    COLLECTION: 'occupancy',
+    SPACES: ['GUEST_SUITE', 'SKY_LOUNGE'],
+
+    occupies: (record) => !!record && record.status === 'Scheduled',
+
+    // Resources a reservation holds: the space itself, or each Gear Shed item
+    keysOf: (record) => {
+        const type = (record.resource_type || '').toUpperCase();
+        if (Occupancy.SPACES.includes(type)) return [type];
+        if (Array.isArray(record.items) && record.items.length > 0) return record.items;
+        return record.item ? [record.item] : [];
+    },
+
+    // 'YYYY-MM-DD' for a local time in millis
+    dayOf: (ms) => {
+        const d = new Date(ms);
+        const pad = (n) => n.toString().padStart(2, '0');
+        return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+    },
+
+    // Local days touched by [startMs, endMs); an end at midnight doesn't touch that day
+    daysBetween: (startMs, endMs) => {
+        const days = [];
+        const d = new Date(startMs);
+        d.setHours(0, 0, 0, 0);
+        while (d.getTime() < endMs) {
+            days.push(Occupancy.dayOf(d.getTime()));
+            d.setDate(d.getDate() + 1);
+        }
+        return days;
+    },
+
+    // Document IDs can't contain '/' and shouldn't start with '.'
+    docId: (key, day) => `${encodeURIComponent(key).replace(/\./g, '%2E')}_${day}`,
+
+    /**
+     * Occupancy documents a reservation is listed in.
+     * @returns {Array} [{ id, key, day }] - empty if it doesn't occupy anything
+     */
+    footprint: (record) => {
+        if (!Occupancy.occupies(record)) return [];
+        const startMs = new Date(record.start_time).getTime();
+        const endMs = new Date(record.end_time).getTime();
+        if (isNaN(startMs) || isNaN(endMs) || startMs >= endMs) return [];
+
+        const days = Occupancy.daysBetween(startMs, endMs);
+        const result = [];
+        Occupancy.keysOf(record).forEach(key => {
+            days.forEach(day => result.push({ id: Occupancy.docId(key, day), key, day }));
+        });
+        return result;
+    },
+
+    // Booking rules (same as validateReservation in Code.gs); returns an error message or null
+    validate: (record) => {
+        const start = new Date(record.start_time);
+        const end = new Date(record.end_time);
+        if (isNaN(start) || isNaN(end)) return 'Invalid start or end time.';
+        if (start >= end) return 'End time must be after start time.';
+
+        const type = (record.resource_type || '').toUpperCase();
+        if (type === 'GUEST_SUITE') {
+            // 3pm check-in to 11am check-out: compare calendar days, 2 nights = Day 1 to Day 3
+            const sDate = new Date(start); sDate.setHours(0, 0, 0, 0);
+            const eDate = new Date(end); eDate.setHours(0, 0, 0, 0);
+            if (Math.round((eDate - sDate) / (1000 * 60 * 60 * 24)) < 2) return 'Guest Suite requires 2-night minimum.';
+        }
+        if (type === 'SKY_LOUNGE' && (end - start) / (1000 * 60 * 60) > 4) {
+            return 'Sky Lounge limited to 4 hours.';
+        }
+        return null;
+    },
+
+    /**
+     * Check a reservation against loaded occupancy documents.
+     * @param {Object} record - Reservation (with tx_id)
+     * @param {Map} bookingsById - docId -> { tx_id: [startMs, endMs] }
+     * @returns {string|null} Conflict message or null
+     */
+    conflict: (record, bookingsById) => {
+        const startMs = new Date(record.start_time).getTime();
+        const endMs = new Date(record.end_time).getTime();
+        const type = (record.resource_type || '').toUpperCase();
+        const startDay = Occupancy.dayOf(startMs);
+
+        for (const { id, key, day } of Occupancy.footprint(record)) {
+            const bookings = bookingsById.get(id) || {};
+            for (const txId of Object.keys(bookings)) {
+                if (txId === record.tx_id) continue;
+                const [bStart, bEnd] = bookings[txId];
+
+                if (type === 'SKY_LOUNGE') {
+                    // One Sky Lounge booking per day (by start day) unless the lock is overridden
+                    if (!record.override_lock && day === startDay && Occupancy.dayOf(bStart) === startDay) {
+                        return 'Sky Lounge already booked for this day.';
+                    }
+                } else if (bStart < endMs && startMs < bEnd) {
+                    return type === 'GUEST_SUITE' ? 'Guest Suite is already booked.' : `${key} is not available.`;
+                }
+            }
+        }
+        return null;
+    }
+};
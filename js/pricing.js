@@ -0,0 +1,109 @@
+/**
+ * Pricing
+ * Closed-form stay pricing against a rate table. Nights are counted by
+ * arithmetic on day numbers rather than by walking the calendar, so any stay
+ * prices in constant time (plus the holidays that fall inside it).
+ *
+ * This file is also added to the Apps Script project as pricing.gs, where
+ * calculateCost in Code.gs prices with it, so RATES is the only rate table.
+ */
+
+const Pricing = {
+    RATES: {
+        GUEST_SUITE: {
+            weekday: 125,
+            weekend: 175,
+            weekendNights: [5, 6], // Fri and Sat nights (0 = Sun)
+            holidays: {} // 'YYYY-MM-DD' (the night's date) -> nightly rate, e.g. { '2026-12-31': 225 }
+        },
+        SKY_LOUNGE: { flat: 300 }
+    },
+    DAY_MS: 24 * 60 * 60 * 1000,
+    holidayDays: null, // Sorted [[dayNumber, rate]], built from RATES on first use
+
+    /**
+     * Calendar day number (days since 1970-01-01) of a local date.
+     * Strings are read by their 'YYYY-MM-DD' prefix so no time zone is involved.
+     * @param {string|Date|number} value - 'YYYY-MM-DD[THH:MM]', Date, or local millis
+     * @returns {number} NaN if unparseable
+     */
+    dayNumber: (value) => {
+        if (typeof value === 'string') {
+            const m = /^(\d{4})-(\d{2})-(\d{2})/.exec(value);
+            return m ? Date.UTC(+m[1], m[2] - 1, +m[3]) / Pricing.DAY_MS : NaN;
+        }
+        const d = new Date(value);
+        if (isNaN(d)) return NaN;
+        return Date.UTC(d.getFullYear(), d.getMonth(), d.getDate()) / Pricing.DAY_MS;
+    },
+
+    // 0 = Sun ... 6 = Sat (day 0 was a Thursday)
+    weekdayOf: (day) => ((day + 4) % 7 + 7) % 7,
+
+    // Days in [first, last) falling on one of `weekdays`
+    countWeekdays: (first, last, weekdays) => {
+        const n = Math.max(0, last - first);
+        let count = Math.floor(n / 7) * weekdays.length;
+        for (let day = last - (n % 7); day < last; day++) {
+            if (weekdays.includes(Pricing.weekdayOf(day))) count++;
+        }
+        return count;
+    },
+
+    // First position in holidayDays at or after `day`
+    holidayPosition: (day) => {
+        if (!Pricing.holidayDays) {
+            const holidays = Pricing.RATES.GUEST_SUITE.holidays;
+            Pricing.holidayDays = Object.keys(holidays)
+                .map(date => [Pricing.dayNumber(date), holidays[date]])
+                .sort((a, b) => a[0] - b[0]);
+        }
+        let lo = 0;
+        let hi = Pricing.holidayDays.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (Pricing.holidayDays[mid][0] < day) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    },
+
+    /**
+     * Price a stay.
+     * @param {string} type - Resource type
+     * @param {string|Date} start - Start (date or date-time)
+     * @param {string|Date} end - End (date or date-time)
+     * @returns {{ total: number, nights: number, weekendNights: number, holidayNights: number }}
+     */
+    quote: (type, start, end) => {
+        const quote = { total: 0, nights: 0, weekendNights: 0, holidayNights: 0 };
+        const upper = (type || '').toUpperCase();
+
+        if (upper === 'SKY_LOUNGE') {
+            quote.total = Pricing.RATES.SKY_LOUNGE.flat;
+            return quote;
+        }
+        if (upper !== 'GUEST_SUITE' || !start || !end) return quote;
+
+        // One night per calendar day from check-in up to (not including) check-out
+        const rates = Pricing.RATES.GUEST_SUITE;
+        const first = Pricing.dayNumber(start);
+        const last = Pricing.dayNumber(end);
+        if (!(last > first)) return quote;
+
+        quote.nights = last - first;
+        quote.weekendNights = Pricing.countWeekdays(first, last, rates.weekendNights);
+        quote.total = quote.weekendNights * rates.weekend + (quote.nights - quote.weekendNights) * rates.weekday;
+
+        // Holiday rates replace the regular rate for their night
+        for (let i = Pricing.holidayPosition(first); i < Pricing.holidayDays.length && Pricing.holidayDays[i][0] < last; i++) {
+            const [day, rate] = Pricing.holidayDays[i];
+            const regular = rates.weekendNights.includes(Pricing.weekdayOf(day)) ? rates.weekend : rates.weekday;
+            quote.total += rate - regular;
+            quote.holidayNights++;
+        }
+        return quote;
+    },
+
+    cost: (type, start, end) => Pricing.quote(type, start, end).total
+};
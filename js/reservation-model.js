@@ -0,0 +1,117 @@
+/**
+ * Reservation Model
+ * One normalized copy of every loaded reservation, shared by the calendar,
+ * list, notifications and modal. Kept current incrementally from Sync changes:
+ * - byTx: tx_id -> entry { tx_id, record, items, startMs, endMs, endKey }
+ * - byStatus: status -> Set of tx_ids
+ * - pending: Scheduled entries sorted by end time (oldest first), for completions
+ * Scheduled entries are also counted into the Availability day map.
+ */
+
+const ReservationModel = {
+    byTx: new Map(),
+    byStatus: new Map(),
+    pending: [],
+
+    // Items booked under a reservation (multi-item Gear Shed bookings share one tx_id)
+    itemsOf: (record) => {
+        if (record.items && Array.isArray(record.items) && record.items.length > 0) return record.items;
+        if (record.item) return [record.item];
+        return ['Unknown Item'];
+    },
+
+    has: (txId) => ReservationModel.byTx.has(txId),
+
+    get: (txId) => ReservationModel.byTx.get(txId) || null,
+
+    /**
+     * Apply Sync changes in one pass.
+     * @param {Array} changes - [{ type: 'added'|'modified'|'removed', tx_id, record }]
+     * @returns {Array} The entries that were added or modified
+     */
+    apply: (changes) => {
+        const updated = [];
+        changes.forEach(change => {
+            const previous = ReservationModel.byTx.get(change.tx_id);
+            if (previous) ReservationModel.unindex(previous);
+
+            if (change.type === 'removed') {
+                ReservationModel.byTx.delete(change.tx_id);
+                return;
+            }
+
+            const entry = ReservationModel.entryFor(change.record, change.tx_id);
+            ReservationModel.byTx.set(change.tx_id, entry);
+            ReservationModel.index(entry);
+            updated.push(entry);
+        });
+        return updated;
+    },
+
+    // Entry for a record (also used for records outside the model, e.g. archived ones)
+    entryFor: (record, txId = record.tx_id) => {
+        const entry = {
+            tx_id: txId,
+            record,
+            items: ReservationModel.itemsOf(record),
+            startMs: new Date(record.start_time).getTime(),
+            endMs: new Date(record.end_time).getTime()
+        };
+        entry.endKey = isNaN(entry.endMs) ? Infinity : entry.endMs; // Queue order; unparseable ends sort last
+        return entry;
+    },
+
+    index: (entry) => {
+        const status = entry.record.status;
+        let ids = ReservationModel.byStatus.get(status);
+        if (!ids) ReservationModel.byStatus.set(status, ids = new Set());
+        ids.add(entry.tx_id);
+
+        if (status === 'Scheduled') {
+            const queue = ReservationModel.pending;
+            queue.splice(ReservationModel.pendingPosition(entry.endKey), 0, entry);
+            Availability.add(entry);
+        }
+    },
+
+    unindex: (entry) => {
+        const ids = ReservationModel.byStatus.get(entry.record.status);
+        if (ids) ids.delete(entry.tx_id);
+
+        if (entry.record.status === 'Scheduled') {
+            Availability.remove(entry);
+            const queue = ReservationModel.pending;
+            // Entries ending at the same time are adjacent; search back from the insertion point
+            for (let i = ReservationModel.pendingPosition(entry.endKey) - 1; i >= 0 && queue[i].endKey === entry.endKey; i--) {
+                if (queue[i] === entry) {
+                    queue.splice(i, 1);
+                    break;
+                }
+            }
+        }
+    },
+
+    // First queue position whose end time is later than endKey
+    pendingPosition: (endKey) => {
+        const queue = ReservationModel.pending;
+        let lo = 0;
+        let hi = queue.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (queue[mid].endKey <= endKey) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    },
+
+    /**
+     * Scheduled reservations ending before `beforeMs`, oldest first.
+     * Reads only the matching prefix of the pending queue.
+     */
+    pendingBefore: (beforeMs) => {
+        return ReservationModel.pending.slice(0, ReservationModel.pendingPosition(beforeMs - 1));
+    },
+
+    // tx_ids with a given status
+    idsWithStatus: (status) => ReservationModel.byStatus.get(status) || new Set()
+};
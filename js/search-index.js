@@ -0,0 +1,149 @@
+/**
+ * Inventory Search Index
+ * Items are lowercased, sorted and indexed by trigram once; a query is parsed
+ * once into a matcher. Searching intersects the trigram postings of the
+ * query's literal fragments and only runs the full matcher on those candidates.
+ *
+ * Query syntax:
+ *   kayak            - contains "kayak"
+ *   "life jacket"    - contains the exact phrase
+ *   -broken          - must NOT contain "broken"
+ *   pad*le           - wildcard (* matches any run of characters)
+ */
+
+const SearchIndex = {
+    /**
+     * Build an index over a list of records.
+     * @param {Array} records
+     * @param {Function} getText - (record) => searchable text
+     * @returns {{ records: Array, search: Function }} records are sorted by text
+     */
+    create: (records, getText) => {
+        const entries = records
+            .map(record => ({ record, text: String(getText(record) || '').toLowerCase() }))
+            .sort((a, b) => a.text.localeCompare(b.text));
+
+        // trigram -> ascending entry positions
+        const trigrams = new Map();
+        entries.forEach((entry, pos) => {
+            SearchIndex.trigramsOf(entry.text).forEach(tri => {
+                let postings = trigrams.get(tri);
+                if (!postings) trigrams.set(tri, postings = []);
+                postings.push(pos);
+            });
+        });
+
+        const sorted = entries.map(entry => entry.record);
+
+        return {
+            records: sorted,
+
+            /**
+             * @param {Object|string} query - Compiled query (see compile) or raw text
+             * @returns {Array} Matching records in sorted order
+             */
+            search: (query) => {
+                const compiled = typeof query === 'string' ? SearchIndex.compile(query) : query;
+                if (compiled.empty) return sorted;
+
+                // Narrow by the rarest trigrams first; fragments shorter than 3 chars can't narrow
+                let candidates = null;
+                const required = compiled.trigrams
+                    .map(tri => trigrams.get(tri) || [])
+                    .sort((a, b) => a.length - b.length);
+                for (const postings of required) {
+                    candidates = candidates === null ? postings : SearchIndex.intersect(candidates, postings);
+                    if (candidates.length === 0) return [];
+                }
+
+                const results = [];
+                const check = (pos) => {
+                    if (compiled.matches(entries[pos].text)) results.push(entries[pos].record);
+                };
+                if (candidates === null) {
+                    for (let pos = 0; pos < entries.length; pos++) check(pos);
+                } else {
+                    candidates.forEach(check);
+                }
+                return results;
+            }
+        };
+    },
+
+    /**
+     * Parse a query once into a reusable matcher.
+     * @param {string} query
+     * @returns {{ empty: boolean, trigrams: Array<string>, matches: Function }}
+     */
+    compile: (query) => {
+        const phrases = [];
+        const exclusions = [];
+        const patterns = [];
+
+        // Extract exact phrases "..."
+        const remaining = (query || '').replace(/"([^"]+)"/g, (match, phrase) => {
+            phrases.push(phrase.toLowerCase());
+            return ' ';
+        });
+
+        remaining.split(/\s+/).filter(t => t.length > 0).forEach(token => {
+            const lower = token.toLowerCase();
+            if (lower.startsWith('-')) {
+                if (lower.length > 1) exclusions.push(lower.substring(1));
+            } else if (lower.includes('*')) {
+                const parts = lower.split('*');
+                const source = parts.map(part => part.replace(/[.+?^${}()|[\]\\]/g, '\\$&')).join('.*');
+                patterns.push({ regex: new RegExp(source), parts: parts.filter(p => p.length > 0) });
+            } else {
+                phrases.push(lower);
+            }
+        });
+
+        // Every literal fragment that must appear contributes its trigrams
+        const required = new Set();
+        phrases.forEach(p => SearchIndex.trigramsOf(p).forEach(tri => required.add(tri)));
+        patterns.forEach(p => p.parts.forEach(part => SearchIndex.trigramsOf(part).forEach(tri => required.add(tri))));
+
+        return {
+            empty: phrases.length === 0 && exclusions.length === 0 && patterns.length === 0,
+            trigrams: Array.from(required),
+            matches: (text) => {
+                for (const exc of exclusions) {
+                    if (text.includes(exc)) return false;
+                }
+                for (const phrase of phrases) {
+                    if (!text.includes(phrase)) return false;
+                }
+                for (const pattern of patterns) {
+                    if (!pattern.regex.test(text)) return false;
+                }
+                return true;
+            }
+        };
+    },
+
+    trigramsOf: (text) => {
+        const result = new Set();
+        for (let i = 0; i + 3 <= text.length; i++) result.add(text.substring(i, i + 3));
+        return result;
+    },
+
+    // Intersection of two ascending position lists
+    intersect: (a, b) => {
+        const result = [];
+        let i = 0;
+        let j = 0;
+        while (i < a.length && j < b.length) {
+            if (a[i] === b[j]) {
+                result.push(a[i]);
+                i++;
+                j++;
+            } else if (a[i] < b[j]) {
+                i++;
+            } else {
+                j++;
+            }
+        }
+        return result;
+    }
+};
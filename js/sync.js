@@ -0,0 +1,209 @@
+/**
+ * Realtime Sync
+ * Keeps reservations and items current through Firestore listeners and
+ * passes only the changed documents on to the views. Documents are persisted
+ * in the IndexedDB Cache, so a warm start renders immediately and only the
+ * changes since the cached high-water mark are read from Firestore.
+ */
+
+const Sync = {
+    active: false,
+    listeners: new Map(), // listener name ('changes', 'deletions') -> unsubscribe
+    mark: null, // Highest server updated_at applied (millis)
+    MARK_OVERLAP_MS: 5 * 60 * 1000, // Re-read a little before the mark to cover clock skew / late commits
+    itemRecords: new Map(), // _docId -> item
+    unsubscribeItems: null,
+
+    /**
+     * Load reservations and start following changes.
+     * - Cached documents are rendered first.
+     * - Cold cache: fetch the window (end_time >= from) plus every Scheduled reservation,
+     *   so overdue completions are present even if they predate the window.
+     * - Warm cache: only fetch the part of the window older than what was cached.
+     * Then a change feed (updated_at > mark) and deletion tombstones keep the store current.
+     * Resolves once the first change-feed snapshot has been applied.
+     */
+    startReservations: async (from) => {
+        Sync.stopReservations();
+        Sync.active = true;
+
+        let meta = await Cache.getMeta('reservations');
+        if (meta && meta.mark && meta.mark < Date.now() - API.DELETION_TTL_DAYS * 24 * 60 * 60 * 1000) {
+            // Tombstones this old have been pruned, so deletions since the mark can't be replayed: start cold
+            await Cache.replaceCollection('reservations', [], 'tx_id');
+            await Cache.setMeta('reservations', { mark: null, loadedFrom: null });
+            meta = null;
+        }
+
+        const cached = await Cache.getAll('reservations');
+        if (cached.length > 0) Sync.applyRecords(cached, false);
+
+        let mark = meta && meta.mark;
+        if (!mark || !meta.loadedFrom) {
+            // Take the mark before fetching so anything written during the fetch shows up in the feed
+            mark = Date.now() - Sync.MARK_OVERLAP_MS;
+            const [windowDocs, pendingDocs] = await Promise.all([
+                App.fetchAllReservationPages({ from }),
+                App.fetchAllReservationPages({ status: 'Scheduled' })
+            ]);
+            Sync.applyRecords(windowDocs.concat(pendingDocs));
+            App.loadedFrom = from;
+            await Cache.setMeta('reservations', { mark, loadedFrom: from });
+        } else {
+            App.loadedFrom = meta.loadedFrom;
+            if (from < meta.loadedFrom) await App.fetchReservationsFrom(from);
+            mark -= Sync.MARK_OVERLAP_MS;
+        }
+
+        Sync.mark = mark;
+        await Sync.watchChanges(mark);
+    },
+
+    /**
+     * Re-pull the change feed: resubscribe both listeners from a little before
+     * the mark, so anything a listener may have missed is read again.
+     */
+    refreshReservations: async () => {
+        if (!Sync.active) return;
+        Sync.listeners.forEach(unsubscribe => unsubscribe());
+        Sync.listeners.clear();
+        await Sync.watchChanges(Sync.mark - Sync.MARK_OVERLAP_MS);
+    },
+
+    stopReservations: () => {
+        Sync.listeners.forEach(unsubscribe => unsubscribe());
+        Sync.listeners.clear();
+        Sync.active = false;
+    },
+
+    // Follow reservation changes and deletions after `since`; resolves once both first snapshots are applied
+    watchChanges: (since) => {
+        return Promise.all([
+            Sync.listen('changes', (onChanges, onError) => API.watchReservations({ changedSince: since }, onChanges, onError),
+                changes => Sync.applyChanges(changes)),
+            Sync.listen('deletions', (onChanges, onError) => API.watchDeletions(since, onChanges, onError),
+                deletions => Sync.removeRecords(deletions.map(d => d.tx_id)))
+        ]);
+    },
+
+    /**
+     * Start a named listener, replacing any running under that name.
+     * Resolves after its first snapshot has been applied, rejects if it fails before that.
+     */
+    listen: (name, subscribe, apply) => {
+        if (Sync.listeners.has(name)) Sync.listeners.get(name)();
+        return new Promise((resolve, reject) => {
+            let first = true;
+            const unsubscribe = subscribe((changes) => {
+                apply(changes);
+                if (first) {
+                    first = false;
+                    resolve();
+                }
+            }, (error) => {
+                if (first) {
+                    first = false;
+                    reject(error);
+                }
+            });
+            Sync.listeners.set(name, unsubscribe);
+        });
+    },
+
+    /**
+     * Records fetched once for an older part of the window; they are cached
+     * and the cached window start moves back to `from`.
+     */
+    addFetchedRecords: async (records, from) => {
+        Sync.applyRecords(records);
+        await Cache.setMeta('reservations', { loadedFrom: from });
+    },
+
+    // Upsert whole records into the store (and the cache unless they came from it)
+    applyRecords: (records, persist = true) => {
+        Sync.applyChanges(records.map(r => ({ type: 'added', tx_id: r.tx_id, data: r })), persist);
+    },
+
+    applyChanges: (changes, persist = true) => {
+        const changed = [];
+        const toCache = [];
+        const removed = [];
+
+        changes.forEach(change => {
+            if (change.type === 'removed') {
+                removed.push(change.tx_id);
+                return;
+            }
+
+            // Writes still queued locally stay visible on top of the server copy
+            const record = Mutations.overlay(change.tx_id, change.data);
+            if (record === null) {
+                // A delete is queued for it
+                if (ReservationModel.has(change.tx_id)) removed.push(change.tx_id);
+                return;
+            }
+            const existed = ReservationModel.has(change.tx_id);
+            changed.push({ type: existed ? 'modified' : 'added', tx_id: change.tx_id, record });
+
+            // Unconfirmed local writes carry an estimated timestamp; wait for the server copy
+            if (change.pending) return;
+            toCache.push(change.data);
+            if (change.data.updated_at && change.data.updated_at > Sync.mark) Sync.mark = change.data.updated_at;
+        });
+
+        if (changed.length > 0) App.applyReservationChanges(changed);
+        if (removed.length > 0) Sync.removeRecords(removed);
+
+        if (persist && toCache.length > 0) {
+            Cache.putDocs('reservations', toCache);
+            if (Sync.mark) Cache.setMeta('reservations', { mark: Sync.mark });
+        }
+    },
+
+    removeRecords: (ids) => {
+        const changed = ids
+            .filter(id => ReservationModel.has(id))
+            .map(id => ({ type: 'removed', tx_id: id }));
+        if (changed.length > 0) App.applyReservationChanges(changed);
+        Cache.removeDocs('reservations', ids);
+    },
+
+    /**
+     * Follow the items collection. The first snapshot is the full list, so it
+     * replaces whatever was rendered from the cache; an empty collection is
+     * seeded and the listener picks the new items up.
+     * Resolves once items have been applied; rejects if the listener fails first.
+     */
+    startItems: () => new Promise((resolve, reject) => {
+        if (Sync.unsubscribeItems) Sync.unsubscribeItems();
+        Sync.itemRecords = new Map();
+        let first = true;
+        const fail = (error) => {
+            // Stopped, so the next loadData starts it again
+            if (Sync.unsubscribeItems) Sync.unsubscribeItems();
+            Sync.unsubscribeItems = null;
+            reject(error);
+        };
+
+        Sync.unsubscribeItems = API.watchItems((changes) => {
+            changes.forEach(change => {
+                if (change.type === 'removed') Sync.itemRecords.delete(change._docId);
+                else Sync.itemRecords.set(change._docId, change.data);
+            });
+            if (first) {
+                first = false;
+                if (Sync.itemRecords.size === 0) {
+                    API.seedItems().catch(fail);
+                    return;
+                }
+            } else if (changes.length === 0) {
+                return;
+            }
+
+            const list = Array.from(Sync.itemRecords.values());
+            App.applyItemChanges(list);
+            Cache.replaceCollection('items', list, '_docId');
+            resolve();
+        }, fail);
+    })
+};
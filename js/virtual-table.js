@@ -0,0 +1,146 @@
+/**
+ * Virtual Table
+ * Renders only the table rows inside the scroll viewport (plus a small overscan),
+ * padding the rest with two spacer rows. Row nodes are keyed and reused, so
+ * scrolling or re-filtering only touches rows that actually change.
+ * Rows may differ in height (wrapped notes); offsets use the average height of
+ * the rows laid out so far.
+ */
+
+const VirtualTable = {
+    /**
+     * @param {Object} options
+     * @param {HTMLElement} options.container - Scrolling element wrapping the table
+     * @param {HTMLElement} options.tbody - Table body to render into
+     * @param {number} options.columns - Column count (spacer/empty rows span all columns)
+     * @param {Function} options.getKey - (row) => unique key
+     * @param {Function} options.renderRow - (tr, row) => fill a row node
+     * @param {string} [options.emptyText] - Shown when there are no rows
+     * @param {number} [options.rowHeight=41] - Initial estimate; replaced by the measured average
+     * @param {number} [options.overscan=10] - Extra rows rendered above and below the viewport
+     * @returns {{ setRows: Function, refresh: Function }}
+     */
+    create: (options) => {
+        const { container, tbody, columns, getKey, renderRow } = options;
+        const overscan = options.overscan || 10;
+        let rowHeight = options.rowHeight || 41;
+        const heights = new Map(); // index in rows -> laid-out height, for the current rows and width
+        let rows = [];
+        let framePending = false;
+
+        const mounted = new Map(); // key -> tr
+        const pool = []; // detached tr nodes ready for reuse
+
+        const makeSpacer = () => {
+            const tr = document.createElement('tr');
+            tr.className = 'virtual-spacer';
+            tr.setAttribute('aria-hidden', 'true');
+            const td = document.createElement('td');
+            td.colSpan = columns;
+            tr.appendChild(td);
+            return tr;
+        };
+        const topSpacer = makeSpacer();
+        const bottomSpacer = makeSpacer();
+
+        const emptyRow = document.createElement('tr');
+        emptyRow.innerHTML = `<td colspan="${columns}" style="text-align:center;">${options.emptyText || 'No results.'}</td>`;
+
+        tbody.innerHTML = '';
+        tbody.appendChild(topSpacer);
+        tbody.appendChild(bottomSpacer);
+
+        const render = () => {
+            framePending = false;
+
+            if (rows.length === 0) {
+                mounted.forEach(tr => { tr.remove(); pool.push(tr); });
+                mounted.clear();
+                topSpacer.style.height = '0px';
+                bottomSpacer.style.height = '0px';
+                if (!emptyRow.parentNode) tbody.insertBefore(emptyRow, bottomSpacer);
+                return;
+            }
+            if (emptyRow.parentNode) emptyRow.remove();
+
+            // Viewport in tbody coordinates (the header sits above the tbody)
+            const viewTop = Math.max(0, container.scrollTop - tbody.offsetTop);
+            const viewHeight = container.clientHeight || window.innerHeight;
+            const start = Math.max(0, Math.floor(viewTop / rowHeight) - overscan);
+            const end = Math.min(rows.length, Math.ceil((viewTop + viewHeight) / rowHeight) + overscan);
+
+            const visible = rows.slice(start, end);
+            const visibleKeys = new Set(visible.map(getKey));
+
+            // Release rows that scrolled out
+            mounted.forEach((tr, key) => {
+                if (!visibleKeys.has(key)) {
+                    tr.remove();
+                    mounted.delete(key);
+                    pool.push(tr);
+                }
+            });
+
+            // Place rows in order, reusing mounted nodes and only re-rendering changed row objects
+            let cursor = topSpacer.nextSibling;
+            visible.forEach(row => {
+                const key = getKey(row);
+                let tr = mounted.get(key);
+                if (!tr) {
+                    tr = pool.pop() || document.createElement('tr');
+                    mounted.set(key, tr);
+                }
+                if (tr._row !== row) {
+                    renderRow(tr, row);
+                    tr._row = row;
+                }
+                if (tr !== cursor) tbody.insertBefore(tr, cursor);
+                else cursor = cursor.nextSibling;
+            });
+
+            topSpacer.style.height = `${start * rowHeight}px`;
+            bottomSpacer.style.height = `${(rows.length - end) * rowHeight}px`;
+
+            // Fold the mounted rows' real heights into the average used for offsets
+            visible.forEach((row, i) => {
+                const height = mounted.get(getKey(row)).offsetHeight;
+                if (height > 0) heights.set(start + i, height);
+            });
+            if (heights.size > 0) {
+                let total = 0;
+                heights.forEach(height => { total += height; });
+                const average = total / heights.size;
+                if (Math.abs(average - rowHeight) >= 1) {
+                    rowHeight = average;
+                    schedule();
+                }
+            }
+        };
+
+        const schedule = () => {
+            if (framePending) return;
+            framePending = true;
+            requestAnimationFrame(render);
+        };
+
+        // Wrapping changes with the width, so heights measured before a resize are stale
+        const remeasure = () => {
+            heights.clear();
+            schedule();
+        };
+
+        container.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', remeasure);
+
+        return {
+            // Replace the (already filtered and sorted) row list
+            setRows: (newRows) => {
+                rows = newRows;
+                heights.clear(); // Indexes now point at different rows; the average carries over in rowHeight
+                schedule();
+            },
+            // Re-render the viewport, e.g. after the table becomes visible
+            refresh: remeasure
+        };
+    }
+};
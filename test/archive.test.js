@@ -0,0 +1,61 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+// In-memory sheet: rows[0] is the header; row numbers are 1-based like Sheets
+function fakeSheet(rows, log) {
+    const sheet = {
+        rows,
+        getLastRow: () => rows.length,
+        getLastColumn: () => rows[0].length,
+        getDataRange: () => sheet.getRange(1, 1, rows.length, rows[0].length),
+        getRange: (row, col, numRows, numCols) => ({
+            getValues: () => rows.slice(row - 1, row - 1 + numRows).map(r => r.slice(col - 1, col - 1 + numCols)),
+            setValues: (values) => {
+                log.push(['setValues', row, values.length]);
+                values.forEach((v, i) => { rows[row - 1 + i] = (rows[row - 1 + i] || []).slice(0, col - 1).concat(v); });
+            }
+        }),
+        deleteRows: (row, count) => {
+            log.push(['deleteRows', row, count]);
+            rows.splice(row - 1, count);
+        }
+    };
+    return sheet;
+}
+
+test('the sweep deletes archived runs bottom-up without rewriting live rows', () => {
+    const old = '2020-01-01T10:00:00.000Z';
+    const future = '2999-01-01T10:00:00.000Z';
+    const row = (tx_id, status, end) => {
+        const r = new Array(15).fill('');
+        r[2] = status;
+        r[5] = end;
+        r[14] = tx_id;
+        return r;
+    };
+    const live = [
+        ['header'].concat(new Array(14).fill('')),
+        row('a', 'Complete', old), row('a', 'Complete', old), // 2-3 archived
+        row('b', 'Scheduled', future), // 4 kept
+        row('c', 'Cancelled', old), // 5 archived
+        row('d', 'Complete', old), row('d', 'Scheduled', future), // 6-7 kept: not every row qualifies
+        row('e', 'Complete', old) // 8 archived
+    ];
+    const log = [];
+    const sheets = { reservations: fakeSheet(live, log) };
+    const db = {
+        getSheetByName: (name) => sheets[name] || null,
+        insertSheet: (name) => (sheets[name] = fakeSheet([[]], []))
+    };
+    const gs = load(['Code.gs'], {
+        SpreadsheetApp: { openById: () => db },
+        PropertiesService: { getScriptProperties: () => ({ getProperty: () => null }) },
+        CacheService: { getScriptCache: () => ({ putAll: () => {} }) }
+    });
+
+    assert.strictEqual(gs.moveToArchive().archived, 4);
+    assert.deepStrictEqual(plain(log), [['deleteRows', 8, 1], ['deleteRows', 5, 1], ['deleteRows', 2, 2]]);
+    assert.deepStrictEqual(plain(live.slice(1).map(r => r[14])), ['b', 'd', 'd']);
+    assert.deepStrictEqual(plain(sheets.reservations_archive.rows.slice(1).map(r => r[14])), ['a', 'a', 'c', 'e']);
+});
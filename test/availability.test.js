@@ -0,0 +1,65 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+const FILES = ['js/pricing.js', 'js/occupancy.js', 'js/availability.js'];
+
+const gear = (items, start_time, end_time) => ({ resource_type: 'GEAR_SHED', status: 'Scheduled', items, start_time, end_time });
+
+test('add sets a bit per booked day and remove clears it', () => {
+    const { Availability, Pricing } = load(FILES);
+    const entry = { record: gear(['Kayak'], '2026-03-30T10:00', '2026-04-02T18:00') };
+    const days = ['2026-03-30', '2026-03-31', '2026-04-01', '2026-04-02'].map(Pricing.dayNumber);
+
+    Availability.add(entry);
+    days.forEach(day => assert.strictEqual(Availability.isBooked('Kayak', day), true));
+    assert.strictEqual(Availability.isBooked('Kayak', Pricing.dayNumber('2026-04-03')), false);
+    assert.strictEqual(Availability.isBooked('Tent', days[0]), false);
+
+    // Spans a month boundary: one bitmap word per month
+    const [march, bit30] = plain(Availability.monthBit(days[0]));
+    assert.strictEqual(Availability.bitmaps.get('Kayak').get(march), bit30 | plain(Availability.monthBit(days[1]))[1]);
+
+    Availability.remove(entry);
+    days.forEach(day => assert.strictEqual(Availability.isBooked('Kayak', day), false));
+    assert.strictEqual(Availability.bitmaps.get('Kayak').size, 0);
+});
+
+test('a day stays booked until its last booking is removed', () => {
+    const { Availability, Pricing } = load(FILES);
+    const day = Pricing.dayNumber('2026-03-02');
+    const first = { record: gear(['Kayak'], '2026-03-02T10:00', '2026-03-02T12:00') };
+    const second = { record: gear(['Kayak'], '2026-03-02T14:00', '2026-03-02T16:00') };
+
+    Availability.add(first);
+    Availability.add(second);
+    Availability.remove(first);
+    assert.strictEqual(Availability.isBooked('Kayak', day), true);
+    Availability.remove(second);
+    assert.strictEqual(Availability.isBooked('Kayak', day), false);
+});
+
+test('Guest Suite blocks nights, leaving the check-out day free', () => {
+    const { Availability, Pricing } = load(FILES);
+    Availability.add({ record: { resource_type: 'GUEST_SUITE', status: 'Scheduled', start_time: '2026-03-02T15:00', end_time: '2026-03-04T11:00' } });
+    assert.strictEqual(Availability.isBooked('GUEST_SUITE', Pricing.dayNumber('2026-03-03')), true);
+    assert.strictEqual(Availability.isBooked('GUEST_SUITE', Pricing.dayNumber('2026-03-04')), false);
+    assert.strictEqual(Availability.isFull('GUEST_SUITE', Pricing.dayNumber('2026-03-02'), 1), true);
+});
+
+test('conflicts skips empty months and ignores the reservation being edited', () => {
+    const { Availability, Pricing } = load(FILES);
+    const own = gear(['Kayak'], '2026-06-10T10:00', '2026-06-11T18:00');
+    Availability.add({ record: own });
+    Availability.add({ record: gear(['Tent'], '2026-06-11T10:00', '2026-06-11T18:00') });
+
+    const proposed = gear(['Kayak', 'Tent'], '2026-01-01T10:00', '2026-06-11T18:00');
+    assert.deepStrictEqual(plain(Availability.conflicts(proposed)), [
+        { key: 'Kayak', day: Pricing.dayNumber('2026-06-10') },
+        { key: 'Kayak', day: Pricing.dayNumber('2026-06-11') },
+        { key: 'Tent', day: Pricing.dayNumber('2026-06-11') }
+    ]);
+    assert.deepStrictEqual(plain(Availability.conflicts(proposed, own)), [
+        { key: 'Tent', day: Pricing.dayNumber('2026-06-11') }
+    ]);
+});
@@ -0,0 +1,91 @@
+/**
+ * Booking checks against the local Firestore emulator. Two "desks" (separate
+ * Firebase apps, like two browsers) commit through API.commitReservationMutations.
+ * Run with `npm run test:emulator`; skipped unless FIRESTORE_EMULATOR_HOST is set.
+ */
+
+const test = require('node:test');
+const assert = require('node:assert');
+const { load } = require('../load');
+
+const EMULATOR = process.env.FIRESTORE_EMULATOR_HOST;
+const PROJECT = 'demo-scheduler';
+const skip = !EMULATOR && 'FIRESTORE_EMULATOR_HOST not set (run npm run test:emulator)';
+
+let firebase = null;
+let desks = 0;
+
+// A separate app and Firestore client with its own copy of the browser modules
+function desk() {
+    if (!firebase) {
+        firebase = require('firebase/compat/app').default;
+        require('firebase/compat/firestore');
+    }
+    const app = firebase.initializeApp({ projectId: PROJECT }, `desk-${desks++}`);
+    const db = app.firestore();
+    const [host, port] = EMULATOR.split(':');
+    db.useEmulator(host, Number(port));
+    return load(['js/metrics.js', 'js/occupancy.js', 'js/api.js'], { firebase, db, performance }).API;
+}
+
+async function clearDatabase() {
+    const response = await fetch(`http://${EMULATOR}/emulator/v1/projects/${PROJECT}/databases/(default)/documents`, { method: 'DELETE' });
+    assert.ok(response.ok, `Could not clear the emulator: ${response.status}`);
+}
+
+function booking(tx_id, start_time, end_time) {
+    return {
+        kind: 'create',
+        tx_id,
+        data: { status: 'Scheduled', resource_type: 'GEAR_SHED', items: ['Kayak'], item: 'Kayak', rented_to: '101', start_time, end_time }
+    };
+}
+
+test('of two overlapping bookings committed at once, exactly one is rejected', { skip }, async () => {
+    await clearDatabase();
+    const [first, second] = [desk(), desk()];
+
+    const results = await Promise.allSettled([
+        first.commitReservationMutations([booking('a', '2026-03-02T10:00', '2026-03-03T18:00')]),
+        second.commitReservationMutations([booking('b', '2026-03-03T10:00', '2026-03-04T18:00')])
+    ]);
+
+    const rejected = results.filter(r => r.status === 'rejected');
+    assert.strictEqual(rejected.length, 1, JSON.stringify(results));
+    assert.strictEqual(rejected[0].reason.code, 'conflict');
+
+    // The rejected booking left nothing behind: without the winner the item is free
+    const winner = results[0].status === 'fulfilled' ? 'a' : 'b';
+    const availability = await first.getAvailability(['Kayak'], '2026-03-03T12:00', '2026-03-03T13:00', winner);
+    assert.deepStrictEqual(Array.from(availability.data.available), ['Kayak']);
+});
+
+test('bookings that do not overlap both commit', { skip }, async () => {
+    await clearDatabase();
+    const [first, second] = [desk(), desk()];
+
+    await Promise.all([
+        first.commitReservationMutations([booking('a', '2026-03-02T10:00', '2026-03-02T18:00')]),
+        second.commitReservationMutations([booking('b', '2026-03-03T10:00', '2026-03-03T18:00')])
+    ]);
+});
+
+test('occupancy is backfilled from existing reservations before the first check', { skip }, async () => {
+    await clearDatabase();
+    const api = desk();
+    const db = firebase.app(`desk-${desks - 1}`).firestore();
+
+    // A booking written before occupancy docs existed (no config/occupancy marker)
+    const { tx_id, data } = booking('old', '2026-03-02T10:00', '2026-03-02T18:00');
+    await db.collection('reservations').doc(tx_id).set(data);
+
+    await assert.rejects(
+        api.commitReservationMutations([booking('new', '2026-03-02T12:00', '2026-03-02T14:00')]),
+        { code: 'conflict' }
+    );
+    assert.ok((await db.collection('config').doc('occupancy').get()).exists);
+});
+
+test.after(async () => {
+    if (firebase) await Promise.all(firebase.apps.map(app => app.delete()));
+});
@@ -0,0 +1,48 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load } = require('./load');
+
+const { addInterval, finalizeIntervals, intervalsOverlap } = load(['Code.gs']);
+
+const HOUR = 60 * 60 * 1000;
+
+function intervals(...ranges) {
+    const map = {};
+    ranges.forEach(([start, end]) => addInterval(map, 'item', start * HOUR, end * HOUR));
+    finalizeIntervals(map.item);
+    return map.item;
+}
+
+test('no intervals never overlap', () => {
+    assert.strictEqual(intervalsOverlap(undefined, 0, HOUR), false);
+    assert.strictEqual(intervalsOverlap([], 0, HOUR), false);
+});
+
+test('touching ranges do not overlap', () => {
+    const list = intervals([10, 12]);
+    assert.strictEqual(intervalsOverlap(list, 8 * HOUR, 10 * HOUR), false);
+    assert.strictEqual(intervalsOverlap(list, 12 * HOUR, 14 * HOUR), false);
+});
+
+test('partial and containing ranges overlap', () => {
+    const list = intervals([10, 12]);
+    assert.strictEqual(intervalsOverlap(list, 9 * HOUR, 11 * HOUR), true);
+    assert.strictEqual(intervalsOverlap(list, 11 * HOUR, 13 * HOUR), true);
+    assert.strictEqual(intervalsOverlap(list, 10.5 * HOUR, 11 * HOUR), true);
+    assert.strictEqual(intervalsOverlap(list, 0, 24 * HOUR), true);
+});
+
+test('a long earlier interval is found behind shorter later ones', () => {
+    // Sorted by start, the last interval starting before 20h ends at 16h;
+    // only the running max end (from [0, 30]) reveals the overlap
+    const list = intervals([15, 16], [0, 30], [5, 6]);
+    assert.strictEqual(intervalsOverlap(list, 18 * HOUR, 20 * HOUR), true);
+    assert.strictEqual(intervalsOverlap(list, 30 * HOUR, 32 * HOUR), false);
+});
+
+test('accepts date strings', () => {
+    const start = new Date('2026-03-01T10:00').getTime();
+    const list = [[start, start + 2 * HOUR, start + 2 * HOUR]];
+    assert.strictEqual(intervalsOverlap(list, '2026-03-01T11:00', '2026-03-01T13:00'), true);
+    assert.strictEqual(intervalsOverlap(list, '2026-03-01T12:00', '2026-03-01T13:00'), false);
+});
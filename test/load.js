@@ -0,0 +1,36 @@
+/**
+ * Loads browser scripts (js/*.js) and Apps Script files (Code.gs) into a
+ * shared sandbox, the way index.html / the Apps Script project do, so their
+ * top-level objects and functions can be tested under Node.
+ *
+ *   const { Pricing } = load(['js/pricing.js']);
+ */
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const ROOT = path.join(__dirname, '..');
+
+/**
+ * @param {Array} files - Paths relative to the repo root, in load order
+ * @param {Object} [globals] - Extra globals (stubs for window, db, ...)
+ * @returns {Object} Top-level bindings by name (const declarations included)
+ */
+function load(files, globals = {}) {
+    const context = vm.createContext({ console, setTimeout, clearTimeout, ...globals });
+    files.forEach(file => {
+        vm.runInContext(fs.readFileSync(path.join(ROOT, file), 'utf8'), context, { filename: file });
+    });
+    // Top-level const/let aren't properties of the context, so resolve names by evaluating them
+    return new Proxy(context, {
+        get: (target, name) => (typeof name === 'string' && !(name in target)
+            ? vm.runInContext(name, target)
+            : target[name])
+    });
+}
+
+// Copy a sandbox value into this realm, so deepStrictEqual doesn't trip over the other realm's prototypes
+const plain = (value) => JSON.parse(JSON.stringify(value));
+
+module.exports = { load, plain };
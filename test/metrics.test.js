@@ -0,0 +1,42 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+function backend(random) {
+    const store = new Map();
+    const cache = {
+        get: (key) => store.has(key) ? store.get(key) : null,
+        put: (key, value) => store.set(key, value),
+        getAll: (keys) => Object.fromEntries(keys.filter(key => store.has(key)).map(key => [key, store.get(key)]))
+    };
+    const math = Object.create(Math);
+    math.random = random;
+    const gs = load(['Code.gs'], { CacheService: { getScriptCache: () => cache }, Math: math });
+    return { gs, store };
+}
+
+test('unsampled successes skip the cache; failures are always counted', () => {
+    const { gs, store } = backend(() => 0.99);
+    const meta = gs.recordMetrics('getItems', 'success', Date.now(), 0);
+    assert.strictEqual(meta.metrics_ms, 0);
+    assert.strictEqual(store.size, 0);
+
+    gs.recordMetrics('getItems', 'busy', Date.now(), 0);
+    assert.deepStrictEqual(JSON.parse(store.get('metrics_getItems')), { successes: 0, failures: 1, samples: [] });
+});
+
+test('each action keeps its own aggregate and getMetrics scales the sampled count', () => {
+    const { gs, store } = backend(() => 0);
+    gs.recordMetrics('getItems', 'success', Date.now(), 0);
+    gs.recordMetrics('getItems', 'success', Date.now(), 0);
+    gs.recordMetrics('cancelReservation', 'error', Date.now(), 5);
+    gs.recordMetrics('notAnAction', 'error', Date.now(), 0);
+    assert.deepStrictEqual(Array.from(store.keys()).sort(), ['metrics_cancelReservation', 'metrics_getItems']);
+
+    const data = plain(gs.getMetrics().data);
+    assert.deepStrictEqual(data.map(m => [m.action, m.count, m.failures, m.samples]), [
+        ['cancelReservation', 1, 1, 1],
+        ['getItems', 20, 0, 2]
+    ]);
+    assert.strictEqual(data[0].lock_wait_p95_ms, 5);
+});
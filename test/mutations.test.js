@@ -0,0 +1,138 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+// Mutations with its collaborators stubbed: Sync feeds the real ReservationModel, the API is scripted
+function setup(commitResults = []) {
+    const alerts = [];
+    const commits = [];
+    const batches = [];
+    const cacheWrites = [];
+    const globals = {
+        window: { addEventListener: () => {} },
+        navigator: { onLine: true },
+        document: { getElementById: () => null },
+        Cache: { putMutations: async (list) => cacheWrites.push(list.length), removeMutations: async () => {}, getMutations: async () => [] },
+        App: { showAlert: (message, type) => alerts.push({ message, type }) }
+    };
+    const sandbox = load(['js/pricing.js', 'js/occupancy.js', 'js/availability.js', 'js/reservation-model.js', 'js/mutations.js'], globals);
+    const { ReservationModel, Mutations } = sandbox;
+
+    const syncCalls = [];
+    globals.Sync = {
+        applyChanges: (changes) => {
+            syncCalls.push(changes.length);
+            ReservationModel.apply(changes.map(c => ({ type: c.type, tx_id: c.tx_id, record: c.data })));
+        },
+        removeRecords: (ids) => ReservationModel.apply(ids.map(tx_id => ({ type: 'removed', tx_id })))
+    };
+    globals.API = {
+        TRANSACTION_CHUNK: 10,
+        chunkEnd: (list) => Math.min(list.length, 10),
+        newReservationId: () => 'new-1',
+        getReservation: async () => ({ status: 'error' }),
+        commitReservationMutations: async (batch) => {
+            commits.push(batch.map(m => m.tx_id));
+            batches.push(batch);
+            const result = commitResults.shift();
+            if (result) throw result;
+        }
+    };
+    Object.assign(sandbox, globals); // Sandbox globals are the context's properties
+    Mutations.FLUSH_DELAY_MS = 0;
+    return { ReservationModel, Mutations, alerts, commits, batches, cacheWrites, syncCalls };
+}
+
+const conflict = () => Object.assign(new Error('Kayak is not available.'), { code: 'conflict' });
+
+test('a write is applied locally before it commits, then resolves', async () => {
+    const { ReservationModel, Mutations, commits } = setup();
+    const write = Mutations.createReservation({ resource_type: 'GEAR_SHED', items: ['Kayak'], start_time: '2026-03-02T10:00', end_time: '2026-03-02T18:00' });
+
+    assert.strictEqual(write.tx_id, 'new-1');
+    assert.strictEqual(ReservationModel.get('new-1').record.status, 'Scheduled');
+    assert.strictEqual(Mutations.hasPending('new-1'), true);
+
+    assert.deepStrictEqual(plain(await write.committed), { status: 'success', tx_id: 'new-1' });
+    assert.deepStrictEqual(plain(commits), [['new-1']]);
+    assert.strictEqual(Mutations.hasPending('new-1'), false);
+});
+
+test('an edit carries the version it was made against', async () => {
+    const { ReservationModel, Mutations, batches } = setup();
+    ReservationModel.apply([
+        { type: 'added', tx_id: 'a', record: { tx_id: 'a', status: 'Scheduled', resource_type: 'SKY_LOUNGE', last_update: '2026-03-01T09:00:00.000Z' } }
+    ]);
+    await Mutations.updateReservation({ tx_id: 'a', rented_to: '101' }, '2026-03-01T09:00:00.000Z').committed;
+    await Mutations.cancelReservation('a').committed;
+
+    assert.strictEqual(batches[0][0].expect_last_update, '2026-03-01T09:00:00.000Z');
+    assert.strictEqual('expect_last_update' in batches[1][0], false);
+});
+
+test('a rejected write is rolled back, reported and rejects its promise', async () => {
+    const { ReservationModel, Mutations, alerts } = setup([conflict()]);
+    const write = Mutations.createReservation({ resource_type: 'GEAR_SHED', items: ['Kayak'], start_time: '2026-03-02T10:00', end_time: '2026-03-02T18:00' });
+
+    await assert.rejects(write.committed, { code: 'conflict' });
+    assert.strictEqual(ReservationModel.has('new-1'), false);
+    assert.strictEqual(alerts.length, 1);
+    assert.strictEqual(alerts[0].type, 'error');
+});
+
+test('a rejected batch is retried write by write so only the offender is undone', async () => {
+    const { ReservationModel, Mutations, commits } = setup([conflict(), null, conflict()]);
+    ReservationModel.apply([
+        { type: 'added', tx_id: 'a', record: { tx_id: 'a', status: 'Scheduled', resource_type: 'GEAR_SHED', items: ['Kayak'] } },
+        { type: 'added', tx_id: 'b', record: { tx_id: 'b', status: 'Scheduled', resource_type: 'GEAR_SHED', items: ['Tent'] } }
+    ]);
+    const first = Mutations.completeReservation('a', '', 'Sam');
+    const second = Mutations.completeReservation('b', '', 'Sam');
+
+    await first.committed;
+    await assert.rejects(second.committed);
+    assert.deepStrictEqual(plain(commits), [['a', 'b'], ['a'], ['b']]);
+    assert.strictEqual(ReservationModel.get('a').record.status, 'Complete');
+    assert.strictEqual(ReservationModel.get('b').record.status, 'Scheduled'); // Back to its previous copy
+});
+
+test('overlay layers queued writes over server data', () => {
+    const { Mutations } = setup();
+    Mutations.queue = [
+        { id: 1, kind: 'update', tx_id: 'a', data: { status: 'Complete' } },
+        { id: 2, kind: 'update', tx_id: 'b', data: { status: 'Cancelled' } }
+    ];
+    assert.deepStrictEqual(plain(Mutations.overlay('a', { tx_id: 'a', status: 'Scheduled', item: 'Kayak' })),
+        { tx_id: 'a', status: 'Complete', item: 'Kayak' });
+
+    Mutations.queue.push({ id: 3, kind: 'delete', tx_id: 'a', data: null });
+    assert.strictEqual(Mutations.overlay('a', { tx_id: 'a' }), null);
+});
+
+test('a bulk action is one cache write and one local apply, and reports per reservation', async () => {
+    const wrongStatus = Object.assign(new Error('Reservation is Cancelled, not Scheduled.'), { code: 'failed-precondition' });
+    const { ReservationModel, Mutations, commits, cacheWrites, syncCalls } = setup([wrongStatus, null, null, wrongStatus]);
+    ReservationModel.apply(['a', 'b', 'c'].map(tx_id => ({
+        type: 'added', tx_id, record: { tx_id, status: 'Scheduled', resource_type: 'GEAR_SHED', items: [tx_id] }
+    })));
+
+    const write = Mutations.completeReservations(['a', 'b', 'c'], '', 'Sam');
+    assert.deepStrictEqual(plain(write.tx_ids), ['a', 'b', 'c']);
+    assert.deepStrictEqual(cacheWrites, [3]);
+    assert.deepStrictEqual(syncCalls, [3]);
+    assert.ok(['a', 'b', 'c'].every(tx_id => ReservationModel.get(tx_id).record.status === 'Complete'));
+
+    const result = plain(await write.committed);
+    assert.deepStrictEqual(plain(commits), [['a', 'b', 'c'], ['a'], ['b'], ['c']]);
+    assert.strictEqual(result.status, 'partial');
+    assert.deepStrictEqual(result.updated, ['a', 'b']);
+    assert.deepStrictEqual(result.failed, [{ tx_id: 'c', message: 'Reservation is Cancelled, not Scheduled.' }]);
+    assert.strictEqual(ReservationModel.get('c').record.status, 'Scheduled');
+});
+
+test('bulk writes carry the status they expect to find', () => {
+    const { Mutations } = setup();
+    Mutations.completeReservations(['a'], '', 'Sam');
+    Mutations.restoreReservations(['b']);
+    assert.deepStrictEqual(plain(Mutations.queue.map(m => [m.tx_id, m.expect_status])), [['a', 'Scheduled'], ['b', 'Cancelled']]);
+});
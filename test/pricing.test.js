@@ -0,0 +1,59 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+test('Guest Suite counts nights by calendar day, weekends at the weekend rate', () => {
+    const { Pricing } = load(['js/pricing.js']);
+    // Mon 2026-03-02 check-in, Thu check-out: 3 weekday nights
+    assert.deepStrictEqual(plain(Pricing.quote('GUEST_SUITE', '2026-03-02T15:00', '2026-03-05T11:00')),
+        { total: 375, nights: 3, weekendNights: 0, holidayNights: 0 });
+    // Thu -> Sun: Thu weekday, Fri and Sat weekend
+    assert.deepStrictEqual(plain(Pricing.quote('GUEST_SUITE', '2026-03-05', '2026-03-08')),
+        { total: 125 + 175 * 2, nights: 3, weekendNights: 2, holidayNights: 0 });
+});
+
+test('long stays match a night-by-night count', () => {
+    const { Pricing } = load(['js/pricing.js']);
+    const first = Pricing.dayNumber('2026-01-01');
+    for (let nights = 0; nights < 30; nights++) {
+        let weekend = 0;
+        for (let day = first; day < first + nights; day++) {
+            if ([5, 6].includes(Pricing.weekdayOf(day))) weekend++;
+        }
+        assert.strictEqual(Pricing.countWeekdays(first, first + nights, [5, 6]), weekend, `${nights} nights`);
+    }
+});
+
+test('holiday rates replace the regular rate for their night', () => {
+    const { Pricing } = load(['js/pricing.js']);
+    Pricing.RATES.GUEST_SUITE.holidays = { '2026-12-31': 225, '2027-01-05': 300 };
+    const quote = plain(Pricing.quote('GUEST_SUITE', '2026-12-30', '2027-01-02'));
+    // Wed 30th weekday, Thu 31st holiday, Fri Jan 1st weekend
+    assert.deepStrictEqual(quote, { total: 125 + 225 + 175, nights: 3, weekendNights: 1, holidayNights: 1 });
+});
+
+test('Sky Lounge is flat; invalid or unknown stays cost nothing', () => {
+    const { Pricing } = load(['js/pricing.js']);
+    assert.strictEqual(Pricing.cost('sky_lounge', '2026-03-02T16:00', '2026-03-02T20:00'), 300);
+    assert.strictEqual(Pricing.cost('GUEST_SUITE', '2026-03-05', '2026-03-05'), 0);
+    assert.strictEqual(Pricing.cost('GUEST_SUITE', '', '2026-03-05'), 0);
+    assert.strictEqual(Pricing.cost('GEAR_SHED', '2026-03-02', '2026-03-05'), 0);
+});
+
+test('the backend prices with the same table, by the date in the script time zone', () => {
+    const stubs = {
+        Session: { getScriptTimeZone: () => 'America/New_York' },
+        Utilities: {
+            formatDate: (d, tz, format) => {
+                assert.strictEqual(format, 'yyyy-MM-dd');
+                return new Intl.DateTimeFormat('en-CA', { timeZone: tz }).format(d);
+            }
+        }
+    };
+    const { calculateCost } = load(['js/pricing.js', 'Code.gs'], stubs);
+    // 3pm Mon check-in stored as UTC (20:00Z); 11am Thu check-out -> 3 nights
+    assert.strictEqual(calculateCost({ resource_type: 'guest_suite', start_time: '2026-03-02T20:00:00.000Z', end_time: '2026-03-05T16:00:00.000Z' }), 375);
+    // 9pm local on Mon is already Tue in UTC; the night still belongs to Monday
+    assert.strictEqual(calculateCost({ resource_type: 'GUEST_SUITE', start_time: '2026-03-03T02:00:00.000Z', end_time: '2026-03-05T16:00:00.000Z' }), 375);
+    assert.strictEqual(calculateCost({ resource_type: 'SKY_LOUNGE', start_time: new Date(), end_time: new Date() }), 300);
+});
@@ -0,0 +1,75 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+const FILES = ['js/pricing.js', 'js/occupancy.js', 'js/availability.js', 'js/reservation-model.js'];
+
+function reservation(tx_id, fields = {}) {
+    return {
+        tx_id,
+        status: 'Scheduled',
+        resource_type: 'GEAR_SHED',
+        items: ['Kayak'],
+        start_time: '2026-03-02T10:00',
+        end_time: '2026-03-02T18:00',
+        ...fields
+    };
+}
+
+const added = (record) => ({ type: 'added', tx_id: record.tx_id, record });
+
+test('apply adds, modifies and removes entries and their status index', () => {
+    const { ReservationModel } = load(FILES);
+    ReservationModel.apply([added(reservation('a')), added(reservation('b', { status: 'Complete' }))]);
+
+    assert.strictEqual(ReservationModel.byTx.size, 2);
+    assert.deepStrictEqual(Array.from(ReservationModel.idsWithStatus('Scheduled')), ['a']);
+    assert.deepStrictEqual(plain(ReservationModel.get('a').items), ['Kayak']);
+
+    ReservationModel.apply([{ type: 'modified', tx_id: 'a', record: reservation('a', { status: 'Cancelled' }) }]);
+    assert.strictEqual(ReservationModel.idsWithStatus('Scheduled').size, 0);
+    assert.deepStrictEqual(Array.from(ReservationModel.idsWithStatus('Cancelled')), ['a']);
+
+    ReservationModel.apply([{ type: 'removed', tx_id: 'b' }]);
+    assert.strictEqual(ReservationModel.has('b'), false);
+    assert.strictEqual(ReservationModel.idsWithStatus('Complete').size, 0);
+    assert.strictEqual(ReservationModel.get('b'), null);
+});
+
+test('pending queue stays sorted by end time through updates', () => {
+    const { ReservationModel } = load(FILES);
+    ReservationModel.apply([
+        added(reservation('late', { end_time: '2026-03-05T18:00' })),
+        added(reservation('early', { end_time: '2026-03-01T18:00' })),
+        added(reservation('mid', { end_time: '2026-03-03T18:00' })),
+        added(reservation('broken', { end_time: 'not a date' }))
+    ]);
+    const order = () => plain(ReservationModel.pending.map(entry => entry.tx_id));
+    assert.deepStrictEqual(order(), ['early', 'mid', 'late', 'broken']);
+
+    // Moving an entry's end time re-sorts it; completing it drops it from the queue
+    ReservationModel.apply([{ type: 'modified', tx_id: 'late', record: reservation('late', { end_time: '2026-02-28T18:00' }) }]);
+    assert.deepStrictEqual(order(), ['late', 'early', 'mid', 'broken']);
+    ReservationModel.apply([{ type: 'modified', tx_id: 'early', record: reservation('early', { status: 'Complete' }) }]);
+    assert.deepStrictEqual(order(), ['late', 'mid', 'broken']);
+
+    const before = new Date('2026-03-03T18:00').getTime();
+    assert.deepStrictEqual(plain(ReservationModel.pendingBefore(before).map(entry => entry.tx_id)), ['late']);
+});
+
+test('Scheduled entries are counted into Availability and released on removal', () => {
+    const { ReservationModel, Availability, Pricing } = load(FILES);
+    const day = Pricing.dayNumber('2026-03-02');
+    ReservationModel.apply([added(reservation('a'))]);
+    assert.strictEqual(Availability.isBooked('Kayak', day), true);
+
+    ReservationModel.apply([{ type: 'removed', tx_id: 'a' }]);
+    assert.strictEqual(Availability.isBooked('Kayak', day), false);
+});
+
+test('itemsOf falls back to the single item, then a placeholder', () => {
+    const { ReservationModel } = load(FILES);
+    assert.deepStrictEqual(plain(ReservationModel.itemsOf({ items: ['A', 'B'] })), ['A', 'B']);
+    assert.deepStrictEqual(plain(ReservationModel.itemsOf({ items: [], item: 'C' })), ['C']);
+    assert.deepStrictEqual(plain(ReservationModel.itemsOf({})), ['Unknown Item']);
+});
@@ -0,0 +1,28 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+test('bulk row lookups cache their rows in putAll calls within the key limit', () => {
+    const puts = [];
+    const cache = {
+        putAll: (entries) => {
+            const keys = Object.keys(entries);
+            if (keys.length > 500) throw new Error('Too many keys');
+            puts.push(keys.length);
+        }
+    };
+    const gs = load(['Code.gs'], { CacheService: { getScriptCache: () => cache } });
+
+    const ids = Array.from({ length: 1200 }, (_, i) => `tx${i}`);
+    const data = [['header']].concat(ids.map(id => {
+        const row = [];
+        row[gs.TX_ID_COL - 1] = id;
+        return row;
+    }));
+    const result = gs.groupTxRows(data, ids.concat(['gone']));
+
+    assert.deepStrictEqual(plain(puts), [500, 500, 200]);
+    assert.strictEqual(result.found.length, 1200);
+    assert.deepStrictEqual(plain(result.missing), ['gone']);
+    assert.deepStrictEqual(plain(result.rows.tx0), [2]);
+});
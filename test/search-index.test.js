@@ -0,0 +1,44 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+const { SearchIndex } = load(['js/search-index.js']);
+
+const ITEMS = ['Kayak 2', 'Kayak 1', 'Life Jacket', 'Paddle', 'Broken Paddle', 'Bike Pump', 'Tent'];
+const index = SearchIndex.create(ITEMS.map((item, i) => ({ item_id: i, item })), r => r.item);
+const names = (query) => plain(index.search(query).map(r => r.item));
+
+test('intersect keeps positions present in both lists', () => {
+    assert.deepStrictEqual(plain(SearchIndex.intersect([1, 3, 5, 7], [2, 3, 4, 7, 9])), [3, 7]);
+    assert.deepStrictEqual(plain(SearchIndex.intersect([1, 2], [3, 4])), []);
+    assert.deepStrictEqual(plain(SearchIndex.intersect([], [1])), []);
+    assert.deepStrictEqual(plain(SearchIndex.intersect([0, 4], [0, 4])), [0, 4]);
+});
+
+test('trigramsOf lists each 3-character window once', () => {
+    assert.deepStrictEqual(Array.from(SearchIndex.trigramsOf('aaaa')), ['aaa']);
+    assert.deepStrictEqual(Array.from(SearchIndex.trigramsOf('kayak')), ['kay', 'aya', 'yak']);
+    assert.strictEqual(SearchIndex.trigramsOf('ka').size, 0);
+});
+
+test('records come back sorted by text', () => {
+    assert.deepStrictEqual(names(''), ['Bike Pump', 'Broken Paddle', 'Kayak 1', 'Kayak 2', 'Life Jacket', 'Paddle', 'Tent']);
+});
+
+test('terms, phrases, exclusions and wildcards', () => {
+    assert.deepStrictEqual(names('kayak'), ['Kayak 1', 'Kayak 2']);
+    assert.deepStrictEqual(names('"life jacket"'), ['Life Jacket']);
+    assert.deepStrictEqual(names('paddle -broken'), ['Paddle']);
+    assert.deepStrictEqual(names('b*p'), ['Bike Pump', 'Broken Paddle']);
+    assert.deepStrictEqual(names('bik*mp'), ['Bike Pump']);
+    assert.deepStrictEqual(names('KAYAK 2'), ['Kayak 2']);
+});
+
+test('short fragments fall back to a full scan', () => {
+    assert.deepStrictEqual(names('te'), ['Tent']);
+    assert.deepStrictEqual(names('-a'), ['Bike Pump', 'Tent']);
+});
+
+test('an unknown trigram matches nothing', () => {
+    assert.deepStrictEqual(names('zebra'), []);
+});
@@ -0,0 +1,53 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load, plain } = require('./load');
+
+// Sync.startItems against a scripted items listener
+function setup() {
+    const applied = [];
+    let seeded = 0;
+    const listener = {};
+    const globals = {
+        App: { applyItemChanges: (items) => applied.push(items.map(item => item._docId)) },
+        Cache: { replaceCollection: () => {} },
+        API: {
+            watchItems: (onChanges, onError) => {
+                Object.assign(listener, { onChanges, onError, stopped: false });
+                return () => { listener.stopped = true; };
+            },
+            seedItems: async () => { seeded++; }
+        }
+    };
+    const { Sync } = load(['js/sync.js'], globals);
+    const added = (...ids) => ids.map(id => ({ type: 'added', _docId: id, data: { _docId: id } }));
+    return { Sync, applied, listener, added, seeded: () => seeded };
+}
+
+test('the first snapshot is the item list, with no separate fetch', async () => {
+    const { Sync, applied, listener, added } = setup();
+    const ready = Sync.startItems();
+    listener.onChanges(added('a', 'b'));
+    await ready;
+    listener.onChanges([{ type: 'removed', _docId: 'a' }]);
+    assert.deepStrictEqual(plain(applied), [['a', 'b'], ['b']]);
+});
+
+test('an empty collection is seeded and the listener delivers the new items', async () => {
+    const { Sync, applied, listener, added, seeded } = setup();
+    const ready = Sync.startItems();
+    listener.onChanges([]);
+    assert.strictEqual(seeded(), 1);
+    assert.strictEqual(applied.length, 0);
+    listener.onChanges(added('x'));
+    await ready;
+    assert.deepStrictEqual(plain(applied), [['x']]);
+});
+
+test('a listener error rejects and clears the listener so it can be restarted', async () => {
+    const { Sync, listener } = setup();
+    const ready = Sync.startItems();
+    listener.onError(Object.assign(new Error('denied'), { code: 'permission-denied' }));
+    await assert.rejects(ready, { code: 'permission-denied' });
+    assert.strictEqual(listener.stopped, true);
+    assert.strictEqual(Sync.unsubscribeItems, null);
+});
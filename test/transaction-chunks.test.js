@@ -0,0 +1,46 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load } = require('./load');
+
+const FILES = ['js/occupancy.js', 'js/api.js'];
+
+// A Scheduled Gear Shed rental of `items` over `days` days (one occupancy doc per item per day)
+const rental = (tx_id, items, days) => ({
+    tx_id,
+    status: 'Scheduled',
+    resource_type: 'GEAR_SHED',
+    items: Array.from({ length: items }, (_, i) => `Item ${i}`),
+    start_time: '2026-03-02T10:00',
+    end_time: `2026-03-${String(1 + days).padStart(2, '0')}T18:00`
+});
+
+test('writes count the reservation, its old and new occupancy docs and any tombstone', () => {
+    const { API } = load(FILES);
+    const record = rental('a', 3, 4); // 12 occupancy docs
+    assert.strictEqual(API.writesFor({ kind: 'create', tx_id: 'a', data: record }, null), 13);
+    assert.strictEqual(API.writesFor({ kind: 'update', tx_id: 'a', data: { status: 'Complete' } }, record), 13);
+    assert.strictEqual(API.writesFor({ kind: 'update', tx_id: 'a', data: { rental_notes: 'x' } }, record), 25);
+    assert.strictEqual(API.writesFor({ kind: 'delete', tx_id: 'a', data: null }, record), 14);
+});
+
+test('chunks close before the write limit, not at a fixed reservation count', () => {
+    const { API } = load(FILES);
+    // Completing a 5-item, 10-day rental releases 50 occupancy docs: 51 writes each
+    const mutations = Array.from({ length: 25 }, (_, i) => ({
+        kind: 'update', tx_id: `r${i}`, data: { status: 'Complete' }, previous: rental(`r${i}`, 5, 10)
+    }));
+    const ends = [];
+    for (let i = 0; i < mutations.length; i = ends[ends.length - 1]) ends.push(API.chunkEnd(mutations, i));
+    assert.deepStrictEqual(ends, [8, 16, 24, 25]); // 8 * 51 = 408 <= 450 < 459
+
+    const small = Array.from({ length: 30 }, (_, i) => ({ kind: 'update', tx_id: `s${i}`, data: { status: 'Cancelled' }, previous: null }));
+    assert.strictEqual(API.chunkEnd(small), API.TRANSACTION_CHUNK);
+});
+
+test('a mutation over the limit on its own still gets a transaction', () => {
+    const { API } = load(FILES);
+    const huge = { kind: 'create', tx_id: 'h', data: rental('h', 20, 28) };
+    const mutations = [huge, { kind: 'delete', tx_id: 'x', data: null, previous: null }];
+    assert.strictEqual(API.chunkEnd(mutations), 1);
+    assert.strictEqual(API.chunkEnd(mutations, 1), 2);
+});
@@ -0,0 +1,77 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { load } = require('./load');
+
+const LockService = {
+    getScriptLock: () => ({ tryLock: () => true, releaseLock: () => {} })
+};
+const { createWriteBatch } = load(['Code.gs'], { LockService });
+
+// Records every setValues call as { row, col, values }
+function mockSheet(lastRow = 1) {
+    const writes = [];
+    return {
+        writes,
+        getLastRow: () => lastRow,
+        getRange: (row, col, numRows, numCols) => ({
+            setValues: (values) => {
+                assert.strictEqual(values.length, numRows);
+                values.forEach(v => assert.strictEqual(v.length, numCols));
+                writes.push({ row, col, values });
+            }
+        })
+    };
+}
+
+test('separated columns of a row are written as separate runs', () => {
+    const sheet = mockSheet();
+    const batch = createWriteBatch(sheet);
+    batch.set(5, 3, 'Complete');
+    batch.set(5, 8, 'alice');
+    batch.set(5, 10, 'note');
+    batch.flush();
+
+    assert.deepStrictEqual(JSON.parse(JSON.stringify(sheet.writes)), [
+        { row: 5, col: 3, values: [['Complete']] },
+        { row: 5, col: 8, values: [['alice']] },
+        { row: 5, col: 10, values: [['note']] }
+    ]);
+});
+
+test('contiguous columns and adjacent rows merge into one block', () => {
+    const sheet = mockSheet();
+    const batch = createWriteBatch(sheet);
+    [2, 3, 4].forEach(row => {
+        batch.set(row, 13, 'bob');
+        batch.set(row, 14, 't' + row);
+    });
+    batch.set(7, 13, 'carol'); // Not adjacent: its own block
+    batch.flush();
+
+    assert.deepStrictEqual(JSON.parse(JSON.stringify(sheet.writes)), [
+        { row: 2, col: 13, values: [['bob', 't2'], ['bob', 't3'], ['bob', 't4']] },
+        { row: 7, col: 13, values: [['carol']] }
+    ]);
+});
+
+test('appends go out in one write after the last row, padded to the widest', () => {
+    const sheet = mockSheet(10);
+    const batch = createWriteBatch(sheet);
+    batch.append(['a', 'b', 'c']);
+    batch.append(['d']);
+    const result = batch.flush();
+
+    assert.strictEqual(result.appendedRow, 11);
+    assert.deepStrictEqual(JSON.parse(JSON.stringify(sheet.writes)), [
+        { row: 11, col: 1, values: [['a', 'b', 'c'], ['d', '', '']] }
+    ]);
+});
+
+test('flush empties the batch', () => {
+    const sheet = mockSheet();
+    const batch = createWriteBatch(sheet);
+    batch.set(2, 1, 'x');
+    batch.flush();
+    batch.flush();
+    assert.strictEqual(sheet.writes.length, 1);
+});